@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: linear parameter extraction vs. a per-build parameter index
+
+Generates synthetic pipeline builds with many actions and parameters and times
+looking up several parameters per build, once with extract_parameter_value()
+(one walk over all actions per lookup) and once with parameter_index() restricted
+to the looked-up names (one walk per build, then dict lookups), as BuildStore does.
+
+    PYTHONPATH=. python benchmarks/bench_parameter_index.py --actions 40 --params 300
+"""
+
+import argparse
+import random
+import time
+
+from jenkins_stats.records import extract_parameter_value, indexed_parameter_value, parameter_index
+
+
+def make_builds(count, actions, params, seed=0):
+    """Builds shaped like a busy pipeline: parameters sit among many unrelated actions"""
+    rng = random.Random(seed)
+    builds = []
+    for number in range(count):
+        build_actions = [{'_class': f'hudson.model.Action{i}'} for i in range(actions - 1)]
+        build_actions.insert(rng.randrange(actions), {'parameters': [
+            {'name': f'PARAM_{i}', 'value': f'value-{rng.randrange(10)}'} for i in range(params)
+        ]})
+        builds.append({'number': number, 'result': 'SUCCESS', 'actions': build_actions})
+    return builds
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--builds', type=int, default=2000, help='Synthetic builds (default: 2000)')
+    parser.add_argument('--actions', type=int, default=40, help='Actions per build (default: 40)')
+    parser.add_argument('--params', type=int, default=300, help='Parameters per build (default: 300)')
+    parser.add_argument('--lookups', type=int, default=3,
+                        help='Parameters looked up per build, e.g. groupings and filters (default: 3)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per variant; best is reported')
+    args = parser.parse_args()
+
+    builds = make_builds(args.builds, args.actions, args.params)
+    # Spread lookups across the parameter list, including its tail
+    names = [f'PARAM_{args.params - 1 - i * args.params // max(1, args.lookups)}'
+             for i in range(args.lookups)]
+
+    def linear():
+        for build in builds:
+            for name in names:
+                extract_parameter_value(build, name)
+
+    wanted = frozenset(names)
+
+    def indexed():
+        for build in builds:
+            index = parameter_index(build, wanted)
+            for name in names:
+                indexed_parameter_value(index, name)
+
+    for build in builds[:50]:
+        index = parameter_index(build, wanted)
+        assert all(indexed_parameter_value(index, name) == extract_parameter_value(build, name)
+                   for name in names)
+
+    linear_time = best_of(args.repeat, linear)
+    indexed_time = best_of(args.repeat, indexed)
+    print(f"{args.builds} builds x {args.actions} actions x {args.params} parameters, "
+          f"{args.lookups} lookups per build")
+    print(f"  linear extraction: {linear_time * 1000:8.1f} ms")
+    print(f"  parameter index:   {indexed_time * 1000:8.1f} ms")
+    print(f"  speedup:           {linear_time / indexed_time:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
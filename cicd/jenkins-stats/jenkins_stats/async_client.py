@@ -0,0 +1,184 @@
+"""
+Optional asyncio backend for Jenkins API calls
+
+Requires httpx (``pip install jenkins-stats[async]``). HTTP/2 is used when the
+``h2`` package is installed, otherwise requests are multiplexed over a small
+pool of HTTP/1.1 keep-alive connections.
+
+The client runs its own event loop on a background thread so the synchronous
+JenkinsJobExporter API can submit coroutines from any thread and either block
+on the result or collect many results with concurrent.futures.as_completed.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Coroutine, Dict, Iterator, Optional, Tuple, TypeVar, Union
+
+import requests
+
+from .throttle import AdaptiveThrottle, RateLimiter
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - exercised only without the extra installed
+    httpx = None  # type: ignore[assignment]
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+T = TypeVar('T')
+
+
+def async_backend_available() -> bool:
+    """Return True if the optional async dependencies are installed"""
+    return httpx is not None
+
+
+class AsyncResponse:
+    """Minimal requests.Response look-alike built from an httpx response"""
+
+    def __init__(self, status_code: int, content: bytes, url: str, headers: Dict[str, str]):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+        self.headers = headers
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def __enter__(self) -> 'AsyncResponse':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+    def raise_for_status(self) -> None:
+        if 400 <= self.status_code < 600:
+            error = requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}")
+            error.response = self
+            raise error
+
+
+class AsyncJenkinsClient:
+    """Issue Jenkins API requests concurrently over a few keep-alive connections"""
+
+    def __init__(self,
+                 auth: Optional[Tuple[Union[str, bytes], Union[str, bytes]]] = None,
+                 connections: int = 4,
+                 concurrency: int = 16,
+                 timeout: float = 60.0,
+                 adaptive: Optional[AdaptiveThrottle] = None):
+        if httpx is None:
+            raise RuntimeError(
+                "The async backend requires httpx. Install it with: pip install 'jenkins-stats[async]'"
+            )
+        self.auth = auth
+        self.connections = max(1, connections)
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.http2 = HTTP2_AVAILABLE
+        # Optional feedback-driven throttle applied to every request
+        self.adaptive = adaptive
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name='jenkins-stats-async', daemon=True)
+        self._thread.start()
+        self._client = self.run(self._create_client())
+        self._semaphore = self.run(self._create_semaphore())
+
+    async def _create_client(self) -> 'httpx.AsyncClient':
+        limits = httpx.Limits(max_connections=self.connections,
+                              max_keepalive_connections=self.connections)
+        return httpx.AsyncClient(auth=self.auth, http2=self.http2, limits=limits,
+                                 timeout=self.timeout, follow_redirects=True)
+
+    async def _create_semaphore(self) -> asyncio.Semaphore:
+        # Created on the loop thread so it binds to the right event loop
+        return asyncio.Semaphore(self.concurrency)
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> 'Future[T]':
+        """Schedule a coroutine on the client loop and return a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the client loop and block until it finishes"""
+        return self.submit(coro).result()
+
+    @staticmethod
+    async def throttle(rate_limiter: RateLimiter) -> None:
+        """Async counterpart of RateLimiter.wait() that does not block the loop"""
+        if rate_limiter.delay <= 0:
+            return
+        pause = rate_limiter.reserve()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    async def get(self, url: str, params: Optional[Dict] = None,
+                  timeout: Optional[float] = None) -> AsyncResponse:
+        """GET a URL, bounded by the client's in-flight request limit
+
+        timeout overrides the client's timeout for this request. With an adaptive
+        throttle, 429/503 responses are retried after backing off.
+        """
+        if self.adaptive is None:
+            return await self._get_once(url, params, timeout)
+        attempt = 0
+        while True:
+            await self.adaptive.acquire_async()
+            started = time.monotonic()
+            try:
+                response = await self._get_once(url, params, timeout)
+            except requests.exceptions.RequestException:
+                self.adaptive.release()
+                raise
+            self.adaptive.release(response.status_code, time.monotonic() - started,
+                                  response.headers.get('retry-after'))
+            if not self.adaptive.should_retry(response.status_code, attempt):
+                return response
+            attempt += 1
+
+    async def _get_once(self, url: str, params: Optional[Dict] = None,
+                        timeout: Optional[float] = None) -> AsyncResponse:
+        async with self._semaphore:
+            try:
+                response = await self._client.get(
+                    url, params=params, timeout=self.timeout if timeout is None else timeout)
+            except httpx.TimeoutException as e:
+                raise requests.exceptions.Timeout(f"Timed out fetching {url}: {e}")
+            except httpx.HTTPError as e:
+                raise requests.exceptions.ConnectionError(f"Failed to fetch {url}: {e}")
+            return AsyncResponse(response.status_code, response.content, str(response.url),
+                                 dict(response.headers))
+
+    async def get_json(self, url: str, params: Optional[Dict] = None) -> Any:
+        response = await self.get(url, params)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_text(self, url: str, params: Optional[Dict] = None) -> str:
+        response = await self.get(url, params)
+        response.raise_for_status()
+        return response.text
+
+    def close(self) -> None:
+        """Close connections and stop the background loop"""
+        if not self._loop.is_running():
+            return
+        self.run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,169 @@
+"""
+Persistent on-disk cache of Jenkins builds
+
+Completed builds never change, so they are stored once in a SQLite database
+keyed by job URL and build number. Later runs only fetch builds newer than the
+highest cached build number and re-poll builds that were still running.
+The last build each job had when it was fetched is kept as well, so a later
+run can tell from the job list alone which jobs have not changed.
+
+When a later run asks for more builds than are cached, older builds are
+backfilled; jobs whose whole history has been seen are flagged so they aren't
+asked again. The flag records the builds field used, since 'builds' stops at
+the builds Jenkins has loaded while 'allBuilds' reaches the first build.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def is_running(build: Dict) -> bool:
+    """A build is unfinished while Jenkins flags it as building or has no result yet"""
+    return bool(build.get('building')) or build.get('result') is None
+
+
+class BuildCache:
+    """SQLite-backed build store shared by all worker threads"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS builds (
+            job_url  TEXT    NOT NULL,
+            number   INTEGER NOT NULL,
+            running  INTEGER NOT NULL,
+            data     TEXT    NOT NULL,
+            PRIMARY KEY (job_url, number)
+        );
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_url        TEXT    PRIMARY KEY,
+            last_number    INTEGER NOT NULL,
+            last_timestamp INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS history (
+            job_url      TEXT PRIMARY KEY,
+            builds_field TEXT NOT NULL
+        )
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(os.path.expanduser(path))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(self.SCHEMA)
+            self._conn.commit()
+        self.counts = {'cached_builds': 0, 'new_builds': 0, 'repolled_builds': 0}
+
+    @staticmethod
+    def job_key(job_url: str) -> str:
+        """Normalise a job URL so trailing slashes don't split the cache"""
+        return job_url.rstrip('/')
+
+    def latest_number(self, job_url: str) -> Optional[int]:
+        """Highest cached build number for a job, or None if nothing is cached"""
+        with self._lock:
+            row = self._conn.execute('SELECT MAX(number) FROM builds WHERE job_url = ?',
+                                     (self.job_key(job_url),)).fetchone()
+        return row[0] if row else None
+
+    def oldest_number(self, job_url: str) -> Optional[int]:
+        """Lowest cached build number for a job, or None if nothing is cached"""
+        with self._lock:
+            row = self._conn.execute('SELECT MIN(number) FROM builds WHERE job_url = ?',
+                                     (self.job_key(job_url),)).fetchone()
+        return row[0] if row else None
+
+    def oldest_timestamp(self, job_url: str) -> Optional[int]:
+        """Start time of the lowest-numbered cached build, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM builds WHERE job_url = ? ORDER BY number LIMIT 1',
+                (self.job_key(job_url),)).fetchone()
+        return json.loads(row[0]).get('timestamp') if row else None
+
+    def build_count(self, job_url: str) -> int:
+        with self._lock:
+            row = self._conn.execute('SELECT COUNT(*) FROM builds WHERE job_url = ?',
+                                     (self.job_key(job_url),)).fetchone()
+        return int(row[0])
+
+    def history_complete(self, job_url: str, builds_field: str) -> bool:
+        """Whether every build listed under builds_field is already cached"""
+        with self._lock:
+            row = self._conn.execute('SELECT builds_field FROM history WHERE job_url = ?',
+                                     (self.job_key(job_url),)).fetchone()
+        return row is not None and row[0] in (builds_field, 'allBuilds')
+
+    def mark_history_complete(self, job_url: str, builds_field: str) -> None:
+        """Record that paging through builds_field reached the end of the job's history"""
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO history (job_url, builds_field) '
+                               'VALUES (?, ?)', (self.job_key(job_url), builds_field))
+            self._conn.commit()
+
+    def running_numbers(self, job_url: str) -> List[int]:
+        """Build numbers that were still running when they were cached"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT number FROM builds WHERE job_url = ? AND running = 1 ORDER BY number DESC',
+                (self.job_key(job_url),)).fetchall()
+        return [row[0] for row in rows]
+
+    def get_builds(self, job_url: str, limit: Optional[int] = None) -> List[Dict]:
+        """Cached builds for a job, newest first like the Jenkins API"""
+        query = 'SELECT data FROM builds WHERE job_url = ? ORDER BY number DESC'
+        args: List[object] = [self.job_key(job_url)]
+        if limit:
+            query += ' LIMIT ?'
+            args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def store_builds(self, job_url: str, builds: Iterable[Dict]) -> None:
+        """Insert or replace builds for a job"""
+        key = self.job_key(job_url)
+        rows = [(key, build['number'], int(is_running(build)), json.dumps(build))
+                for build in builds if 'number' in build]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO builds (job_url, number, running, data) VALUES (?, ?, ?, ?)',
+                rows)
+            self._conn.commit()
+
+    def delete_build(self, job_url: str, number: int) -> None:
+        """Forget a build that no longer exists on the controller"""
+        with self._lock:
+            self._conn.execute('DELETE FROM builds WHERE job_url = ? AND number = ?',
+                               (self.job_key(job_url), number))
+            self._conn.commit()
+
+    def job_state(self, job_url: str) -> Optional[Tuple[int, Optional[int]]]:
+        """(number, timestamp) of the job's last build when it was last fetched"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT last_number, last_timestamp FROM jobs WHERE job_url = ?',
+                (self.job_key(job_url),)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def store_job_state(self, job_url: str, number: int, timestamp: Optional[int]) -> None:
+        """Remember the last build a job had when its builds were fetched"""
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO jobs (job_url, last_number, last_timestamp) '
+                               'VALUES (?, ?, ?)', (self.job_key(job_url), number, timestamp))
+            self._conn.commit()
+
+    def count(self, kind: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[kind] += amount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
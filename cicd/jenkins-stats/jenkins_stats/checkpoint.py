@@ -0,0 +1,194 @@
+"""
+Checkpoints for long multi-job crawls
+
+The checkpoint is an NDJSON file in the output directory: a header with the
+crawl's options, then one segment per completed job holding that job's build
+records, appended as the job finishes. Saving only flushes the segments written
+since the last save, so its cost no longer grows with the crawl. After an
+interruption, ``--resume`` rebuilds the store from the segments, skips their
+jobs and carries on from there instead of crawling the whole controller again.
+A segment cut short by the interruption is dropped and its job fetched again.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from types import TracebackType
+from typing import (IO, Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple,
+                    Type)
+
+import requests
+
+from .records import BuildStore
+from .sampling import SampleDesign
+
+CHECKPOINT_FILE = 'checkpoint.ndjson'
+CHECKPOINT_VERSION = 2
+
+# Options that change which builds each job contributes; a resumed crawl must match them
+FIXED_OPTIONS = ('max_builds', 'groupings')
+
+# HTTP statuses worth retrying: rate limiting and gateway/server hiccups
+TRANSIENT_STATUSES = (429, 500, 502, 503, 504)
+
+
+class InterruptiblePool(ThreadPoolExecutor):
+    """Thread pool whose with-block drops queued work when left by an exception
+
+    A plain executor's __exit__ waits for every submitted task, so Ctrl-C during
+    a crawl would fetch all remaining jobs before the checkpoint is written.
+    Here pending futures are cancelled by hand (cancel_futures needs Python 3.9)
+    and only the tasks already running are left to finish in the background.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        super().__init__(max_workers=max_workers)
+        self._submitted: List[Future] = []
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        future = super().submit(fn, *args, **kwargs)
+        self._submitted.append(future)
+        return future
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        if exc_type is None:
+            self.shutdown(wait=True)
+        else:
+            for future in self._submitted:
+                future.cancel()
+            self.shutdown(wait=False)
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a failed job is likely to succeed if fetched again later"""
+    if isinstance(error, requests.exceptions.HTTPError):
+        response = getattr(error, 'response', None)
+        return response is not None and response.status_code in TRANSIENT_STATUSES
+    return isinstance(error, (requests.exceptions.ConnectionError,
+                              requests.exceptions.Timeout,
+                              requests.exceptions.ChunkedEncodingError))
+
+
+class CrawlCheckpoint:
+    """Save and restore the progress of one export into an output directory
+
+    options records how the crawl was run (max_builds, since, until, groupings).
+    Resuming with a different max_builds or groupings is refused; the options
+    saved with the checkpoint are left in saved_options.
+    """
+
+    def __init__(self, output_path: Path, jenkins_url: str, parameters: Sequence[str],
+                 options: Optional[Dict[str, Any]] = None):
+        self.path = Path(output_path) / CHECKPOINT_FILE
+        self.jenkins_url = jenkins_url
+        self.parameters = list(parameters)
+        self.options = dict(options or {})
+        self.saved_options: Dict[str, Any] = {}
+        self.saved_at: Optional[float] = None
+        self.sample_design: Optional[SampleDesign] = None
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def start(self) -> None:
+        """Begin a new checkpoint for this crawl, replacing any earlier one"""
+        header = {
+            'version': CHECKPOINT_VERSION,
+            'jenkins_url': self.jenkins_url,
+            'parameters': self.parameters,
+            'options': self.options,
+            'started_at': time.time(),
+        }
+        with self._lock:
+            self._file = self.path.open('w', encoding='utf-8')
+            self._file.write(json.dumps(header) + '\n')
+
+    def add_job(self, job_name: str, store: BuildStore,
+                sample_design: Optional[SampleDesign] = None) -> None:
+        """Append a completed job's records; they reach the disk at the next save()"""
+        segment: Dict[str, Any] = {'job': job_name, 'store': store.to_dict()}
+        if sample_design is not None and job_name in sample_design.strata:
+            segment['sample_design'] = sample_design.only(job_name).to_dict()
+        line = json.dumps(segment) + '\n'
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError("Checkpoint was not started or loaded")
+            self._file.write(line)
+
+    def save(self, failed: Iterable[str] = ()) -> None:
+        """Flush the segments appended so far to disk and record the jobs left failed"""
+        line = json.dumps({'failed_jobs': sorted(failed), 'saved_at': time.time()}) + '\n'
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError("Checkpoint was not started or loaded")
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self.saved_at = time.monotonic()
+
+    def load(self, store: Optional[BuildStore] = None) -> Tuple[BuildStore, Set[str]]:
+        """Saved records and completed job names; ValueError if it belongs to another crawl
+
+        The records are appended to store if given, otherwise to a new store. A
+        sampled crawl's design is left in sample_design. Later add_job() calls
+        append to the same file.
+        """
+        with self.path.open('rb') as f:
+            raw = f.read()
+        # Anything after the last newline is a segment the interruption cut short
+        complete = raw[:raw.rfind(b'\n') + 1]
+        lines = complete.decode('utf-8').splitlines()
+        header = json.loads(lines[0]) if lines else {}
+        if header.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {self.path}")
+        if header['jenkins_url'] != self.jenkins_url:
+            raise ValueError(f"Checkpoint {self.path} is for {header['jenkins_url']}, "
+                             f"not {self.jenkins_url}")
+        if not set(self.parameters) <= set(header['parameters']):
+            raise ValueError(f"Checkpoint {self.path} tracks parameters "
+                             f"{', '.join(header['parameters'])}; "
+                             f"cannot resume a crawl for {', '.join(self.parameters)}")
+        self.saved_options = header.get('options', {})
+        changed = [f"{name}={self.saved_options.get(name)!r}" for name in FIXED_OPTIONS
+                   if name in self.options and self.options[name] != self.saved_options.get(name)]
+        if changed:
+            raise ValueError(f"Checkpoint {self.path} was saved with {', '.join(changed)}; "
+                             f"rerun with the same options or without --resume")
+
+        if store is None:
+            store = BuildStore(header['parameters'])
+        completed: Set[str] = set()
+        design = SampleDesign()
+        for line in lines[1:]:
+            segment = json.loads(line)
+            job_name = segment.get('job')
+            if job_name is None or job_name in completed:
+                continue
+            store.extend(BuildStore.from_dict(segment['store']))
+            completed.add(job_name)
+            if 'sample_design' in segment:
+                design.update(SampleDesign.from_dict(segment['sample_design']))
+        self.sample_design = design if design.strata else None
+
+        with self._lock:
+            self._file = self.path.open('a', encoding='utf-8')
+            self._file.truncate(len(complete))
+        return store, completed
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self) -> None:
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
@@ -52,7 +52,8 @@ USAGE:
 
 ARGUMENTS:
     JENKINS_URL     Jenkins server URL (e.g., http://jenkins.example.com)
-    PARAMETER       Parameter name to group builds by (e.g., environment, branch)
+    PARAMETER       Parameter name to group builds by (e.g., environment, branch),
+                    or a comma-separated combination (e.g., environment,branch)
 
 OPTIONS:
     -n, --max-jobs NUM      Maximum number of jobs to process
@@ -60,6 +61,9 @@ OPTIONS:
     -f, --filter PATTERN    Filter jobs by name pattern
     -o, --output DIR        Output directory (default: timestamped directory)
     -d, --delay SECONDS     Delay between API calls (default: 0.1)
+    -w, --workers NUM       Number of jobs to fetch concurrently (default: 1)
+    -g, --group-by PARAMS   Additional grouping from the same crawl (repeatable)
+    --backend NAME          HTTP backend: requests or async (default: requests)
     --netrc FILE            Path to netrc file for authentication (default: ~/.netrc)
     --export-configs        Export job configuration XML files
     --export-build-data     Export detailed build data JSON files
@@ -180,6 +184,9 @@ def main():
     parser.add_argument('-f', '--filter', help='Filter jobs by name pattern')
     parser.add_argument('-o', '--output', help='Output directory')
     parser.add_argument('-d', '--delay', type=float, default=0.1, help='Delay between API calls')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Number of jobs to fetch concurrently')
+    parser.add_argument('--backend', choices=['requests', 'async'], default='requests', help='HTTP backend')
+    parser.add_argument('-g', '--group-by', action='append', default=[], help='Additional parameter grouping')
     parser.add_argument('--netrc', default='~/.netrc', help='Path to netrc file for authentication')
     parser.add_argument('--export-configs', action='store_true', help='Export job configuration XML files')
     parser.add_argument('--export-build-data', action='store_true', help='Export detailed build data JSON files')
@@ -221,7 +228,7 @@ def main():
     cmd = [
         sys.executable, '-m', 'jenkins_stats',
         args.jenkins_url,
-        '--parameter', args.parameter,
+        '--group-by' if ',' in args.parameter else '--parameter', args.parameter,
     ]
     
     # Add optional arguments
@@ -235,6 +242,12 @@ def main():
         cmd.extend(['--output', args.output])
     if args.delay != 0.1:
         cmd.extend(['--delay', str(args.delay)])
+    if args.workers != 1:
+        cmd.extend(['--workers', str(args.workers)])
+    if args.backend != 'requests':
+        cmd.extend(['--backend', args.backend])
+    for grouping in args.group_by:
+        cmd.extend(['--group-by', grouping])
     if args.netrc != '~/.netrc':
         cmd.extend(['--netrc', args.netrc])
     if args.export_configs:
@@ -0,0 +1,108 @@
+"""
+Parquet and Arrow output for --columnar
+
+Statistics tables keep job lists, build numbers and confidence intervals as
+list columns instead of joined strings. The per-build table is built straight
+from a BuildStore: its array columns are handed to Arrow as buffers without
+copying, job names and parameter values become dictionary-encoded columns
+over the store's catalogs, and each tracked parameter is a column of its own.
+
+Parquet files are zstd-compressed for storage; Arrow files are uncompressed
+IPC files, so readers can memory-map them and scan columns without copying.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .records import MISSING, RESULT_NAMES, RESULT_OTHER, BuildStore, GroupIds
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without the extra installed
+    pa = None
+
+# --columnar formats and their file suffixes
+COLUMNAR_FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+# Per-build columns that come before the parameter columns
+BUILD_COLUMNS = ('job', 'number', 'result', 'duration_ms', 'timestamp')
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError(
+            "Parquet/Arrow output requires pyarrow. Install it with: "
+            "pip install 'jenkins-stats[columnar]'"
+        )
+
+
+def _int_column(column: GroupIds, null_value: Optional[int] = None) -> 'pa.Array':
+    """Arrow view of an array.array (or NumPy) column, with null_value entries marked null"""
+    arrow_type = {1: pa.int8(), 2: pa.int16(), 4: pa.int32(), 8: pa.int64()}[column.itemsize]
+    array = pa.Array.from_buffers(arrow_type, len(column), [None, pa.py_buffer(column)])
+    if null_value is None:
+        return array
+    return pc.if_else(pc.equal(array, null_value), pa.scalar(None, arrow_type), array)
+
+
+def _dictionary_column(indices: 'pa.Array', values: List[str]) -> 'pa.DictionaryArray':
+    return pa.DictionaryArray.from_arrays(indices, pa.array(values, type=pa.string()))
+
+
+def builds_table(store: BuildStore) -> 'pa.Table':
+    """One row per build: job, number, result, duration_ms, timestamp and a column
+    per tracked parameter (null where a build doesn't set it)"""
+    require_pyarrow()
+    result_names = [RESULT_NAMES.get(code, '') for code in range(RESULT_OTHER)]
+    columns = {
+        'job': _dictionary_column(_int_column(store.job), store.jobs.values),
+        'number': _int_column(store.number, MISSING),
+        # NOT_BUILT, still-running and unknown results are null
+        'result': _dictionary_column(_int_column(store.result, RESULT_OTHER), result_names),
+        'duration_ms': _int_column(store.duration),
+        'timestamp': _int_column(store.timestamp, 0).cast(pa.timestamp('ms', tz='UTC')),
+    }
+    for name in store.params:
+        key = name if name not in BUILD_COLUMNS else f'param:{name}'
+        value_ids, labels = store.value_column(name)
+        columns[key] = _dictionary_column(_int_column(value_ids, MISSING), labels)
+    return pa.table(columns)
+
+
+def statistics_table(stats: Dict[str, Dict]) -> 'pa.Table':
+    """One row per parameter value from the exporter's serialised statistics"""
+    require_pyarrow()
+    keys: Dict[str, None] = {'parameter_value': None}
+    for entry in stats.values():
+        keys.update(dict.fromkeys(entry))
+    rows = []
+    for value, entry in stats.items():
+        row = dict(entry, parameter_value=value)
+        if 'build_numbers' in row:
+            row['build_numbers'] = [n if isinstance(n, int) else None
+                                    for n in row['build_numbers']]
+        if 'jobs' in row:
+            row['jobs'] = sorted(row['jobs'])
+        rows.append(row)
+    columns = {}
+    for key in keys:
+        if key == 'jobs':
+            columns[key] = pa.array([row.get(key) for row in rows], type=pa.list_(pa.string()))
+        else:
+            columns[key] = pa.array([row.get(key) for row in rows])
+    return pa.table(columns)
+
+
+def write_table(table: 'pa.Table', stem: Path, columnar_format: str) -> Path:
+    """Write table to stem plus the format's suffix and return the path"""
+    require_pyarrow()
+    path = Path(f"{stem}{COLUMNAR_FORMATS[columnar_format]}")
+    if columnar_format == 'parquet':
+        pq.write_table(table, path, compression='zstd')
+    else:
+        with pa.OSFile(str(path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    return path
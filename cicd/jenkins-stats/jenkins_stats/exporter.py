@@ -5,28 +5,200 @@ Reads credentials from ~/.netrc file
 """
 
 import argparse
+import asyncio
 import csv
 import json
 import netrc
 import os
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-from urllib.parse import urljoin, urlparse
+from typing import (AbstractSet, Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence,
+                    Set, Tuple, Union)
+from urllib.parse import quote, urljoin, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
+from .async_client import AsyncJenkinsClient, AsyncResponse
+from .cache import BuildCache
+from .checkpoint import CrawlCheckpoint, InterruptiblePool, is_transient
+from .columnar import (COLUMNAR_FORMATS, builds_table, require_pyarrow, statistics_table,
+                       write_table)
+from .paging import (DEFAULT_MAX_PAGE_SIZE, DEFAULT_MIN_PAGE_SIZE, PAGE_TIMEOUT_SECONDS,
+                     PAGE_TIMEOUT_STATUSES, HistoryCoverage, JobPager, PageSizer)
+from .records import (OTHER_LABEL, BuildStore, Grouping, extract_parameter_value,
+                      grouping_name, parameter_index, parse_grouping, union_jobs)
+from .sampling import DEFAULT_PRECISION, SampleDesign, StratifiedSampler, precise_enough
+from .streaming import (COMPRESSIONS, JobBuildsWriter, NdjsonBuildsWriter, StreamingBuildsWriter,
+                        iter_array_items, iter_ndjson)
+from .throttle import AdaptiveThrottle, RateLimiter
+from .trends import BUCKETS
+from .window import TimeWindow, parse_time_bound
+
+BACKENDS = ('requests', 'async')
+
+# --export-build-data file formats: pretty-printed {"builds": [...]} or one build per line
+BUILD_FORMATS = ('json', 'ndjson')
+
+# Fields requested for every build; 'building' lets the cache tell finished builds apart
+BUILD_FIELDS = 'number,result,duration,timestamp,building,actions[parameters[name,value]]'
+
+# First page size when topping up a cached job; doubles while every build is new
+INCREMENTAL_PAGE_SIZE = 10
+
+# Folder levels expanded per discovery request
+DEFAULT_FOLDER_DEPTH = 3
+
+# Per-job fields added to discovery with --skip-unchanged to tell which jobs need fetching
+JOB_PROBE_FIELDS = 'buildable,color,lastBuild[number,timestamp]'
+
+# Per-job fields added to discovery with --prune-jobs: the parameters each job declares
+JOB_PARAMETER_FIELDS = 'property[parameterDefinitions[name]]'
+
+# Bytes read at a time from streamed build-history responses
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# --single-job pagination: pages requested concurrently
+DEFAULT_PAGE_FANOUT = 4
+
+# Bulk mode: upper bound on builds returned by one multi-job request
+DEFAULT_BULK_MAX_BUILDS = 2000
+
+# Adaptive throttling: ceiling for the request rate (requests per second)
+DEFAULT_MAX_RATE = 50.0
+
+# Seconds between checkpoints of a multi-job crawl
+DEFAULT_CHECKPOINT_INTERVAL = 60.0
+
+# Failed jobs are retried after RETRY_BACKOFF, doubling per round up to RETRY_MAX_BACKOFF;
+# at most RETRY_QUEUE_SIZE jobs wait for a retry, later failures are left to --resume
+DEFAULT_MAX_RETRIES = 3
+RETRY_BACKOFF = 2.0
+RETRY_MAX_BACKOFF = 60.0
+RETRY_QUEUE_SIZE = 200
+
+# Duration percentiles reported per parameter value
+DURATION_PERCENTILES = (50, 90, 99)
+
 
 class JenkinsJobExporter:
-    def __init__(self, jenkins_url: str, delay: float = 0.1, netrc_file: Optional[str] = None):
+    def __init__(self, jenkins_url: str, delay: float = 0.1, netrc_file: Optional[str] = None,
+                 workers: int = 1, backend: str = 'requests', connections: int = 4,
+                 cache_path: Optional[str] = None, folder_depth: int = DEFAULT_FOLDER_DEPTH,
+                 stream: bool = False, adaptive: bool = False,
+                 max_rate: float = DEFAULT_MAX_RATE, page_fanout: int = DEFAULT_PAGE_FANOUT,
+                 min_page_size: int = DEFAULT_MIN_PAGE_SIZE,
+                 max_page_size: int = DEFAULT_MAX_PAGE_SIZE,
+                 page_timeout: float = PAGE_TIMEOUT_SECONDS, verbose: bool = False,
+                 skip_unchanged: bool = False, prune_jobs: bool = False,
+                 deep_history: bool = False, sample: bool = False,
+                 precision: float = DEFAULT_PRECISION, top_k: Optional[int] = None,
+                 bucket: Optional[str] = None, build_format: str = 'json',
+                 compression: Optional[str] = None, consolidate_builds: bool = False,
+                 columnar_format: Optional[str] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+        if skip_unchanged and not cache_path:
+            raise ValueError("Skipping unchanged jobs needs a build cache to serve them from")
+        if sample and cache_path:
+            raise ValueError("Sampling is not combined with the build cache")
+        if bucket is not None and bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket '{bucket}'. Choose from: {', '.join(BUCKETS)}")
+        if build_format not in BUILD_FORMATS:
+            raise ValueError(f"Unknown build data format '{build_format}'. "
+                             f"Choose from: {', '.join(BUILD_FORMATS)}")
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}'. "
+                             f"Choose from: {', '.join(COMPRESSIONS)}")
+        if (compression or consolidate_builds) and build_format != 'ndjson':
+            raise ValueError("Compressed and consolidated build data need the ndjson format")
+        if columnar_format is not None:
+            if columnar_format not in COLUMNAR_FORMATS:
+                raise ValueError(f"Unknown columnar format '{columnar_format}'. "
+                                 f"Choose from: {', '.join(COLUMNAR_FORMATS)}")
+            require_pyarrow()
         self.jenkins_url = jenkins_url.rstrip('/')
         self.delay = delay
         self.netrc_file = netrc_file or os.path.expanduser('~/.netrc')
+        self.workers = max(1, workers)
+        self.backend = backend
+        self.connections = max(1, connections)
+        self._async_client: Optional[AsyncJenkinsClient] = None
+        self.cache = BuildCache(cache_path) if cache_path else None
+        self.folder_depth = folder_depth
+        self.skip_unchanged = skip_unchanged
+        self.prune_jobs = prune_jobs
+        # 'builds' only lists the builds Jenkins has loaded; 'allBuilds' reaches the whole history
+        self.builds_field = 'allBuilds' if deep_history else 'builds'
+        # Jobs whose history was cut off at --max-builds in the last export
+        self.truncated_jobs = 0
+        # Single-job mode: how much of the job's history was fetched
+        self.history_coverage: Optional[HistoryCoverage] = None
+        # --sample: stop once success rates are known to +/- precision
+        self.sample = sample
+        self.precision = precision
+        # Grouping whose values the sampling stopping rule checks
+        self.sample_grouping: Optional[Grouping] = None
+        self.sample_counts = {'jobs': 0, 'sampled': 0, 'available': 0}
+        # Strata and pages of every sampled job, for weighting the statistics
+        self.sample_design = SampleDesign()
+        # Keep only the top_k values of each grouping; the rest fold into OTHER_LABEL
+        self.top_k = top_k
+        # --bucket: also write per-value time series ('day', 'week' or 'month')
+        self.bucket = bucket
+        # --export-build-data output: format, compression, and one file for all jobs or one per job
+        self.build_format = build_format
+        self.compression = compression
+        self.consolidate_builds = consolidate_builds
+        self.shared_builds_writer: Optional[NdjsonBuildsWriter] = None
+        # --columnar: also write statistics and per-build records as Parquet or Arrow
+        self.columnar_format = columnar_format
+        # Jobs left out of the last export by the change probe, by reason
+        self.skipped_jobs = {'disabled': 0, 'never built': 0, 'unchanged': 0}
+        self.pruned_jobs = 0
+        self.stream = stream
+        self.page_fanout = max(1, page_fanout)
+        # Build-history pages are sized from the bytes and latency seen so far;
+        # each job pages with a sizer seeded from this shared estimate
+        self.page_sizer = PageSizer(min_size=min_page_size, max_size=max_page_size)
+        # Seconds to wait on a build page before splitting it
+        self.page_timeout = page_timeout
+        self.verbose = verbose
+        # --since/--until; set per export
+        self.window = TimeWindow()
+        # Columnar store of every build fetched during the current export
+        self.build_store: Optional[BuildStore] = None
+        # Grouping name (e.g. 'environment+branch') -> statistics from the last export
+        self.grouped_stats: Dict[str, Dict] = {}
+        # Grouping name -> {value: {bucket: statistics}} with --bucket
+        self.grouped_trends: Dict[str, Dict] = {}
+        # Jobs whose builds are in build_store; each is appended to the checkpoint
+        self.completed_jobs: Set[str] = set()
+        self.checkpoint: Optional[CrawlCheckpoint] = None
+        self._job_urls: Dict[str, str] = {}
+        # Job full name -> (parent folder URL, index in the parent's jobs list), for bulk queries
+        self._job_locations: Dict[str, Tuple[str, int]] = {}
+        # With adaptive throttling every request is paced by the controller's responses,
+        # and --delay only sets the starting rate
+        self.throttle: Optional[AdaptiveThrottle] = None
+        if adaptive:
+            self.throttle = AdaptiveThrottle(initial_rate=1 / delay if delay > 0 else max_rate,
+                                             max_rate=max_rate, max_concurrency=self.workers)
+        self.rate_limiter = RateLimiter(0 if adaptive else delay)
+        self._stats_lock = threading.Lock()
+        self.request_counts = {'made': 0, 'saved': 0}
+        self.bulk_fallbacks = 0
         self.session = requests.Session()
+        self._setup_session_pool()
         self._validate_jenkins_url()
         self._setup_auth()
+        if self.backend == 'async':
+            self._setup_async_client()
 
     def _validate_jenkins_url(self):
         """Validate that the Jenkins URL looks correct"""
@@ -35,6 +207,13 @@ class JenkinsJobExporter:
         # happens in the respective methods.
         pass
 
+    def _setup_session_pool(self) -> None:
+        """Size the connection pool so every worker can keep its own keep-alive connection"""
+        pool_size = max(10, self.workers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
     def _setup_auth(self):
         """Setup authentication from netrc file"""
         try:
@@ -55,14 +234,72 @@ class JenkinsJobExporter:
         except Exception as e:
             print(f"Error reading {self.netrc_file}: {e}")
 
+    def _setup_async_client(self) -> None:
+        """Create the async client, reusing the credentials loaded from netrc"""
+        auth = None
+        if isinstance(self.session.auth, HTTPBasicAuth):
+            auth = (self.session.auth.username, self.session.auth.password)
+        self._async_client = AsyncJenkinsClient(auth=auth,
+                                                connections=self.connections,
+                                                concurrency=self.workers,
+                                                adaptive=self.throttle)
+        protocol = 'HTTP/2' if self._async_client.http2 else 'HTTP/1.1'
+        print(f"Using async backend: {self.connections} {protocol} connections, "
+              f"{self.workers} requests in flight")
+
+    def _count_request(self, kind: str = 'made', count: int = 1) -> None:
+        """Track API requests made, and requests saved by reusing fetched data"""
+        with self._stats_lock:
+            self.request_counts[kind] += count
+
+    def _get(self, url: str, params: Optional[Dict] = None, stream: bool = False,
+             timeout: Optional[float] = None) -> Union[requests.Response, AsyncResponse]:
+        """GET a Jenkins URL through the configured backend"""
+        self._count_request()
+        if self._async_client is not None:
+            return self._async_client.run(self._async_client.get(url, params, timeout))
+        if self.throttle is None:
+            return self.session.get(url, params=params, stream=stream, timeout=timeout)
+        return self._throttled_get(self.throttle, url, params, stream, timeout)
+
+    def _throttled_get(self, throttle: AdaptiveThrottle, url: str, params: Optional[Dict],
+                       stream: bool, timeout: Optional[float] = None) -> requests.Response:
+        """GET paced by the adaptive throttle, retrying 429/503 after it backs off"""
+        attempt = 0
+        while True:
+            throttle.acquire()
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, stream=stream, timeout=timeout)
+            except requests.exceptions.RequestException:
+                throttle.release()
+                raise
+            throttle.release(response.status_code, time.monotonic() - started,
+                             response.headers.get('Retry-After'))
+            if not throttle.should_retry(response.status_code, attempt):
+                return response
+            response.close()
+            attempt += 1
+
+    def close(self) -> None:
+        """Release backend resources"""
+        self._close_builds_export()
+        if self._async_client is not None:
+            self._async_client.close()
+            self._async_client = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        self.session.close()
+
     def get_all_jobs(self, job_filter: Optional[str] = None, max_jobs: Optional[int] = None) -> List[Dict]:
         """Get list of all jobs, optionally filtered"""
         print("Fetching job list...")
         url = f"{self.jenkins_url}/api/json"
-        params = {'tree': 'jobs[name,url,fullName]'}
+        params = {'tree': self._jobs_tree(max(1, self.folder_depth), self._discovery_fields())}
         
         try:
-            response = self.session.get(url, params=params)
+            response = self._get(url, params)
             response.raise_for_status()
             
             data = response.json()
@@ -86,7 +323,7 @@ class JenkinsJobExporter:
                         f"Response: {data}"
                     )
             
-            jobs = data['jobs']
+            jobs = self._discover_jobs(data['jobs'])
             
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Failed to connect to Jenkins at {url}: {e}")
@@ -97,7 +334,7 @@ class JenkinsJobExporter:
         
         # Apply filter if specified
         if job_filter:
-            jobs = [job for job in jobs if job_filter.lower() in job['name'].lower()]
+            jobs = [job for job in jobs if job_filter.lower() in job['fullName'].lower()]
             print(f"Filtered to {len(jobs)} jobs matching '{job_filter}'")
         
         # Limit number of jobs if specified
@@ -108,8 +345,202 @@ class JenkinsJobExporter:
         print(f"Found {len(jobs)} jobs to process")
         return jobs
 
-    def analyze_single_job(self, target_parameter: str, max_builds: int = 100) -> Dict:
-        """Analyze a single job by its direct URL"""
+    def _discovery_fields(self) -> List[str]:
+        """Per-job fields discovery needs for --skip-unchanged and --prune-jobs"""
+        fields = []
+        if self.skip_unchanged:
+            fields.append(JOB_PROBE_FIELDS)
+        if self.prune_jobs:
+            fields.append(JOB_PARAMETER_FIELDS)
+        return fields
+
+    @staticmethod
+    def _jobs_tree(depth: int, job_fields: Sequence[str] = ()) -> str:
+        """Tree query expanding `depth` folder levels
+
+        The innermost level only asks for `jobs[url]`, which is enough to tell
+        which items at the last expanded level are folders still to be walked.
+        job_fields are requested for every item at the expanded levels.
+        """
+        extra = ''.join(f'{field},' for field in job_fields)
+        fields = 'url'
+        for _ in range(depth):
+            fields = f'name,url,fullName,{extra}jobs[{fields}]'
+        return f'jobs[{fields}]'
+
+    def _discover_jobs(self, root_entries: List[Dict]) -> List[Dict]:
+        """Flatten folders and multibranch projects into a list of buildable jobs
+
+        Each request expands folder_depth levels; folders deeper than that are
+        listed breadth-first, one wave of parallel requests per level group.
+        """
+        jobs: List[Dict] = []
+        frontier: List[Dict] = []
+        if self.folder_depth <= 0:
+            # Root-level jobs only
+            for index, entry in enumerate(root_entries):
+                if 'name' in entry and 'jobs' not in entry:
+                    jobs.append(self._register_job(entry, '', self.jenkins_url, index))
+            return jobs
+        
+        self._collect_jobs(root_entries, '', self.jenkins_url, self.folder_depth, jobs, frontier)
+        folders_walked = 0
+        
+        def list_folder(folder: Dict) -> List[Dict]:
+            url = f"{self._rebase_url(folder['url'])}/api/json"
+            response = self._get(url, {'tree': self._jobs_tree(self.folder_depth,
+                                                               self._discovery_fields())})
+            response.raise_for_status()
+            children: List[Dict] = response.json().get('jobs', [])
+            return children
+        
+        while frontier:
+            folders_walked += len(frontier)
+            next_frontier: List[Dict] = []
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(list_folder, folder): folder for folder in frontier}
+                for future in as_completed(futures):
+                    folder = futures[future]
+                    try:
+                        entries = future.result()
+                    except Exception as e:
+                        print(f"    WARNING: could not list folder {folder['fullName']}: {e}")
+                        continue
+                    self._collect_jobs(entries, folder['fullName'], self._rebase_url(folder['url']),
+                                       self.folder_depth, jobs, next_frontier)
+            frontier = next_frontier
+        
+        if folders_walked:
+            print(f"Listed {folders_walked} folders nested deeper than {self.folder_depth} levels")
+        return jobs
+
+    def _collect_jobs(self, entries: List[Dict], parent: str, parent_url: str, depth: int,
+                      jobs: List[Dict], frontier: List[Dict]) -> None:
+        """Sort one tree level into leaf jobs and folders left to expand"""
+        for index, entry in enumerate(entries):
+            if 'name' not in entry:
+                continue
+            entry.setdefault('fullName', f"{parent}/{entry['name']}" if parent else entry['name'])
+            if 'jobs' in entry:
+                if depth > 1:
+                    folder_url = self._rebase_url(entry['url']) if entry.get('url') \
+                        else self.job_url(entry['fullName'])
+                    self._collect_jobs(entry['jobs'], entry['fullName'], folder_url, depth - 1,
+                                       jobs, frontier)
+                else:
+                    frontier.append(entry)
+            else:
+                jobs.append(self._register_job(entry, parent, parent_url, index))
+
+    def _register_job(self, entry: Dict, parent: str, parent_url: Optional[str] = None,
+                      index: Optional[int] = None) -> Dict:
+        """Remember a leaf job's URL and position so later calls can address it by full name"""
+        entry.setdefault('fullName', f"{parent}/{entry['name']}" if parent else entry['name'])
+        if entry.get('url'):
+            self._job_urls[entry['fullName']] = self._rebase_url(entry['url'])
+        if parent_url is not None and index is not None:
+            self._job_locations[entry['fullName']] = (parent_url, index)
+        return entry
+
+    def _rebase_url(self, url: str) -> str:
+        """Point an API-reported job URL at the Jenkins URL we were given
+
+        Jenkins reports URLs using its configured root URL, which may differ from
+        the one used to reach it (proxy, scheme, hostname), so only the
+        /job/... path is kept.
+        """
+        path = urlparse(url).path
+        index = path.find('/job/')
+        if index < 0:
+            return url.rstrip('/')
+        return f"{self.jenkins_url}{path[index:]}".rstrip('/')
+
+    def job_url(self, job_name: str) -> str:
+        """URL of a job given its name or folder path (e.g. 'folder/sub/job')"""
+        if job_name in self._job_urls:
+            return self._job_urls[job_name]
+        return self.jenkins_url + ''.join(f"/job/{quote(part, safe='')}"
+                                          for part in job_name.split('/'))
+
+    @staticmethod
+    def _safe_filename(job_name: str) -> str:
+        """File name stem for a job; folder separators become underscores"""
+        return job_name.replace('/', '_')
+
+    def _builds_file(self, output_path: Path, job_name: Optional[str] = None) -> Path:
+        """Build data file for a job, or the consolidated file when job_name is None"""
+        compression = COMPRESSIONS[self.compression] if self.compression else ''
+        suffix = f".{self.build_format}{compression}"
+        if job_name is None:
+            return output_path / f"builds{suffix}"
+        return output_path / f"{self._safe_filename(job_name)}_builds{suffix}"
+
+    def _builds_writer(self, output_path: Path, job_name: str
+                       ) -> Union[StreamingBuildsWriter, NdjsonBuildsWriter, JobBuildsWriter]:
+        """Writer for one job's exported builds
+
+        close() keeps the job's builds; discard() drops them, e.g. for a job without
+        the parameter or one interrupted mid-way.
+        """
+        if self.consolidate_builds:
+            with self._stats_lock:
+                if self.shared_builds_writer is None:
+                    self.shared_builds_writer = NdjsonBuildsWriter(
+                        self._builds_file(output_path), self.compression)
+            return self.shared_builds_writer.job_writer(job_name)
+        builds_file = self._builds_file(output_path, job_name)
+        if self.build_format == 'ndjson':
+            return NdjsonBuildsWriter(builds_file, self.compression)
+        return StreamingBuildsWriter(builds_file)
+
+    def _resume_builds_export(self, output_path: Path) -> None:
+        """Reopen the consolidated build data file of an interrupted crawl for appending
+
+        Lines of jobs missing from the checkpoint (finished after it was saved) are
+        dropped first; those jobs are fetched and written again.
+        """
+        builds_file = self._builds_file(output_path)
+        if not builds_file.exists():
+            return
+        kept = builds_file.with_name(builds_file.name + '.tmp')
+        with NdjsonBuildsWriter(kept, self.compression) as writer:
+            for build in iter_ndjson(builds_file, self.compression):
+                if build.get('job') in self.completed_jobs:
+                    writer.write(build)
+        os.replace(kept, builds_file)
+        self.shared_builds_writer = NdjsonBuildsWriter(builds_file, self.compression,
+                                                       append=True)
+        self.shared_builds_writer.count = writer.count
+
+    def _write_builds(self, output_path: Path, job_name: str, builds_data: Dict) -> None:
+        """Export builds that were already fetched"""
+        if self.build_format == 'json':
+            builds_file = self._builds_file(output_path, job_name)
+            builds_file.write_text(json.dumps(builds_data, indent=2), encoding='utf-8')
+            return
+        with self._builds_writer(output_path, job_name) as writer:
+            for build in builds_data['builds']:
+                writer.write(build)
+
+    def _close_builds_export(self) -> None:
+        """Finish the consolidated build data file, if one is open"""
+        if self.shared_builds_writer is not None:
+            self.shared_builds_writer.close()
+            print(f"Build data: {self.shared_builds_writer.count} builds written to "
+                  f"{self.shared_builds_writer.path}")
+            self.shared_builds_writer = None
+
+    def analyze_single_job(self, target_parameter: Union[str, Sequence[str]], max_builds: int = 100,
+                           all_builds: Optional[Dict] = None,
+                           build_sink: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Analyze a single job by its direct URL
+
+        all_builds may carry a payload already returned by _get_all_builds_paginated.
+        build_sink, if given, is called with every build as it is processed.
+        target_parameter may also be a grouping of several parameters.
+        """
+        parameter_label = grouping_name(target_parameter)
+        self.sample_grouping = parse_grouping(target_parameter)
         print(f"Analyzing single job: {self.jenkins_url}")
         print(f"Requesting up to {max_builds} builds...")
         
@@ -125,69 +556,46 @@ class JenkinsJobExporter:
         job_name = self.jenkins_url.split('/job/')[-1].split('/')[0]
         
         try:
-            # Get all builds using pagination if needed
-            all_builds = self._get_all_builds_paginated(max_builds)
-            job_display_name = all_builds.get('job_name', job_name)
-            builds = all_builds['builds']
+            if all_builds is None and self._streaming_enabled():
+                # Builds are parsed page by page and never collected into a list
+                job_display_name, builds = self._paginated_builds(max_builds)
+                job_display_name = job_display_name or job_name
+            else:
+                # Get all builds using pagination if needed
+                if all_builds is None:
+                    all_builds = self._get_single_job_builds(max_builds)
+                job_display_name = all_builds.get('job_name', job_name)
+                builds = all_builds['builds']
+                print(f"Found {len(builds)} builds for job '{job_display_name}'")
             
-            print(f"Found {len(builds)} builds for job '{job_display_name}'")
-            print(f"Looking for parameter: '{target_parameter}'")
+            print(f"Looking for parameter: '{parameter_label}'")
             
-            # Process builds to extract parameter statistics
-            param_stats = {}
-            processed_builds = 0
+            # Reduce builds to compact records, then aggregate over the store
+            job_store = BuildStore(self._tracked_parameters(target_parameter))
+            recent_builds: List[Dict] = []
             
             for build in builds:
-                param_value = self.extract_parameter_value(build, target_parameter)
-                if param_value is not None:
-                    if param_value not in param_stats:
-                        param_stats[param_value] = {
-                            'total_builds': 0,
-                            'successful_builds': 0,
-                            'failed_builds': 0,
-                            'unstable_builds': 0,
-                            'aborted_builds': 0,
-                            'total_duration': 0,
-                            'build_numbers': [],
-                            'jobs': {job_display_name}
-                        }
-                    
-                    stats = param_stats[param_value]
-                    stats['total_builds'] += 1
-                    stats['build_numbers'].append(build.get('number', 'unknown'))
-                    processed_builds += 1
-                    
-                    result = build.get('result', '').upper()
-                    if result == 'SUCCESS':
-                        stats['successful_builds'] += 1
-                    elif result == 'FAILURE':
-                        stats['failed_builds'] += 1
-                    elif result == 'UNSTABLE':
-                        stats['unstable_builds'] += 1
-                    elif result == 'ABORTED':
-                        stats['aborted_builds'] += 1
-                    
-                    duration = build.get('duration', 0)
-                    if duration and duration > 0:
-                        stats['total_duration'] += duration
-            
-            print(f"Processed {processed_builds} builds with parameter '{target_parameter}'")
+                if len(recent_builds) < 3:
+                    recent_builds.append(build)
+                if build_sink is not None:
+                    build_sink(build)
+                job_store.add_build(job_display_name, build)
+            
+            self._commit_job_store(job_store)
+            param_stats = job_store.aggregate(target_parameter, build_numbers=True)
+            processed_builds = sum(stats['total_builds'] for stats in param_stats.values())
+            print(f"Processed {processed_builds} builds with parameter '{parameter_label}'")
             
             if not param_stats:
-                print(f"⚠️  No builds found with parameter '{target_parameter}'")
+                print(f"⚠️  No builds found with parameter '{parameter_label}'")
                 print(f"   Make sure the parameter name is correct and case-sensitive.")
                 
                 # Show available parameters from the first few builds
                 print("\n   Available parameters in recent builds:")
-                for i, build in enumerate(builds[:3]):
+                for i, build in enumerate(recent_builds):
                     if i == 0:
                         print(f"     Build #{build.get('number', 'unknown')}:")
-                    params = []
-                    for action in build.get('actions', []):
-                        if action and 'parameters' in action:
-                            for param in action['parameters']:
-                                if param.get('name') not in params:
-                                    params.append(param.get('name'))
+                    params = list(parameter_index(build))
                     if params:
                         print(f"       {', '.join(params)}")
                         break
@@ -201,89 +609,199 @@ class JenkinsJobExporter:
         except Exception as e:
             raise RuntimeError(f"Failed to analyze Jenkins job: {e}")
 
+    def _get_single_job_builds(self, max_builds: int) -> Dict:
+        """Builds for --single-job mode, served from the cache when one is configured"""
+        if self.sample:
+            job_name = self.jenkins_url.split('/job/')[-1].split('/')[0]
+            return {'job_name': job_name,
+                    'builds': self._sample_job_builds(job_name, f"{self.jenkins_url}/api/json",
+                                                      max_builds)}
+        if self.cache is None:
+            return self._get_all_builds_paginated(max_builds)
+        job_name = self.jenkins_url.split('/job/')[-1].split('/')[0]
+        builds = self._get_builds_incremental(self.jenkins_url, max_builds)
+        print(f"Total builds available (cached + new): {len(builds)}")
+        builds = self.window.clip(builds)[0]
+        return {'job_name': job_name, 'builds': builds}
+
     def _get_all_builds_paginated(self, max_builds: int) -> Dict:
         """Get job builds using pagination to bypass Jenkins API limits"""
+        job_name, builds = self._paginated_builds(max_builds)
+        all_builds = list(builds)
+        print(f"Total builds fetched: {len(all_builds)}")
+        
+        return {
+            'job_name': job_name,
+            'builds': all_builds
+        }
+
+    def _paginated_builds(self, max_builds: int) -> Tuple[str, Iterator[Dict]]:
+        """Probe the job, then return its name and a lazy iterator over its builds"""
         url = f"{self.jenkins_url}/api/json"
         
-        # First, get basic job info and total build count
-        basic_params = {'tree': 'name,builds[number]'}
-        response = self.session.get(url, params=basic_params)
+        # First and last build numbers bound the build count without listing every build
+        response = self._get(url, {'tree': 'name,firstBuild[number],lastBuild[number]'})
         response.raise_for_status()
         basic_data = response.json()
         
         job_name = basic_data.get('name', 'Unknown')
-        total_builds_available = len(basic_data.get('builds', []))
+        first_build = (basic_data.get('firstBuild') or {}).get('number')
+        last_build = (basic_data.get('lastBuild') or {}).get('number')
+        if first_build is None or last_build is None:
+            total_builds_available = 0
+        else:
+            total_builds_available = last_build - first_build + 1
         
-        print(f"Job has {total_builds_available} total builds available")
+        # Deleted builds leave gaps, so this is an upper bound; short pages end the fetch
+        print(f"Job has up to {total_builds_available} builds available")
         
         # Determine how many builds to actually fetch
         builds_to_fetch = min(max_builds, total_builds_available)
         print(f"Fetching {builds_to_fetch} builds...")
         
-        all_builds = []
-        page_size = 100  # Jenkins API limit per request
+        self.history_coverage = HistoryCoverage(first_build, last_build)
+        return job_name, self._iter_build_pages(url, builds_to_fetch, self.history_coverage)
+
+    def _iter_build_pages(self, url: str, builds_to_fetch: int,
+                          coverage: Optional[HistoryCoverage] = None) -> Iterator[Dict]:
+        """Yield builds in order while up to page_fanout pages are fetched concurrently
+
+        At most page_fanout pages are held in memory, also when --stream is enabled.
+        If coverage is given, it is filled in and reported once the last page is read.
+        """
+        next_start = 0
+        fetched = 0
+        stop = 'max-builds'
+        sizer = self.page_sizer.for_job()
         
-        for start_index in range(0, builds_to_fetch, page_size):
-            # Calculate end index (inclusive) for this page
-            end_index = min(start_index + page_size - 1, builds_to_fetch - 1)
-            
-            print(f"  Fetching builds {start_index}-{end_index} (requesting {end_index - start_index + 1} builds)...")
-            
-            # Get builds for this page
-            # Jenkins range syntax: {start,end} where both are inclusive
-            params = {
-                'tree': f'builds[number,result,duration,timestamp,actions[parameters[name,value]]]{{{start_index},{end_index}}}'
-            }
-            
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            page_data = response.json()
+        def fetch_page(start: int, end: int) -> List[Dict]:
+            self.rate_limiter.wait()
+            return self._fetch_page(url, start, end, sizer)
+        
+        with ThreadPoolExecutor(max_workers=self.page_fanout) as pool:
+            pending: Deque[Tuple[Tuple[int, int], 'Future[List[Dict]]']] = deque()
             
-            page_builds = page_data.get('builds', [])
-            all_builds.extend(page_builds)
+            def submit_next() -> None:
+                # Each page is sized when it is dispatched, from what earlier pages showed
+                nonlocal next_start
+                if next_start >= builds_to_fetch:
+                    return
+                start = next_start
+                next_start = min(builds_to_fetch, start + sizer.next_size())
+                pending.append(((start, next_start), pool.submit(fetch_page, start, next_start)))
             
-            print(f"    Got {len(page_builds)} builds (total so far: {len(all_builds)})")
+            for _ in range(self.page_fanout):
+                submit_next()
             
-            # Break if we got fewer builds than expected (reached end of available builds)
-            if len(page_builds) < (end_index - start_index + 1):
-                print(f"    Reached end of available builds")
-                break
-            
-            # Add small delay between requests
-            if self.delay > 0:
-                time.sleep(self.delay)
-        
-        print(f"Total builds fetched: {len(all_builds)}")
+            while pending:
+                (start, end), future = pending.popleft()
+                page = future.result()
+                builds, passed = self.window.clip(page)
+                fetched += len(builds)
+                if coverage is not None:
+                    coverage.add(builds)
+                print(f"  Builds {start}-{end - 1}: got {len(builds)} (total so far: {fetched})")
+                if passed or len(page) < end - start:
+                    stop = 'window' if passed else 'end'
+
+                    # Reached end of available builds (or of the time window);
+                    # later pages would be empty or older
+                    for _, later in pending:
+                        later.cancel()
+                    pending.clear()
+                else:
+                    submit_next()
+                yield from builds
         
-        return {
-            'job_name': job_name,
-            'builds': all_builds
-        }
+        if coverage is not None:
+            coverage.stop = stop
+            self.print_history_coverage(coverage)
 
     def export_jobs_with_stats(self, 
                              output_dir: str, 
-                             target_parameter: str,
+                             target_parameter: Union[str, Sequence[str]],
                              max_jobs: Optional[int] = None,
                              max_builds: int = 100,
                              job_filter: Optional[str] = None,
                              export_configs: bool = False,
                              export_build_data: bool = False,
-                             single_job: bool = False) -> Dict:
-        """Export jobs and collect statistics grouped by parameter"""
+                             single_job: bool = False,
+                             bulk: bool = False,
+                             bulk_max_builds: int = DEFAULT_BULK_MAX_BUILDS,
+                             group_by: Optional[Sequence[Union[str, Sequence[str]]]] = None,
+                             resume: bool = False,
+                             checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+                             max_retries: int = DEFAULT_MAX_RETRIES,
+                             since: Optional[int] = None,
+                             until: Optional[int] = None) -> Dict:
+        """Export jobs and collect statistics grouped by parameter
+
+        With bulk=True, builds for runs of sibling jobs are fetched in one request
+        each, with at most bulk_max_builds builds per response.
+
+        group_by lists further groupings, each a parameter name or a tuple of names
+        (or 'a,b'), computed from the same crawl and saved to their own
+        statistics_by_* files. Returns the statistics for target_parameter; all
+        groupings are kept in self.grouped_stats. With a bucket set, per-value
+        time series also go to trends_by_* files and self.grouped_trends.
+
+        Multi-job crawls save a checkpoint to the output directory every
+        checkpoint_interval seconds (0 = only on interruption or failure); with
+        resume=True the crawl continues from it. Jobs failing with transient errors
+        are retried up to max_retries times with exponential backoff.
+
+        since/until (epoch milliseconds) keep only builds started in that window;
+        paging stops at the first page reaching back past since.
+        """
         
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
+        groupings = list(dict.fromkeys(
+            parse_grouping(spec) for spec in [target_parameter, *(group_by or [])]))
+        target_parameter = groupings[0]
+        parameter_label = ', '.join(grouping_name(grouping) for grouping in groupings)
+        self.build_store = BuildStore([name for grouping in groupings for name in grouping],
+                                      top_k=self.top_k)
+        self.grouped_stats = {}
+        self.grouped_trends = {}
+        self.completed_jobs = set()
+        self.window = TimeWindow(since, until)
+        self.truncated_jobs = 0
+        self.sample_grouping = target_parameter
+        self.sample_counts = {'jobs': 0, 'sampled': 0, 'available': 0}
+        self.sample_design = SampleDesign()
+        if self.window:
+            print(f"Time window: {self.window.describe()}")
         
         if single_job:
             # Analyze single job mode
-            aggregated_stats = self.analyze_single_job(target_parameter, max_builds)
+            all_builds = None
+            if export_build_data and self._streaming_enabled():
+                # Builds are written as they are parsed
+                job_name = self.jenkins_url.split('/job/')[-1].split('/')[0]
+                writer = self._builds_writer(output_path, job_name)
+                try:
+                    aggregated_stats = self.analyze_single_job(target_parameter, max_builds,
+                                                               build_sink=writer.write)
+                except BaseException:
+                    writer.discard()
+                    raise
+                if aggregated_stats:
+                    writer.close()
+                    self._count_request('saved')
+                else:
+                    writer.discard()
+            else:
+                if export_build_data:
+                    # Fetch once and share the payload between the analysis and the export
+                    all_builds = self._get_single_job_builds(max_builds)
+                aggregated_stats = self.analyze_single_job(target_parameter, max_builds, all_builds)
             
-            if export_build_data and aggregated_stats:
+            if export_build_data and aggregated_stats and all_builds is not None:
                 # Export build data for single job
                 job_name = self.jenkins_url.split('/job/')[-1].split('/')[0]
-                builds_data = self.get_job_builds_direct(max_builds)
-                builds_file = output_path / f"{job_name}_builds.json"
-                builds_file.write_text(json.dumps(builds_data, indent=2), encoding='utf-8')
+                self._write_builds(output_path, job_name, {'builds': all_builds['builds']})
+                self._count_request('saved')
             
         else:
             # Multi-job analysis mode (original behavior)
@@ -293,158 +811,839 @@ class JenkinsJobExporter:
                 print("No jobs found matching criteria")
                 return {}
             
-            aggregated_stats = {}
+            for job in jobs:
+                job.setdefault('fullName', job['name'])
+            
+            checkpoint = CrawlCheckpoint(
+                output_path, self.jenkins_url, self.build_store.parameters,
+                {'max_builds': max_builds, 'since': since, 'until': until,
+                 'groupings': [list(grouping) for grouping in groupings]})
+            total_jobs = len(jobs)
+            if resume and checkpoint.exists():
+                _, self.completed_jobs = checkpoint.load(self.build_store)
+                saved_window = TimeWindow(checkpoint.saved_options.get('since'),
+                                          checkpoint.saved_options.get('until'))
+                if (saved_window.since, saved_window.until) != (since, until):
+                    # Relative bounds such as '7d' move between runs; every job keeps
+                    # the window the checkpoint's jobs were fetched with
+                    print(f"Checkpoint was saved for builds from {saved_window.describe()}; "
+                          f"resuming with that time window")
+                    self.window = saved_window
+                if checkpoint.sample_design is not None:
+                    self.sample_design.update(checkpoint.sample_design)
+                jobs = [job for job in jobs if job['fullName'] not in self.completed_jobs]
+                if export_build_data and self.consolidate_builds:
+                    self._resume_builds_export(output_path)
+                print(f"Resuming from {checkpoint.path}: {total_jobs - len(jobs)} of "
+                      f"{total_jobs} jobs already done")
+            else:
+                if resume:
+                    print(f"No checkpoint in {output_path}; starting from the beginning")
+                checkpoint.start()
+            self.checkpoint = checkpoint
+            resumed_count = total_jobs - len(jobs)
+            
+            if self.prune_jobs:
+                jobs = self._prune_jobs(jobs, self.build_store.parameters)
+            
+            # Jobs whose last build matches the cache are served from it without a request
+            unchanged_jobs: List[Dict] = []
+            if self.skip_unchanged:
+                jobs, unchanged_jobs = self._probe_jobs(jobs)
+            
             processed_count = 0
+            retry_queue: List[Dict] = []
+            failed_jobs: Dict[str, str] = {}
+            last_checkpoint = time.monotonic()
             
             print(f"\nProcessing {len(jobs)} jobs...")
-            print(f"Looking for parameter: '{target_parameter}'")
+            print(f"Looking for parameter: '{parameter_label}'")
             print(f"Max builds per job: {max_builds}")
             
-            for i, job in enumerate(jobs, 1):
-                job_name = job['name']
-                print(f"[{i:3d}/{len(jobs)}] Processing: {job_name}")
+            def export_job(job: Dict) -> Dict:
+                # Global rate limit shared by all workers
+                self.rate_limiter.wait()
+                return self._export_single_job(job['fullName'], output_path, target_parameter,
+                                               max_builds, export_configs, export_build_data)
+            
+            def finish_async_job(job: Dict, payload: Dict) -> Dict:
+                return self._export_single_job(job['fullName'], output_path, target_parameter,
+                                               max_builds, export_configs, export_build_data,
+                                               **payload)
+            
+            def job_done(job: Dict, job_stats: Dict) -> None:
+                nonlocal processed_count, last_checkpoint
+                if job_stats:
+                    processed_count += 1
+                if self.skip_unchanged and job['fullName'] in self.completed_jobs:
+                    self._store_job_state(job)
+                if checkpoint_interval and time.monotonic() - last_checkpoint >= checkpoint_interval:
+                    self._save_checkpoint(checkpoint, failed_jobs)
+                    last_checkpoint = time.monotonic()
+            
+            def job_failed(job: Dict, error: Exception) -> None:
+                print(f"    ERROR: {error}")
+                if is_transient(error) and len(retry_queue) < RETRY_QUEUE_SIZE:
+                    retry_queue.append(job)
+                else:
+                    failed_jobs[job['fullName']] = str(error)
+            
+            def collect(futures: Dict['Future[Dict]', Dict],
+                        finish: Optional[Callable[[Dict, Dict], Dict]] = None) -> None:
+                for i, future in enumerate(as_completed(futures), 1):
+                    job = futures[future]
+                    print(f"[{i:3d}/{len(jobs)}] Processed: {job['fullName']}")
+                    try:
+                        job_stats = future.result()
+                        if finish is not None:
+                            job_stats = finish(job, job_stats)
+                    except Exception as e:
+                        job_failed(job, e)
+                        continue
+                    job_done(job, job_stats)
+            
+            try:
+                for job in unchanged_jobs:
+                    job_done(job, self._export_single_job(
+                        job['fullName'], output_path, target_parameter, max_builds,
+                        export_configs, export_build_data,
+                        builds_data={'builds': self._cached_job_builds(job, max_builds)}))
+                
+                if bulk and self.cache is not None:
+                    print("Bulk mode is not combined with --cache; fetching jobs incrementally")
+                    bulk = False
+                if bulk and self.sample:
+                    print("Bulk mode is not combined with --sample; sampling jobs one by one")
+                    bulk = False
+                
+                if bulk:
+                    chunks = self._plan_bulk_chunks(jobs, max_builds, bulk_max_builds)
+                    print(f"Bulk mode: fetching {len(jobs)} jobs in {len(chunks)} requests")
+                    done = 0
+                    with InterruptiblePool(max_workers=self.workers) as pool:
+                        chunk_futures = [pool.submit(self._fetch_bulk_chunk, chunk, max_builds)
+                                         for chunk in chunks]
+                        for future in as_completed(chunk_futures):
+                            for job, builds_data, error in future.result():
+                                done += 1
+                                print(f"[{done:3d}/{len(jobs)}] Processed: {job['fullName']}")
+                                try:
+                                    if error is not None:
+                                        raise error
+                                    job_stats = self._export_single_job(
+                                        job['fullName'], output_path, target_parameter, max_builds,
+                                        export_configs, export_build_data, builds_data=builds_data)
+                                except Exception as e:
+                                    job_failed(job, e)
+                                    continue
+                                job_done(job, job_stats)
+                elif self._async_client is not None:
+                    # One coroutine per job on the client's event loop, no thread per job
+                    futures = {
+                        self._async_client.submit(
+                            self._fetch_job_async(job['fullName'], max_builds, export_configs)): job
+                        for job in jobs
+                    }
+                    collect(futures, finish_async_job)
+                elif self.workers > 1:
+                    print(f"Using {self.workers} concurrent workers")
+                    with InterruptiblePool(max_workers=self.workers) as pool:
+                        collect({pool.submit(export_job, job): job for job in jobs})
+                else:
+                    for i, job in enumerate(jobs, 1):
+                        print(f"[{i:3d}/{len(jobs)}] Processing: {job['fullName']}")
+                        try:
+                            job_stats = export_job(job)
+                        except Exception as e:
+                            job_failed(job, e)
+                            continue
+                        job_done(job, job_stats)
                 
-                # Add delay to be nice to Jenkins
-                if self.delay > 0:
-                    time.sleep(self.delay)
                 
+                self._retry_failed_jobs(retry_queue, export_job, job_done, failed_jobs, max_retries)
+            except BaseException:
+                # Interrupted or crashed: keep everything fetched so far
                 try:
-                    # Export job configuration if requested
-                    if export_configs:
-                        config_xml = self.get_job_config(job_name)
-                        config_file = output_path / f"{job_name}_config.xml"
-                        config_file.write_text(config_xml, encoding='utf-8')
-                    
-                    # Process job builds
-                    job_stats = self.process_job(job_name, target_parameter, max_builds)
-                    
-                    # Export build data if requested
-                    if export_build_data and job_stats:
-                        builds_data = self.get_job_builds(job_name, max_builds)
-                        builds_file = output_path / f"{job_name}_builds.json"
-                        builds_file.write_text(json.dumps(builds_data, indent=2), encoding='utf-8')
-                    
-                    # Merge job stats into aggregated stats
-                    for param_value, stats in job_stats.items():
-                        if param_value not in aggregated_stats:
-                            aggregated_stats[param_value] = {
-                                'total_builds': 0,
-                                'successful_builds': 0,
-                                'failed_builds': 0,
-                                'unstable_builds': 0,
-                                'aborted_builds': 0,
-                                'total_duration': 0,
-                                'jobs': set()
-                            }
-                        
-                        agg_stats = aggregated_stats[param_value]
-                        agg_stats['total_builds'] += stats['total_builds']
-                        agg_stats['successful_builds'] += stats['successful_builds']
-                        agg_stats['failed_builds'] += stats['failed_builds']
-                        agg_stats['unstable_builds'] += stats['unstable_builds']
-                        agg_stats['aborted_builds'] += stats['aborted_builds']
-                        agg_stats['total_duration'] += stats['total_duration']
-                        agg_stats['jobs'].update(stats['jobs'])
-                    
-                    if job_stats:
-                        processed_count += 1
-                        
+                    self._save_checkpoint(checkpoint, failed_jobs)
+                    print(f"\nCheckpoint saved to {checkpoint.path}; "
+                          f"rerun with --resume to continue")
+                finally:
+                    self.checkpoint = None
+                    checkpoint.close()
+                raise
+            
+            self.checkpoint = None
+            if failed_jobs:
+                self._save_checkpoint(checkpoint, failed_jobs)
+                checkpoint.close()
+                print(f"\n{len(failed_jobs)} jobs failed; checkpoint saved to {checkpoint.path}, "
+                      f"rerun with --resume to fetch only those")
+            else:
+                checkpoint.remove()
+            
+            resumed = f" (+{resumed_count} from checkpoint)" if resumed_count else ""
+            print(f"\nSuccessfully processed {processed_count}/{len(jobs) + len(unchanged_jobs)} "
+                  f"jobs{resumed}")
+            if bulk and self.bulk_fallbacks:
+                print(f"Bulk mode: {self.bulk_fallbacks} jobs fell back to per-job requests")
+        
+        self._close_builds_export()
+        print(f"API requests: {self.request_counts['made']} made, "
+              f"{self.request_counts['saved']} saved by reusing fetched build data")
+        if self.cache is not None:
+            counts = self.cache.counts
+            print(f"Build cache: {counts['cached_builds']} builds served from cache, "
+                  f"{counts['new_builds']} new, {counts['repolled_builds']} re-polled")
+        if self.throttle is not None:
+            self.print_throttle_summary()
+        if self.verbose:
+            self.print_page_summary()
+        if self.sample:
+            counts = self.sample_counts
+            print(f"Sampling: {counts['sampled']} of up to {counts['available']} builds fetched "
+                  f"from {counts['jobs']} jobs (target +/-{self.precision:.1%} at 95% confidence)")
+        if self.truncated_jobs:
+            print(f"{self.truncated_jobs} jobs returned the full {max_builds} builds and may have "
+                  f"older history (raise -b/--max-builds)")
+        
+        # Every grouping is aggregated from the one store filled by the crawl
+        for grouping in groupings:
+            name = grouping_name(grouping)
+            stats = self.build_store.aggregate(
+                grouping, build_numbers=single_job, top_k=self.top_k, duration_sketches=True,
+                sample_design=self.sample_design if self.sample else None)
+            self.grouped_stats[name] = stats
+            if stats:
+                self.save_statistics(stats, output_path, name)
+                if self.bucket:
+                    trend = self.build_store.aggregate_trend(grouping, self.bucket,
+                                                             top_k=self.top_k)
+                    self.grouped_trends[name] = trend
+                    self.save_trend(trend, output_path, name)
+                self.print_summary(stats, name if len(groupings) > 1 else None)
+            else:
+                print(f"No builds found with parameter '{name}'")
+        
+        if self.columnar_format and len(self.build_store):
+            builds_file = write_table(builds_table(self.build_store), output_path / 'builds',
+                                      self.columnar_format)
+            print(f"Build records: {len(self.build_store)} builds written to {builds_file}")
+        
+        return self.grouped_stats[grouping_name(target_parameter)]
+
+    def _prune_jobs(self, jobs: List[Dict], parameters: Sequence[str]) -> List[Dict]:
+        """Drop jobs whose definitions declare none of the tracked parameters
+
+        Jobs that reported no properties at all are kept, since nothing is known
+        about them.
+        """
+        wanted = set(parameters)
+        kept = []
+        for job in jobs:
+            properties = job.get('property')
+            declared = {definition.get('name')
+                        for prop in properties or [] if isinstance(prop, dict)
+                        for definition in prop.get('parameterDefinitions') or []}
+            if properties is None or declared & wanted:
+                kept.append(job)
+        self.pruned_jobs = len(jobs) - len(kept)
+        print(f"Pruned {self.pruned_jobs} jobs that declare none of: {', '.join(parameters)}")
+        return kept
+
+    def _probe_jobs(self, jobs: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Split discovered jobs into (to fetch, unchanged) and drop disabled and never-built jobs
+
+        A job is unchanged when its last build is the one recorded when it was last
+        fetched and none of its cached builds were still running.
+        """
+        to_fetch: List[Dict] = []
+        unchanged: List[Dict] = []
+        for job in jobs:
+            last_build = job.get('lastBuild')
+            if job.get('buildable') is False or str(job.get('color', '')).startswith('disabled'):
+                self.skipped_jobs['disabled'] += 1
+            elif 'lastBuild' in job and not last_build:
+                self.skipped_jobs['never built'] += 1
+            elif last_build and self._job_unchanged(job, last_build):
+                self.skipped_jobs['unchanged'] += 1
+                unchanged.append(job)
+            else:
+                to_fetch.append(job)
+        print(f"Change probe: {len(to_fetch)} jobs to fetch, {len(unchanged)} unchanged since "
+              f"the last run, {self.skipped_jobs['disabled']} disabled and "
+              f"{self.skipped_jobs['never built']} never built skipped")
+        return to_fetch, unchanged
+
+    def _job_unchanged(self, job: Dict, last_build: Dict) -> bool:
+        cache = self._require_cache()
+        url = self.job_url(job['fullName'])
+        state = cache.job_state(url)
+        return (state == (last_build.get('number'), last_build.get('timestamp'))
+                and not cache.running_numbers(url))
+
+    def _cached_job_builds(self, job: Dict, max_builds: int) -> List[Dict]:
+        cache = self._require_cache()
+        builds = cache.get_builds(self.job_url(job['fullName']), max_builds)
+        cache.count('cached_builds', len(builds))
+        return self.window.clip(builds)[0]
+
+    def _store_job_state(self, job: Dict) -> None:
+        """Record the last build seen by discovery once a job's builds are in the cache"""
+        last_build = job.get('lastBuild')
+        if last_build and last_build.get('number') is not None:
+            self._require_cache().store_job_state(self.job_url(job['fullName']),
+                                                  last_build['number'],
+                                                  last_build.get('timestamp'))
+
+    def _save_checkpoint(self, checkpoint: CrawlCheckpoint, failed_jobs: Dict[str, str]) -> None:
+        """Flush the job segments appended since the last save, with the jobs left failed"""
+        checkpoint.save(failed_jobs)
+
+    def _retry_failed_jobs(self, queue: List[Dict], export_job: Callable[[Dict], Dict],
+                           job_done: Callable[[Dict, Dict], None], failed_jobs: Dict[str, str],
+                           max_retries: int) -> None:
+        """Retry jobs that failed transiently, backing off exponentially between rounds"""
+        for attempt in range(1, max_retries + 1):
+            if not queue:
+                return
+            pause = min(RETRY_MAX_BACKOFF, RETRY_BACKOFF * 2 ** (attempt - 1))
+            print(f"\nRetrying {len(queue)} failed jobs in {pause:.0f}s "
+                  f"(attempt {attempt}/{max_retries})")
+            time.sleep(pause)
+            pending = list(queue)
+            queue.clear()
+            for job in pending:
+                try:
+                    job_stats = export_job(job)
                 except Exception as e:
-                    print(f"    ERROR: {e}")
+                    print(f"    {job['fullName']}: ERROR: {e}")
+                    if is_transient(e):
+                        queue.append(job)
+                    else:
+                        failed_jobs[job['fullName']] = str(e)
                     continue
-            
-            print(f"\nSuccessfully processed {processed_count}/{len(jobs)} jobs")
+                print(f"    {job['fullName']}: OK")
+                job_done(job, job_stats)
+        for job in queue:
+            failed_jobs[job['fullName']] = f"still failing after {max_retries} retries"
+        queue.clear()
+
+    def _export_single_job(self, job_name: str, output_path: Path,
+                           target_parameter: Union[str, Sequence[str]],
+                           max_builds: int, export_configs: bool, export_build_data: bool,
+                           config_xml: Optional[str] = None,
+                           builds_data: Optional[Dict] = None) -> Dict:
+        """Fetch, export and analyze one job; safe to run from worker threads
+
+        config_xml and builds_data may be passed in when they were already
+        fetched (e.g. by the async backend) to skip the corresponding requests.
+        """
+        # Export job configuration if requested
+        if export_configs:
+            if config_xml is None:
+                config_xml = self.get_job_config(job_name)
+            config_file = output_path / f"{self._safe_filename(job_name)}_config.xml"
+            config_file.write_text(config_xml, encoding='utf-8')
         
-        if aggregated_stats:
-            self.save_statistics(aggregated_stats, output_path, target_parameter)
-            self.print_summary(aggregated_stats)
-        else:
-            print(f"No builds found with parameter '{target_parameter}'")
+        if builds_data is None and self._streaming_enabled():
+            return self._export_job_streaming(job_name, output_path, target_parameter,
+                                              max_builds, export_build_data)
+        
+        # Fetch builds once; the same payload feeds the statistics and the export
+        if builds_data is None:
+            builds_data = self.get_job_builds(job_name, max_builds)
+        
+        def export_builds(job_stats: Dict, builds_data: Dict) -> None:
+            # Written before the job counts as completed, so a resumed crawl never misses them
+            if job_stats:
+                self._count_request('saved')
+                self._write_builds(output_path, job_name, builds_data)
         
-        return aggregated_stats
+        job_stats = self.process_job(job_name, target_parameter, max_builds, builds_data,
+                                     before_commit=export_builds if export_build_data else None)
+        
+        return job_stats
 
-    def get_job_builds_direct(self, max_builds: int = 100) -> Dict:
-        """Get job build history directly from job URL"""
-        url = f"{self.jenkins_url}/api/json"
-        params = {
-            'tree': f'builds[number,result,duration,timestamp,actions[parameters[name,value]]]{{0,{max_builds}}}'
-        }
-        response = self.session.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+    def _export_job_streaming(self, job_name: str, output_path: Path,
+                              target_parameter: Union[str, Sequence[str]],
+                              max_builds: int, export_build_data: bool) -> Dict:
+        """Feed each build straight from the response body into the statistics
+
+        With export_build_data, builds are written to disk as they arrive instead of
+        being kept in memory.
+        """
+        job_store = BuildStore(self._tracked_parameters(target_parameter))
+        writer = self._builds_writer(output_path, job_name) if export_build_data else None
+        try:
+            for build in self._iter_job_builds(f"{self.job_url(job_name)}/api/json", max_builds):
+                if writer is not None:
+                    writer.write(build)
+                job_store.add_build(job_name, build)
+        except BaseException:
+            if writer is not None:
+                writer.discard()
+            raise
+        job_stats = job_store.aggregate(target_parameter)
+        
+        # Builds are written before the job counts as completed, so a resumed crawl never
+        # misses them (and drops any written for a job the checkpoint doesn't list)
+        if writer is not None:
+            if job_stats:
+                writer.close()
+                self._count_request('saved')
+            else:
+                # Match the non-streaming export, which skips jobs without the parameter
+                writer.discard()
+        self._commit_job_store(job_store, job_name)
+        return job_stats
+
+    def _plan_bulk_chunks(self, jobs: List[Dict], max_builds: int,
+                          bulk_max_builds: int) -> List[List[Dict]]:
+        """Group jobs into runs of siblings that one jobs[...]{a,b} query can cover
+
+        Jobs without a known position (not found by discovery) get a chunk of their own
+        and are fetched individually.
+        """
+        jobs_per_request = max(1, bulk_max_builds // max(1, max_builds))
+        by_parent: Dict[str, List[Tuple[int, Dict]]] = {}
+        chunks: List[List[Dict]] = []
+        for job in jobs:
+            location = self._job_locations.get(job['fullName'])
+            if location is None:
+                chunks.append([job])
+            else:
+                by_parent.setdefault(location[0], []).append((location[1], job))
+        
+        for siblings in by_parent.values():
+            siblings.sort(key=lambda item: item[0])
+            chunk: List[Dict] = []
+            first_index = 0
+            for index, job in siblings:
+                # The span covers every sibling between the first and last job,
+                # including ones filtered out, so bound the span and not the count
+                if chunk and index - first_index >= jobs_per_request:
+                    chunks.append(chunk)
+                    chunk = []
+                if not chunk:
+                    first_index = index
+                chunk.append(job)
+            if chunk:
+                chunks.append(chunk)
+        return chunks
+
+    def _fetch_bulk_chunk(self, chunk: List[Dict], max_builds: int) -> List[Tuple]:
+        """Fetch builds for a chunk of sibling jobs in one request
+
+        Returns (job, builds_data, error) tuples. Jobs missing from the bulk
+        response, or the whole chunk if the bulk request fails, fall back to
+        one get_job_builds request per job.
+        """
+        self.rate_limiter.wait()
+        results = {}
+        location = self._job_locations.get(chunk[0]['fullName'])
+        if location is not None:
+            parent_url = location[0]
+            indexes = [self._job_locations[job['fullName']][1] for job in chunk]
+            start, end = min(indexes), max(indexes) + 1
+            params = {'tree': f'jobs[name,{self._builds_tree(0, max_builds)}]{{{start},{end}}}'}
+            try:
+                response = self._get(f"{parent_url}/api/json", params)
+                response.raise_for_status()
+                entries = response.json().get('jobs', [])
+                for job, index in zip(chunk, indexes):
+                    position = index - start
+                    if position < len(entries) and entries[position].get('name') == job['name'] \
+                            and self.builds_field in entries[position]:
+                        listed = entries[position][self.builds_field]
+                        builds, passed = self.window.clip(listed)
+                        if not passed and len(listed) >= max_builds:
+                            self._count_truncated()
+                        results[job['fullName']] = {'builds': builds}
+            except Exception as e:
+                print(f"    WARNING: bulk request for {len(chunk)} jobs failed ({e}); "
+                      f"falling back to per-job requests")
+        
+        fetched = []
+        for job in chunk:
+            builds_data = results.get(job['fullName'])
+            error = None
+            if builds_data is None:
+                with self._stats_lock:
+                    self.bulk_fallbacks += 1
+                try:
+                    builds_data = self.get_job_builds(job['fullName'], max_builds)
+                except Exception as e:
+                    error = e
+            fetched.append((job, builds_data, error))
+        return fetched
+
+    async def _fetch_job_async(self, job_name: str, max_builds: int, export_configs: bool) -> Dict:
+        """Fetch one job's payloads on the async backend"""
+        client = self._async_client
+        if client is None:
+            raise RuntimeError("The async backend is not enabled")
+        await client.throttle(self.rate_limiter)
+        payload: Dict[str, Any] = {}
+        if export_configs:
+            self._count_request()
+            payload['config_xml'] = await client.get_text(
+                f"{self.job_url(job_name)}/config.xml")
+        if self.cache is not None or self.sample:
+            # The incremental cache refresh and sampling are sequential per job;
+            # run them off the loop
+            loop = asyncio.get_running_loop()
+            payload['builds_data'] = await loop.run_in_executor(
+                None, self.get_job_builds, job_name, max_builds)
+            return payload
+        url = f"{self.job_url(job_name)}/api/json"
+        pager = JobPager(max_builds, self.page_sizer.for_job(), self.window)
+        builds: List[Dict] = []
+        page_range = pager.next_range()
+        while page_range is not None:
+            start, end = page_range
+            if pager.pages:
+                await client.throttle(self.rate_limiter)
+            self._count_request()
+            started = time.monotonic()
+            try:
+                response = await client.get(url, {'tree': self._builds_tree(start, end)},
+                                            self.page_timeout)
+                response.raise_for_status()
+            except (requests.exceptions.Timeout, requests.exceptions.HTTPError) as e:
+                if not (self._is_page_timeout(e) and pager.timed_out(start, end)):
+                    raise
+                self._report_split(start, end)
+            else:
+                builds.extend(pager.add_page(start, end,
+                                             response.json().get(self.builds_field, []),
+                                             len(response.content), time.monotonic() - started))
+            page_range = pager.next_range()
+        self._count_truncated(pager)
+        payload['builds_data'] = {'builds': builds}
+        return payload
 
     def get_job_config(self, job_name: str) -> str:
         """Get job configuration XML"""
-        url = f"{self.jenkins_url}/job/{job_name}/config.xml"
-        response = self.session.get(url)
+        url = f"{self.job_url(job_name)}/config.xml"
+        response = self._get(url)
         response.raise_for_status()
         return response.text
 
     def get_job_builds(self, job_name: str, max_builds: int = 100) -> Dict:
         """Get job build history with parameters"""
-        url = f"{self.jenkins_url}/job/{job_name}/api/json"
-        params = {
-            'tree': f'builds[number,result,duration,timestamp,actions[parameters[name,value]]]{{0,{max_builds}}}'
-        }
-        response = self.session.get(url, params=params)
+        if self.cache is not None:
+            job_url = self.job_url(job_name)
+            builds = self._get_builds_incremental(job_url, max_builds)
+            kept, passed = self.window.clip(builds)
+            if not passed and len(builds) >= max_builds \
+                    and not self.cache.history_complete(job_url, self.builds_field):
+                self._count_truncated()
+            return {'builds': kept}
+        if self.sample:
+            return {'builds': self._sample_job_builds(job_name,
+                                                      f"{self.job_url(job_name)}/api/json",
+                                                      max_builds)}
+        return {'builds': list(self._iter_job_builds(f"{self.job_url(job_name)}/api/json",
+                                                     max_builds))}
+
+    def _iter_job_builds(self, url: str, max_builds: int) -> Iterator[Dict]:
+        """Yield up to max_builds builds, newest first, in pages sized by the page sizer
+
+        Builds outside the time window are dropped; paging stops once a page
+        reaches back past its start.
+        """
+        pager = JobPager(max_builds, self.page_sizer.for_job(), self.window)
+        for builds in self._iter_pages(url, pager):
+            yield from builds
+        self._count_truncated(pager)
+
+    def _iter_pages(self, url: str, pager: JobPager) -> Iterator[List[Dict]]:
+        """Fetch the pages a JobPager asks for and yield each page's builds
+
+        Pages after the first wait for the rate limiter; the caller paces the first.
+        """
+        page_range = pager.next_range()
+        while page_range is not None:
+            start, end = page_range
+            if pager.pages:
+                self.rate_limiter.wait()
+            params = {'tree': self._builds_tree(start, end)}
+            measured = {'bytes': 0}
+            started = time.monotonic()
+            try:
+                page = list(self._iter_builds_response(url, params, measured))
+            except (requests.exceptions.Timeout, requests.exceptions.HTTPError) as e:
+                if not (self._is_page_timeout(e) and pager.timed_out(start, end)):
+                    raise
+                self._report_split(start, end)
+            else:
+                yield pager.add_page(start, end, page, measured['bytes'],
+                                     time.monotonic() - started)
+            page_range = pager.next_range()
+
+    def _report_split(self, start: int, end: int) -> None:
+        if self.verbose:
+            print(f"    Builds {start}-{end - 1} timed out; fetching in two halves")
+
+    def _count_truncated(self, pager: Optional[JobPager] = None) -> None:
+        """Count a job whose fetch stopped at max_builds, so it may have older history"""
+        if pager is None or pager.truncated:
+            with self._stats_lock:
+                self.truncated_jobs += 1
+
+    def _sample_job_builds(self, job_name: str, url: str, max_builds: int) -> List[Dict]:
+        """Fetch a stratified sample of a job's last max_builds builds, newest first
+
+        Rounds of pages are fetched until the success rate of every common value of
+        the sampled grouping is within +/- precision, or the whole range is fetched.
+        Each page is recorded in sample_design so the statistics can be weighted.
+        """
+        response = self._get(url, {'tree': 'firstBuild[number],lastBuild[number]'})
+        response.raise_for_status()
+        data = response.json()
+        first_build = (data.get('firstBuild') or {}).get('number')
+        last_build = (data.get('lastBuild') or {}).get('number')
+        available = 0 if first_build is None or last_build is None else last_build - first_build + 1
+        sampler = StratifiedSampler(min(max_builds, available))
+        design = SampleDesign()
+        design.add_job(job_name, sampler)
+        grouping = self.sample_grouping or ()
+        store = BuildStore(list(grouping))
+        builds: List[Dict] = []
+        sizer = self.page_sizer.for_job()
+        
+        def fetch_page(page_range: Tuple[int, int]) -> List[Dict]:
+            self.rate_limiter.wait()
+            return self._fetch_page(url, *page_range, sizer)
+        
+        with ThreadPoolExecutor(max_workers=self.page_fanout) as pool:
+            while not sampler.exhausted:
+                page_ranges = sampler.next_round()
+                for page_range, page in zip(page_ranges, pool.map(fetch_page, page_ranges)):
+                    page = self.window.clip(page)[0]
+                    builds.extend(page)
+                    store.add_builds(job_name, page)
+                    design.add_page(job_name, sampler.stratum_of[page_range], page)
+                stats = store.aggregate(grouping, sample_design=design) if grouping else {}
+                if precise_enough(stats, len(builds), self.precision):
+                    break
+        
+        with self._stats_lock:
+            self.sample_design.update(design)
+            self.sample_counts['jobs'] += 1
+            self.sample_counts['sampled'] += len(builds)
+            self.sample_counts['available'] += min(max_builds, available)
+        builds.sort(key=lambda build: build.get('number', 0), reverse=True)
+        return builds
+
+    def _builds_tree(self, start: int, end: int) -> str:
+        """Tree query for builds {start,end}, newest first
+
+        Jenkins range syntax: start inclusive, end exclusive.
+        """
+        return f'{self.builds_field}[{BUILD_FIELDS}]{{{start},{end}}}'
+
+    def _fetch_page(self, url: str, start: int, end: int, sizer: PageSizer) -> List[Dict]:
+        """Fetch builds {start,end} and feed the job's page sizer
+
+        A page that times out (after page_timeout seconds, or with a gateway error) is
+        split in half, down to the minimum page size, and the halves are fetched in turn.
+        """
+        pager = JobPager(end, sizer, start=start, fixed=True)
+        return [build for builds in self._iter_pages(url, pager) for build in builds]
+
+    @staticmethod
+    def _is_page_timeout(error: Exception) -> bool:
+        """Timeouts, and gateway errors that usually mean the page was too slow to render"""
+        if isinstance(error, requests.exceptions.Timeout):
+            return True
+        response = getattr(error, 'response', None)
+        return response is not None and response.status_code in PAGE_TIMEOUT_STATUSES
+
+    def _streaming_enabled(self) -> bool:
+        """Streaming applies to live, unsampled fetches on the requests backend"""
+        return (self.stream and self.cache is None and self._async_client is None
+                and not self.sample)
+
+    def _iter_builds_response(self, url: str, params: Dict,
+                              measured: Optional[Dict] = None) -> Iterator[Dict]:
+        """Yield the builds of one API response, parsing the body incrementally if streaming
+
+        If measured is given, measured['bytes'] is set to the size of the response body.
+        """
+        if not self._streaming_enabled():
+            response = self._get(url, params, timeout=self.page_timeout)
+            response.raise_for_status()
+            if measured is not None:
+                measured['bytes'] = len(response.content)
+            yield from response.json().get(self.builds_field, [])
+            return
+        
+        def counted(chunks: Iterator[bytes]) -> Iterator[bytes]:
+            for chunk in chunks:
+                if measured is not None:
+                    measured['bytes'] += len(chunk)
+                yield chunk
+        
+        with self._get(url, params, stream=True, timeout=self.page_timeout) as response:
+            response.raise_for_status()
+            yield from iter_array_items(
+                counted(response.iter_content(chunk_size=STREAM_CHUNK_SIZE)), self.builds_field)
+
+    def _require_cache(self) -> BuildCache:
+        """The build cache, for code paths that only run with --cache"""
+        if self.cache is None:
+            raise RuntimeError("The build cache is not enabled")
+        return self.cache
+
+    def _fetch_build(self, job_url: str, number: int) -> Optional[Dict]:
+        """Fetch one build, or None if it has been deleted"""
+        response = self._get(f"{job_url}/{number}/api/json", {'tree': BUILD_FIELDS})
+        if response.status_code == 404:
+            return None
         response.raise_for_status()
-        return response.json()
+        build: Dict = response.json()
+        return build
+
+    def _get_builds_incremental(self, job_url: str, max_builds: int) -> List[Dict]:
+        """Top up the cache with new builds and re-poll unfinished ones
+
+        Builds come back newest first, so paging stops at the first build that is
+        already cached. Pages start small and grow like any other job's pages, keeping
+        the steady state (a handful of new builds) to a single request per job. If fewer than
+        max_builds are cached, older builds are backfilled unless the job's
+        history is known to be complete or the cache already reaches past --since.
+        """
+        cache = self._require_cache()
+        latest = cache.latest_number(job_url)
+        
+        if latest is None:
+            pager = JobPager(max_builds, self.page_sizer.for_job())
+            builds = self._page_into_cache(job_url, pager)
+            cache.count('new_builds', len(builds))
+            return builds
+        
+        new_builds = []
+        seen: Dict[Optional[int], Dict] = {}
+        # New builds are stored together below: a partial top-up would leave a gap under
+        # the newest cached build that later runs would never fill
+        pager = JobPager(max_builds, self.page_sizer.for_job(INCREMENTAL_PAGE_SIZE))
+        for page in self._iter_pages(f"{job_url}/api/json", pager):
+            seen.update((build.get('number'), build) for build in page)
+            fresh = [build for build in page if build.get('number', 0) > latest]
+            new_builds.extend(fresh)
+            if len(fresh) < len(page):
+                break
+        
+        # Builds that were still running last time may have finished since; reuse
+        # them from the pages above when possible, otherwise fetch them directly
+        fresh_numbers = {build['number'] for build in new_builds}
+        repolled = []
+        for number in cache.running_numbers(job_url):
+            if number in fresh_numbers:
+                continue
+            build = seen.get(number) or self._fetch_build(job_url, number)
+            if build is None:
+                cache.delete_build(job_url, number)
+            else:
+                repolled.append(build)
+        
+        cache.store_builds(job_url, new_builds + repolled)
+        
+        # The cache holds the newest builds contiguously, so older ones start at its size
+        cached = cache.build_count(job_url)
+        oldest_timestamp = cache.oldest_timestamp(job_url)
+        covers_window = (self.window.since is not None and oldest_timestamp is not None
+                         and oldest_timestamp < self.window.since)
+        if cached < max_builds and not covers_window \
+                and not cache.history_complete(job_url, self.builds_field):
+            pager = JobPager(max_builds, self.page_sizer.for_job(), start=cached)
+            new_builds.extend(self._page_into_cache(job_url, pager,
+                                                    older_than=cache.oldest_number(job_url)))
+        
+        builds = cache.get_builds(job_url, max_builds)
+        cache.count('new_builds', len(new_builds))
+        cache.count('repolled_builds', len(repolled))
+        cache.count('cached_builds', max(0, len(builds) - len(new_builds) - len(repolled)))
+        return builds
+
+    def _page_into_cache(self, job_url: str, pager: JobPager,
+                         older_than: Optional[int] = None) -> List[Dict]:
+        """Fetch the pages a JobPager asks for, storing each page in the cache as it arrives
+
+        Paging stops after the first page reaching back past --since; that page is
+        stored whole, so later runs can tell the cache covers the window. With
+        older_than, only builds numbered below it are kept.
+        """
+        cache = self._require_cache()
+        since = TimeWindow(self.window.since)
+        fetched: List[Dict] = []
+        for page in self._iter_pages(f"{job_url}/api/json", pager):
+            if older_than is not None:
+                page = [build for build in page if build.get('number', 0) < older_than]
+            cache.store_builds(job_url, page)
+            fetched.extend(page)
+            if since.clip(page)[1]:
+                break
+        if pager.stop == 'end':
+            cache.mark_history_complete(job_url, self.builds_field)
+        return fetched
 
     def extract_parameter_value(self, build: Dict, parameter_name: str) -> Optional[str]:
         """Extract specific parameter value from build"""
-        for action in build.get('actions', []):
-            if action and 'parameters' in action:
-                for param in action['parameters']:
-                    if param.get('name') == parameter_name:
-                        return str(param.get('value', ''))
-        return None
+        return extract_parameter_value(build, parameter_name)
+
+    def _tracked_parameters(self, target_parameter: Union[str, Sequence[str]]) -> List[str]:
+        """Parameters recorded in per-job stores; matches the export-wide store"""
+        names = list(parse_grouping(target_parameter)) if not isinstance(target_parameter, str) \
+            else [target_parameter]
+        if self.build_store is not None and set(names) <= set(self.build_store.parameters):
+            return self.build_store.parameters
+        return names
+
+    def _commit_job_store(self, job_store: BuildStore,
+                          job_name: Optional[str] = None) -> None:
+        """Append one job's records to the export-wide store and mark the job completed
+
+        A completed job's records are appended to the checkpoint as well, outside
+        the stats lock so the other workers keep committing meanwhile.
+        """
+        if self.build_store is not None and job_store is not self.build_store:
+            with self._stats_lock:
+                self.build_store.extend(job_store)
+                if job_name is not None:
+                    self.completed_jobs.add(job_name)
+            checkpoint = self.checkpoint
+            if job_name is not None and checkpoint is not None:
+                checkpoint.add_job(job_name, job_store, self.sample_design if self.sample else None)
+
+    def process_job(self, job_name: str, target_parameter: Union[str, Sequence[str]], max_builds: int,
+                    builds_data: Optional[Dict] = None,
+                    before_commit: Optional[Callable[[Dict, Dict], None]] = None) -> Dict:
+        """Process a single job and return its statistics
 
-    def process_job(self, job_name: str, target_parameter: str, max_builds: int) -> Dict:
-        """Process a single job and return its statistics"""
-        job_stats = {}
+        Fetches the job's builds unless an already-fetched builds_data payload is given.
+        The builds are also appended to the export-wide build store; before_commit, if
+        given, is called with the statistics and the payload just before that.
+        """
+        job_store = BuildStore(self._tracked_parameters(target_parameter))
         
         try:
-            builds_data = self.get_job_builds(job_name, max_builds)
+            if builds_data is None:
+                builds_data = self.get_job_builds(job_name, max_builds)
+            
+            job_store.add_builds(job_name, builds_data.get('builds', []))
             
-            for build in builds_data.get('builds', []):
-                param_value = self.extract_parameter_value(build, target_parameter)
-                if param_value is not None:
-                    if param_value not in job_stats:
-                        job_stats[param_value] = {
-                            'total_builds': 0,
-                            'successful_builds': 0,
-                            'failed_builds': 0,
-                            'unstable_builds': 0,
-                            'aborted_builds': 0,
-                            'total_duration': 0,
-                            'jobs': set()
-                        }
-                    
-                    stats = job_stats[param_value]
-                    stats['total_builds'] += 1
-                    stats['jobs'].add(job_name)
-                    
-                    result = build.get('result', '').upper()
-                    if result == 'SUCCESS':
-                        stats['successful_builds'] += 1
-                    elif result == 'FAILURE':
-                        stats['failed_builds'] += 1
-                    elif result == 'UNSTABLE':
-                        stats['unstable_builds'] += 1
-                    elif result == 'ABORTED':
-                        stats['aborted_builds'] += 1
-                    
-                    duration = build.get('duration', 0)
-                    if duration and duration > 0:
-                        stats['total_duration'] += duration
-                        
         except Exception as e:
             print(f"Error processing job {job_name}: {e}")
-            
+            return {}
+        
+        job_stats = job_store.aggregate(target_parameter)
+        if before_commit is not None:
+            before_commit(job_stats, builds_data)
+        self._commit_job_store(job_store, job_name)
         return job_stats
 
-
-
     def save_statistics(self, job_stats: Dict, output_path: Path, parameter_name: str):
         """Save statistical analysis to files"""
         
@@ -452,12 +1651,13 @@ class JenkinsJobExporter:
         stats_for_json = {}
         for param_value, stats in job_stats.items():
             stats_copy = stats.copy()
+            sketch = stats_copy.pop('duration_sketch', None)
             
-            # Handle both multi-job and single-job formats
-            if 'jobs' in stats and isinstance(stats['jobs'], set):
+            # Handle both multi-job and single-job formats; job sets may be JobSet bitsets
+            if 'jobs' in stats and isinstance(stats['jobs'], AbstractSet):
                 stats_copy['jobs'] = list(stats['jobs'])
             elif 'jobs' in stats:
-                stats_copy['jobs'] = list(stats['jobs']) if isinstance(stats['jobs'], (list, set)) else [str(stats['jobs'])]
+                stats_copy['jobs'] = list(stats['jobs']) if isinstance(stats['jobs'], list) else [str(stats['jobs'])]
             else:
                 stats_copy['jobs'] = []
             
@@ -465,13 +1665,23 @@ class JenkinsJobExporter:
             if 'build_numbers' in stats:
                 stats_copy['build_numbers'] = stats['build_numbers']
             
-            stats_copy['success_rate'] = (stats['successful_builds'] / stats['total_builds'] 
-                                        if stats['total_builds'] > 0 else 0)
-            stats_copy['failure_rate'] = (stats['failed_builds'] / stats['total_builds'] 
-                                        if stats['total_builds'] > 0 else 0)
-            stats_copy['avg_duration_ms'] = (stats['total_duration'] / stats['total_builds'] 
-                                           if stats['total_builds'] > 0 else 0)
+            # Sampled statistics already carry weighted estimates
+            if 'success_rate' not in stats:
+                stats_copy['success_rate'] = (stats['successful_builds'] / stats['total_builds'] 
+                                            if stats['total_builds'] > 0 else 0)
+                stats_copy['failure_rate'] = (stats['failed_builds'] / stats['total_builds'] 
+                                            if stats['total_builds'] > 0 else 0)
+                stats_copy['avg_duration_ms'] = (stats['total_duration'] / stats['total_builds'] 
+                                               if stats['total_builds'] > 0 else 0)
             stats_copy['avg_duration_min'] = stats_copy['avg_duration_ms'] / (1000 * 60)
+            if 'avg_duration_ms_ci' in stats:
+                stats_copy['avg_duration_min_ci'] = [ms / (1000 * 60)
+                                                     for ms in stats['avg_duration_ms_ci']]
+            if sketch is not None:
+                for percentile in DURATION_PERCENTILES:
+                    ms = sketch.quantile(percentile / 100) or 0
+                    stats_copy[f'p{percentile}_duration_ms'] = ms
+                    stats_copy[f'p{percentile}_duration_min'] = ms / (1000 * 60)
             stats_for_json[param_value] = stats_copy
         
         # Save JSON
@@ -485,19 +1695,27 @@ class JenkinsJobExporter:
             
             # Determine if we have build numbers (single job mode)
             has_build_numbers = any('build_numbers' in stats for stats in stats_for_json.values())
+            # Sampled statistics carry 95% confidence intervals
+            has_intervals = any('success_rate_ci' in stats for stats in stats_for_json.values())
+            interval_columns = ['Success_Rate_CI', 'Failure_Rate_CI',
+                                'Avg_Duration_Minutes_CI'] if has_intervals else []
+            # Aggregated statistics carry duration percentiles
+            has_percentiles = any('p50_duration_ms' in stats for stats in stats_for_json.values())
+            percentile_columns = [f'P{percentile}_Duration_Minutes'
+                                  for percentile in DURATION_PERCENTILES] if has_percentiles else []
             
             if has_build_numbers:
                 writer.writerow([
                     'Parameter_Value', 'Total_Builds', 'Successful_Builds', 'Failed_Builds',
                     'Unstable_Builds', 'Aborted_Builds', 'Success_Rate', 'Failure_Rate',
                     'Avg_Duration_Minutes', 'Unique_Jobs', 'Build_Numbers'
-                ])
+                ] + percentile_columns + interval_columns)
             else:
                 writer.writerow([
                     'Parameter_Value', 'Total_Builds', 'Successful_Builds', 'Failed_Builds',
                     'Unstable_Builds', 'Aborted_Builds', 'Success_Rate', 'Failure_Rate',
                     'Avg_Duration_Minutes', 'Unique_Jobs', 'Job_List'
-                ])
+                ] + percentile_columns + interval_columns)
             
             # Sort by total builds descending
             sorted_stats = sorted(stats_for_json.items(), 
@@ -505,6 +1723,17 @@ class JenkinsJobExporter:
                                 reverse=True)
             
             for param_value, stats in sorted_stats:
+                percentiles = []
+                if has_percentiles:
+                    percentiles = [f"{stats[f'p{percentile}_duration_min']:.2f}"
+                                   for percentile in DURATION_PERCENTILES]
+                intervals = []
+                if has_intervals:
+                    intervals = [
+                        '{:.2%}-{:.2%}'.format(*stats['success_rate_ci']),
+                        '{:.2%}-{:.2%}'.format(*stats['failure_rate_ci']),
+                        '{:.2f}-{:.2f}'.format(*stats['avg_duration_min_ci']),
+                    ]
                 if has_build_numbers:
                     # Single job mode - show build numbers
                     build_numbers = ', '.join(map(str, stats.get('build_numbers', [])))
@@ -520,7 +1749,7 @@ class JenkinsJobExporter:
                         f"{stats['avg_duration_min']:.2f}",
                         len(stats['jobs']),
                         build_numbers
-                    ])
+                    ] + percentiles + intervals)
                 else:
                     # Multi-job mode - show job list
                     writer.writerow([
@@ -535,28 +1764,120 @@ class JenkinsJobExporter:
                         f"{stats['avg_duration_min']:.2f}",
                         len(stats['jobs']),
                         '; '.join(sorted(stats['jobs']))
-                    ])
+                    ] + percentiles + intervals)
         
         print(f"\nStatistics saved to:")
         print(f"  JSON: {json_file}")
         print(f"  CSV:  {csv_file}")
+        if self.columnar_format:
+            table_file = write_table(statistics_table(stats_for_json),
+                                     output_path / f"statistics_by_{parameter_name}",
+                                     self.columnar_format)
+            print(f"  {self.columnar_format.capitalize()}: {table_file}")
 
-    def print_summary(self, job_stats: Dict):
+    def save_trend(self, trend: Dict, output_path: Path, parameter_name: str) -> None:
+        """Save per-value time series to trends_by_<parameter>_<bucket>.csv"""
+        trend_file = output_path / f"trends_by_{parameter_name}_{self.bucket}.csv"
+        with trend_file.open('w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                'Parameter_Value', 'Bucket_Start', 'Total_Builds', 'Successful_Builds',
+                'Failed_Builds', 'Unstable_Builds', 'Aborted_Builds', 'Success_Rate',
+                'Avg_Duration_Minutes', 'Unique_Jobs'
+            ] + [f'P{percentile}_Duration_Minutes' for percentile in DURATION_PERCENTILES])
+            
+            # Values by total builds descending, each value's buckets in time order
+            sorted_values = sorted(
+                trend.items(),
+                key=lambda x: sum(stats['total_builds'] for stats in x[1].values()),
+                reverse=True)
+            
+            for param_value, series in sorted_values:
+                for bucket_start, stats in series.items():
+                    sketch = stats['duration_sketch']
+                    writer.writerow([
+                        param_value,
+                        bucket_start,
+                        stats['total_builds'],
+                        stats['successful_builds'],
+                        stats['failed_builds'],
+                        stats['unstable_builds'],
+                        stats['aborted_builds'],
+                        f"{stats['successful_builds'] / stats['total_builds']:.2%}",
+                        f"{stats['total_duration'] / stats['total_builds'] / (1000 * 60):.2f}",
+                        len(stats['jobs'])
+                    ] + [f"{(sketch.quantile(percentile / 100) or 0) / (1000 * 60):.2f}"
+                         for percentile in DURATION_PERCENTILES])
+        
+        print(f"  Trend: {trend_file}")
+
+    def print_history_coverage(self, coverage: HistoryCoverage) -> None:
+        """Report how much of a job's history was fetched and why paging stopped"""
+        summary = coverage.summary()
+        if not summary['builds']:
+            return
+        print(f"History coverage: {summary['builds']} builds, #{summary['newest']} back to "
+              f"#{summary['oldest']} ({summary['density']:.0%} of build numbers in that range); "
+              f"job has builds #{summary['first_build']}-#{summary['last_build']}")
+        if summary['reached_first']:
+            print("  Complete back to the job's first build")
+        elif summary['stop'] == 'max-builds':
+            print("  Older builds exist; raise -b/--max-builds to fetch them")
+        elif summary['stop'] == 'window':
+            print("  Stopped at the --since bound")
+        elif self.builds_field == 'builds':
+            print(f"  WARNING: Jenkins stopped listing builds at #{summary['oldest']} although "
+                  f"the job's first build is #{summary['first_build']}; "
+                  f"use --deep-history to page through allBuilds")
+
+    def print_page_summary(self) -> None:
+        """Report the build-page sizes the pager chose"""
+        summary = self.page_sizer.summary()
+        if not summary['pages']:
+            return
+        per_build = ''
+        if summary['bytes_per_build'] is not None:
+            per_build = (f", ~{summary['bytes_per_build'] / 1024:.1f} KB and "
+                         f"{summary['seconds_per_build'] * 1000:.1f} ms per build")
+        print(f"Build pages: {summary['pages']} requested, {summary['min']}-{summary['max']} "
+              f"builds per page (next: {summary['current']}){per_build}, "
+              f"{summary['shrinks']} timeouts halved the page size")
+
+    def print_throttle_summary(self) -> None:
+        """Report where the adaptive throttle settled and why"""
+        if self.throttle is None:
+            return
+        summary = self.throttle.summary()
+        print(f"Adaptive throttle: settled at {summary['rate']:.1f} req/s with "
+              f"{summary['limit']} in flight (peak {summary['peak_rate']:.1f} req/s, "
+              f"{summary['peak_limit']} in flight)")
+        print(f"  {summary['increases']} increases, {summary['decreases']} backoffs "
+              f"(429/503: {summary['throttled']}, slow responses: {summary['slow']}, "
+              f"errors: {summary['errors']}), {summary['retries']} retries, "
+              f"{summary['retry_after_wait']:.1f}s paused for Retry-After")
+
+    def print_summary(self, job_stats: Dict, grouping: Optional[str] = None):
         """Print summary statistics"""
         print(f"\n{'='*80}")
-        print("SUMMARY STATISTICS")
+        print(f"SUMMARY STATISTICS BY {grouping}" if grouping else "SUMMARY STATISTICS")
         print(f"{'='*80}")
         
         total_param_values = len(job_stats)
         total_builds = sum(stats['total_builds'] for stats in job_stats.values())
-        total_jobs = len(set().union(*(stats['jobs'] for stats in job_stats.values())))
+        total_jobs = len(union_jobs(stats['jobs'] for stats in job_stats.values()))
         
         print(f"Parameter values found: {total_param_values}")
         print(f"Total builds analyzed: {total_builds}")
         print(f"Unique jobs analyzed: {total_jobs}")
         
-        print(f"\n{'Parameter Value':<20} {'Builds':<8} {'Success%':<9} {'Avg Min':<8} {'Jobs':<5}")
-        print("-" * 60)
+        has_percentiles = any('duration_sketch' in stats for stats in job_stats.values())
+        percentile_header = ''
+        if has_percentiles:
+            percentile_header = ''.join(f"{f'P{percentile} Min':<8} "
+                                        for percentile in DURATION_PERCENTILES)
+        print(f"\n{'Parameter Value':<20} {'Builds':<8} {'Success%':<9} {'Avg Min':<8} "
+              f"{percentile_header}{'Jobs':<5}")
+        print("-" * (87 if has_percentiles else 60))
         
         # Sort by total builds descending
         sorted_stats = sorted(job_stats.items(), 
@@ -568,9 +1889,29 @@ class JenkinsJobExporter:
                           if stats['total_builds'] > 0 else 0)
             avg_duration_min = (stats['total_duration'] / stats['total_builds'] / (1000 * 60)
                               if stats['total_builds'] > 0 else 0)
+            if 'success_rate' in stats:
+                # Weighted estimates from a sample
+                success_rate = stats['success_rate']
+                avg_duration_min = stats['avg_duration_ms'] / (1000 * 60)
             
+            percentiles = ''
+            if has_percentiles:
+                sketch = stats['duration_sketch']
+                percentiles = ''.join(
+                    f"{(sketch.quantile(percentile / 100) or 0) / (1000 * 60):<8.1f} "
+                    for percentile in DURATION_PERCENTILES)
+            interval = ''
+            if 'success_rate_ci' in stats:
+                low, high = stats['success_rate_ci']
+                interval = f" (95% CI {low:.1%}-{high:.1%})"
             print(f"{param_value:<20} {stats['total_builds']:<8} "
-                  f"{success_rate:<8.1%} {avg_duration_min:<8.1f} {len(stats['jobs']):<5}")
+                  f"{success_rate:<8.1%} {avg_duration_min:<8.1f} {percentiles}"
+                  f"{len(stats['jobs']):<5}{interval}")
+        
+        bound = job_stats.get(OTHER_LABEL, {}).get('max_builds_per_value')
+        if bound is not None:
+            print(f"\n{OTHER_LABEL} folds every value outside the top {len(job_stats) - 1}; "
+                  f"none of them has more than {bound} builds")
 
 
 def main():
@@ -595,6 +1936,9 @@ Examples:
   # Analyze all jobs with verbose output
   %(prog)s http://jenkins.example.com -p version -v --max-builds 200
 
+  # Several parameters and a parameter combination from a single crawl
+  %(prog)s http://jenkins.example.com -p environment -p branch --group-by environment,branch
+
 Authentication:
   Add your Jenkins credentials to ~/.netrc:
   machine jenkins.example.com
@@ -606,8 +1950,15 @@ Authentication:
                        help='Jenkins server URL (e.g., http://jenkins.example.com)')
     
     parser.add_argument('-p', '--parameter', 
-                       required=True,
-                       help='Parameter name to group builds by (e.g., environment, branch)')
+                       action='append',
+                       help='Parameter name to group builds by (e.g., environment, branch); '
+                            'repeat to analyse several parameters in one crawl')
+    
+    parser.add_argument('-g', '--group-by', 
+                       action='append',
+                       metavar='PARAM[,PARAM...]',
+                       help='Group builds by a combination of parameters, e.g. environment,branch; '
+                            'may be repeated. Each grouping gets its own statistics_by_* files')
     
     parser.add_argument('-n', '--max-jobs', 
                        type=int, 
@@ -625,6 +1976,100 @@ Authentication:
                        default='jenkins_export',
                        help='Output directory (default: jenkins_export)')
     
+    parser.add_argument('--folder-depth', 
+                       type=int, 
+                       default=DEFAULT_FOLDER_DEPTH,
+                       help='Folder levels expanded per discovery request; deeper folders are '
+                            f'listed in parallel (default: {DEFAULT_FOLDER_DEPTH}, 0 = root jobs only)')
+    
+    parser.add_argument('--bulk', 
+                       action='store_true',
+                       help='Fetch builds for many sibling jobs per request using nested tree '
+                            'queries, falling back to per-job requests on errors')
+    
+    parser.add_argument('--bulk-max-builds', 
+                       type=int, 
+                       default=DEFAULT_BULK_MAX_BUILDS,
+                       help='Maximum builds per bulk response; jobs per request = this / '
+                            f'--max-builds (default: {DEFAULT_BULK_MAX_BUILDS})')
+    
+    parser.add_argument('--page-fanout', 
+                       type=int, 
+                       default=DEFAULT_PAGE_FANOUT,
+                       help='Build pages fetched concurrently in --single-job mode '
+                            f'(default: {DEFAULT_PAGE_FANOUT})')
+    
+    parser.add_argument('--min-page-size', 
+                       type=int, 
+                       default=DEFAULT_MIN_PAGE_SIZE,
+                       help='Smallest build-history page the pager may shrink to after timeouts '
+                            f'(default: {DEFAULT_MIN_PAGE_SIZE})')
+    
+    parser.add_argument('--max-page-size', 
+                       type=int, 
+                       default=DEFAULT_MAX_PAGE_SIZE,
+                       help='Largest build-history page; pages grow up to this while responses '
+                            f'stay small and fast (default: {DEFAULT_MAX_PAGE_SIZE})')
+    
+    parser.add_argument('--page-timeout', 
+                       type=float, 
+                       default=PAGE_TIMEOUT_SECONDS,
+                       help='Seconds to wait on a build-history page before splitting it in half '
+                            f'(default: {PAGE_TIMEOUT_SECONDS:g})')
+    
+    parser.add_argument('--skip-unchanged', 
+                       action='store_true',
+                       help='Probe every job\'s last build during discovery; skip disabled and '
+                            'never-built jobs and serve jobs without new builds from --cache')
+    
+    parser.add_argument('--prune-jobs', 
+                       action='store_true',
+                       help='Skip jobs whose parameter definitions lack every analysed parameter '
+                            '(builds from before a parameter was removed are not counted)')
+    
+    parser.add_argument('--since', 
+                       help='Only builds started at or after this time: an ISO date/time '
+                            '(2024-05-01, 2024-05-01T12:00) or an age such as 7d, 12h, 30m')
+    
+    parser.add_argument('--until', 
+                       help='Only builds started before this time (same formats as --since)')
+    
+    parser.add_argument('--deep-history', 
+                       action='store_true',
+                       help='Page through allBuilds instead of builds, which Jenkins limits to the '
+                            'builds it has loaded; use with a large -b for long trends')
+    
+    parser.add_argument('--sample', 
+                       action='store_true',
+                       help='Fetch a stratified sample of each job\'s last --max-builds builds '
+                            'and report 95%% confidence intervals')
+    
+    parser.add_argument('--precision', 
+                       type=float, 
+                       default=DEFAULT_PRECISION,
+                       help='With --sample, stop sampling a job once every common value\'s '
+                            f'success rate is within +/- this (default: {DEFAULT_PRECISION})')
+    
+    parser.add_argument('--top-k', 
+                       type=int, 
+                       help='Keep statistics for the K most frequent values of each grouping and '
+                            f'fold the rest into "{OTHER_LABEL}" (for GIT_COMMIT-like parameters)')
+    
+    parser.add_argument('--bucket', 
+                       choices=BUCKETS,
+                       help='Also write per-value time series (builds, success rate, duration '
+                            'percentiles) per UTC day, week or month to trends_by_*.csv')
+    
+    parser.add_argument('--columnar', 
+                       choices=list(COLUMNAR_FORMATS),
+                       help='Also write statistics and per-build records (parameters as columns) '
+                            'as Parquet or Arrow files (needs pyarrow)')
+    
+    parser.add_argument('--stream', 
+                       action='store_true',
+                       help='Parse build histories incrementally and write --export-build-data '
+                            'files as builds arrive, keeping memory flat (requests backend)')
+    
     parser.add_argument('--export-configs', 
                        action='store_true',
                        help='Export job configuration XML files')
@@ -633,11 +2078,77 @@ Authentication:
                        action='store_true',
                        help='Export detailed build data JSON files')
     
+    parser.add_argument('--build-format', 
+                       choices=BUILD_FORMATS,
+                       default='json',
+                       help='Build data file format: pretty-printed JSON per job, or NDJSON with '
+                            'one compact build per line, written as builds arrive (default: json)')
+    
+    parser.add_argument('--compress', 
+                       choices=list(COMPRESSIONS),
+                       help='Compress NDJSON build data with gzip or zstd (zstd needs the '
+                            'zstandard package)')
+    
+    parser.add_argument('--consolidate-builds', 
+                       action='store_true',
+                       help='Write all jobs\' NDJSON build data to one builds.ndjson file, '
+                            'each line tagged with its job, instead of one file per job')
+    
     parser.add_argument('--delay', 
                        type=float, 
                        default=0.1,
                        help='Delay between API calls in seconds (default: 0.1)')
     
+    parser.add_argument('-w', '--workers', 
+                       type=int, 
+                       default=1,
+                       help='Number of jobs to fetch concurrently (default: 1); --delay stays a global rate limit')
+    
+    parser.add_argument('--backend', 
+                       choices=BACKENDS,
+                       default='requests',
+                       help='HTTP backend: requests (thread per worker) or async (asyncio/httpx, '
+                            'optional HTTP/2; --workers sets requests in flight) (default: requests)')
+    
+    parser.add_argument('--adaptive', 
+                       action='store_true',
+                       help='Adapt request rate and concurrency to the controller: speed up while '
+                            'it responds quickly, back off on slow responses, 429/503 and '
+                            'Retry-After. --delay sets the starting rate, --workers the maximum '
+                            'concurrency')
+    
+    parser.add_argument('--max-rate', 
+                       type=float, 
+                       default=DEFAULT_MAX_RATE,
+                       help=f'Upper bound on requests per second with --adaptive (default: {DEFAULT_MAX_RATE:g})')
+    
+    parser.add_argument('--connections', 
+                       type=int, 
+                       default=4,
+                       help='Keep-alive connections used by the async backend (default: 4)')
+    
+    parser.add_argument('--cache', 
+                       metavar='PATH',
+                       help='SQLite build cache; later runs only fetch new builds and re-poll '
+                            'builds that were still running (e.g. ~/.cache/jenkins-stats/builds.db)')
+    
+    parser.add_argument('--resume', 
+                       action='store_true',
+                       help='Continue an interrupted crawl from the checkpoint in the output '
+                            'directory, skipping jobs that were already fetched')
+    
+    parser.add_argument('--checkpoint-interval', 
+                       type=float, 
+                       default=DEFAULT_CHECKPOINT_INTERVAL,
+                       help='Seconds between checkpoints of a multi-job crawl; 0 saves only on '
+                            f'interruption or failure (default: {DEFAULT_CHECKPOINT_INTERVAL:g})')
+    
+    parser.add_argument('--max-retries', 
+                       type=int, 
+                       default=DEFAULT_MAX_RETRIES,
+                       help='Retry rounds, with exponential backoff, for jobs that failed with '
+                            f'network errors, 429 or 5xx (default: {DEFAULT_MAX_RETRIES})')
+    
     parser.add_argument('--netrc', 
                        help='Path to netrc file for authentication (default: ~/.netrc)')
     
@@ -651,36 +2162,88 @@ Authentication:
     
     args = parser.parse_args()
     
+    try:
+        groupings: List[Grouping] = [(name,) for name in args.parameter or []]
+        groupings += [parse_grouping(spec) for spec in args.group_by or []]
+    except ValueError as e:
+        parser.error(str(e))
+    if not groupings:
+        parser.error("at least one of -p/--parameter or -g/--group-by is required")
+    if args.skip_unchanged and not args.cache:
+        parser.error("--skip-unchanged requires --cache")
+    if args.sample and args.cache:
+        parser.error("--sample cannot be combined with --cache")
+    if args.top_k is not None and args.top_k < 1:
+        parser.error("--top-k must be at least 1")
+    if (args.compress or args.consolidate_builds) and args.build_format != 'ndjson':
+        parser.error("--compress and --consolidate-builds require --build-format ndjson")
+    try:
+        since = parse_time_bound(args.since) if args.since else None
+        until = parse_time_bound(args.until) if args.until else None
+        TimeWindow(since, until)
+    except ValueError as e:
+        parser.error(str(e))
+    parameter_label = ', '.join(grouping_name(grouping) for grouping in groupings)
+    
     if args.verbose:
         print(f"Jenkins URL: {args.jenkins_url}")
-        print(f"Target parameter: {args.parameter}")
+        print(f"Target parameter: {parameter_label}")
         print(f"Max jobs: {args.max_jobs or 'unlimited'}")
         print(f"Max builds per job: {args.max_builds}")
         print(f"Job filter: {args.filter or 'none'}")
         print(f"Output directory: {args.output}")
         print(f"Netrc file: {args.netrc or '~/.netrc'}")
-        print(f"API delay: {args.delay}s")
+        print(f"API delay: {args.delay}s" + (f" (adaptive, max {args.max_rate:g} req/s)"
+                                              if args.adaptive else ""))
+        print(f"Workers: {args.workers}")
+        print(f"Backend: {args.backend}")
+        print(f"Build cache: {args.cache or 'disabled'}")
         print()
     
+    exporter = None
     try:
-        exporter = JenkinsJobExporter(args.jenkins_url, args.delay, args.netrc)
+        exporter = JenkinsJobExporter(args.jenkins_url, args.delay, args.netrc,
+                                      workers=args.workers, backend=args.backend,
+                                      connections=args.connections, cache_path=args.cache,
+                                      folder_depth=args.folder_depth, stream=args.stream,
+                                      adaptive=args.adaptive, max_rate=args.max_rate,
+                                      page_fanout=args.page_fanout,
+                                      min_page_size=args.min_page_size,
+                                      max_page_size=args.max_page_size,
+                                      page_timeout=args.page_timeout, verbose=args.verbose,
+                                      skip_unchanged=args.skip_unchanged,
+                                      prune_jobs=args.prune_jobs,
+                                      deep_history=args.deep_history, sample=args.sample,
+                                      precision=args.precision, top_k=args.top_k,
+                                      bucket=args.bucket, build_format=args.build_format,
+                                      compression=args.compress,
+                                      consolidate_builds=args.consolidate_builds,
+                                      columnar_format=args.columnar)
         
         stats = exporter.export_jobs_with_stats(
             output_dir=args.output,
-            target_parameter=args.parameter,
+            target_parameter=groupings[0],
             max_jobs=args.max_jobs,
             max_builds=args.max_builds,
             job_filter=args.filter,
             export_configs=args.export_configs,
             export_build_data=args.export_build_data,
-            single_job=args.single_job
+            single_job=args.single_job,
+            bulk=args.bulk,
+            bulk_max_builds=args.bulk_max_builds,
+            group_by=groupings[1:],
+            resume=args.resume,
+            checkpoint_interval=args.checkpoint_interval,
+            max_retries=args.max_retries,
+            since=since,
+            until=until
         )
         
-        if stats:
+        if stats or any(exporter.grouped_stats.values()):
             print(f"\n✅ Export completed successfully!")
             print(f"Results saved in: {args.output}/")
         else:
-            print(f"\n❌ No data found for parameter '{args.parameter}'")
+            print(f"\n❌ No data found for parameter '{parameter_label}'")
             sys.exit(1)
             
     except KeyboardInterrupt:
@@ -692,6 +2255,9 @@ Authentication:
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        if exporter is not None:
+            exporter.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,231 @@
+"""
+Adaptive page sizing for build-history requests
+
+Jobs with a handful of parameters return a few hundred bytes per build, so
+pages of 1,000 builds are cheap. Jobs with huge parameter payloads can return
+hundreds of KB per build, and even 100 builds may time out. PageSizer keeps a
+running estimate of bytes and seconds per build and sizes the next page to
+stay under a byte and latency budget, within configured limits.
+
+Each job pages with its own sizer, seeded with the page size learned from the
+jobs fetched before it. A job with heavy builds shrinks its own pages without
+shrinking those of jobs fetched alongside it, and its measurements feed the
+shared estimate that later jobs start from.
+
+JobPager holds the decisions of one job's page loop (page ranges, splitting
+timed-out pages, when to stop), so the requests and async backends only
+differ in how they issue each request.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .window import TimeWindow
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MIN_PAGE_SIZE = 25
+DEFAULT_MAX_PAGE_SIZE = 1000
+
+# Budget for one page: response size and response time
+PAGE_TARGET_BYTES = 4 * 1024 * 1024
+PAGE_TARGET_SECONDS = 5.0
+
+# A page that takes this many times the latency budget is abandoned and split
+PAGE_TIMEOUT_MARGIN = 6
+PAGE_TIMEOUT_SECONDS = PAGE_TARGET_SECONDS * PAGE_TIMEOUT_MARGIN
+
+# HTTP statuses that mean the page took too long to render (proxy or gateway timeout)
+PAGE_TIMEOUT_STATUSES = (502, 503, 504)
+
+
+class PageSizer:
+    """Choose build-page sizes from the bytes and time per build observed so far"""
+
+    def __init__(self, initial: int = DEFAULT_PAGE_SIZE,
+                 min_size: int = DEFAULT_MIN_PAGE_SIZE,
+                 max_size: int = DEFAULT_MAX_PAGE_SIZE,
+                 target_bytes: int = PAGE_TARGET_BYTES,
+                 target_seconds: float = PAGE_TARGET_SECONDS,
+                 parent: Optional['PageSizer'] = None):
+        if min_size < 1 or max_size < min_size:
+            raise ValueError(f"Invalid page size limits: {min_size}-{max_size}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.size = min(max_size, max(min_size, initial))
+        self.target_bytes = target_bytes
+        self.target_seconds = target_seconds
+        self.bytes_per_build: Optional[float] = None
+        self.seconds_per_build: Optional[float] = None
+        self.sizes: List[int] = []
+        self.shrinks = 0
+        # Shared sizer that this job's sizer reports to
+        self.parent = parent
+        self._lock = threading.Lock()
+
+    def for_job(self, initial: Optional[int] = None) -> 'PageSizer':
+        """Sizer for one job's pages, starting from the size learned so far
+
+        initial overrides the first page size, below min_size if need be, for
+        fetches expected to be small such as topping up a cached job.
+        """
+        first = self.next_size() if initial is None else initial
+        return PageSizer(first, min(self.min_size, first), self.max_size,
+                         self.target_bytes, self.target_seconds, parent=self)
+
+    def next_size(self) -> int:
+        """Page size to request next"""
+        with self._lock:
+            return self.size
+
+    def record(self, requested: int, builds: int, nbytes: int, seconds: float) -> None:
+        """Learn from one page and resize the next one"""
+        with self._lock:
+            self.sizes.append(requested)
+            if builds > 0:
+                self.bytes_per_build = self._smooth(self.bytes_per_build, nbytes / builds)
+                self.seconds_per_build = self._smooth(self.seconds_per_build, seconds / builds)
+                ideal = self.target_bytes / max(self.bytes_per_build, 1.0)
+                if self.seconds_per_build > 0:
+                    ideal = min(ideal, self.target_seconds / self.seconds_per_build)
+                # Grow at most 2x per page so one fast response doesn't overshoot
+                self.size = int(min(self.max_size, max(self.min_size, min(ideal, self.size * 2))))
+        if self.parent is not None:
+            self.parent.record(requested, builds, nbytes, seconds)
+
+    def shrink(self) -> bool:
+        """Halve the page size after a timeout; False if it is already at the minimum"""
+        with self._lock:
+            if self.size <= self.min_size:
+                return False
+            self.size = max(self.min_size, self.size // 2)
+            self.shrinks += 1
+        if self.parent is not None:
+            # Count the timeout, but leave the shared size to the estimate
+            with self.parent._lock:
+                self.parent.shrinks += 1
+        return True
+
+    @staticmethod
+    def _smooth(current: Optional[float], sample: float) -> float:
+        return sample if current is None else 0.7 * current + 0.3 * sample
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                'pages': len(self.sizes),
+                'min': min(self.sizes, default=0),
+                'max': max(self.sizes, default=0),
+                'current': self.size,
+                'shrinks': self.shrinks,
+                'bytes_per_build': self.bytes_per_build,
+                'seconds_per_build': self.seconds_per_build,
+            }
+
+
+class JobPager:
+    """Page ranges for one job's builds {start,end}, newest first, up to max_builds
+
+    The caller asks next_range() for a page, fetches it and hands it to
+    add_page(), or reports a timeout with timed_out(); None from next_range()
+    ends the loop. A page that times out is split in half and the halves are
+    fetched in turn. With fixed, the first page spans the whole range and is
+    only split, never resized.
+    """
+
+    def __init__(self, max_builds: int, sizer: PageSizer, window: Optional[TimeWindow] = None,
+                 start: int = 0, fixed: bool = False):
+        self.max_builds = max_builds
+        self.sizer = sizer
+        self.window = window if window is not None else TimeWindow()
+        self.start = start
+        # Planned page ends, innermost split last
+        self._ends: List[int] = [max_builds] if fixed else []
+        self.pages = 0
+        # Why paging ended: 'max-builds', 'window' or 'end'; None while pages remain
+        self.stop: Optional[str] = None
+
+    @property
+    def truncated(self) -> bool:
+        """Whether every requested build came back, so older ones may exist"""
+        return self.stop == 'max-builds'
+
+    def next_range(self) -> Optional[Tuple[int, int]]:
+        if self.stop is not None:
+            return None
+        if self.start >= self.max_builds:
+            self.stop = 'max-builds'
+            return None
+        if self._ends:
+            return self.start, self._ends[-1]
+        return self.start, min(self.max_builds, self.start + self.sizer.next_size())
+
+    def timed_out(self, start: int, end: int) -> bool:
+        """Split a page that timed out; False if it is already at the minimum size"""
+        if end - start <= self.sizer.min_size:
+            return False
+        self.sizer.shrink()
+        if not self._ends or self._ends[-1] != end:
+            self._ends.append(end)
+        self._ends.append(start + (end - start) // 2)
+        return True
+
+    def add_page(self, start: int, end: int, page: List[Dict], nbytes: int,
+                 seconds: float) -> List[Dict]:
+        """Record a fetched page and return its builds inside the time window"""
+        self.pages += 1
+        self.sizer.record(end - start, len(page), nbytes, seconds)
+        while self._ends and self._ends[-1] <= end:
+            self._ends.pop()
+        builds, passed = self.window.clip(page)
+        if passed:
+            self.stop = 'window'
+        elif len(page) < end - start:
+            # Reached the end of the available builds; later pages would be empty
+            self.stop = 'end'
+        else:
+            self.start = end
+        return builds
+
+
+class HistoryCoverage:
+    """How much of one job's build history a fetch returned
+
+    first_number and last_number are the job's firstBuild and lastBuild; stop
+    records why paging ended: 'max-builds', 'window' (--since) or 'end' (the
+    API listed no more builds).
+    """
+
+    def __init__(self, first_number: Optional[int], last_number: Optional[int]):
+        self.first_number = first_number
+        self.last_number = last_number
+        self.count = 0
+        self.newest: Optional[int] = None
+        self.oldest: Optional[int] = None
+        self.stop: Optional[str] = None
+
+    def add(self, builds: List[Dict]) -> None:
+        numbers = [build['number'] for build in builds if build.get('number') is not None]
+        self.count += len(builds)
+        if numbers:
+            self.newest = max(numbers) if self.newest is None else max(self.newest, *numbers)
+            self.oldest = min(numbers) if self.oldest is None else min(self.oldest, *numbers)
+
+    @property
+    def reached_first(self) -> bool:
+        return self.oldest is not None and self.first_number is not None \
+            and self.oldest <= self.first_number
+
+    def summary(self) -> Dict:
+        span = self.newest - self.oldest + 1 \
+            if self.newest is not None and self.oldest is not None else 0
+        return {
+            'builds': self.count,
+            'newest': self.newest,
+            'oldest': self.oldest,
+            # Share of build numbers in the fetched range that came back; gaps are deleted builds
+            'density': self.count / span if span else 0.0,
+            'first_build': self.first_number,
+            'last_build': self.last_number,
+            'reached_first': self.reached_first,
+            'stop': self.stop,
+        }
@@ -0,0 +1,818 @@
+"""
+Compact columnar storage for fetched builds
+
+Each build is reduced to a handful of typed array columns (job id, build number,
+result code, duration, timestamp) plus one column of interned value ids per
+tracked parameter. A row costs roughly 30 bytes plus 4 bytes per tracked
+parameter, instead of the several KB of nested dicts Jenkins returns, so a
+whole controller's history fits comfortably in memory.
+
+Aggregation produces the same per-value statistics dicts the exporter has
+always written, either for one parameter or for a tuple of parameters (a
+"grouping") such as ('environment', 'branch'). When NumPy is installed it runs
+vectorised over zero-copy views of the columns. Each entry's 'jobs' is a
+JobSet: a bitset over the store's job-name catalog that behaves like a set of
+names, so merging and counting jobs are integer OR and popcount. For high-cardinality
+parameters (commit hashes, build tags) aggregation can keep only the top-K
+values and fold the rest into a single OTHER_LABEL entry; a store built with
+top_k goes further and only interns the values a fixed-size Space-Saving sketch
+monitors, so its catalogs stay O(top_k) however many values arrive. Duration percentiles
+come from one fixed-size DDSketch per value rather than per-build lists.
+Trends aggregate (value, time bucket) pairs as combined group ids, so the same
+vectorised pass yields a per-value time series.
+"""
+
+import base64
+import sys
+import threading
+from array import array
+from collections.abc import Set as AbstractSetBase
+from typing import (AbstractSet, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set,
+                    Tuple, Union, cast)
+
+from .sampling import SampleDesign
+from .sketches import DDSketch, SpaceSaving, frequent_items
+from .trends import bucket_ids
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - pure-Python fallback is always available
+    np = None  # type: ignore[assignment]
+
+# Result enum stored in the 'result' column
+RESULT_SUCCESS = 0
+RESULT_FAILURE = 1
+RESULT_UNSTABLE = 2
+RESULT_ABORTED = 3
+RESULT_OTHER = 4  # NOT_BUILT, still running, or unknown
+
+RESULT_CODES = {
+    'SUCCESS': RESULT_SUCCESS,
+    'FAILURE': RESULT_FAILURE,
+    'UNSTABLE': RESULT_UNSTABLE,
+    'ABORTED': RESULT_ABORTED,
+}
+RESULT_NAMES = {code: name for name, code in RESULT_CODES.items()}
+
+# Stats key counted for each result code
+RESULT_STAT_KEYS = (
+    (RESULT_SUCCESS, 'successful_builds'),
+    (RESULT_FAILURE, 'failed_builds'),
+    (RESULT_UNSTABLE, 'unstable_builds'),
+    (RESULT_ABORTED, 'aborted_builds'),
+)
+
+MISSING = -1
+
+# Value id of rows whose value a top_k store had already evicted (see TopValueCatalog)
+FOLDED = -2
+
+# Joins the values of a multi-parameter grouping, e.g. 'prod|main'
+GROUP_SEPARATOR = '|'
+
+# Below this many rows the pure-Python aggregation is faster than NumPy
+NUMPY_MIN_ROWS = 1024
+
+# Entry collecting every value outside the top-K
+OTHER_LABEL = '(other)'
+
+# Space-Saving counters per top-K value in a store built with top_k; more counters
+# admit heavy values earlier, so fewer of their builds end up in OTHER_LABEL
+TOP_K_CAPACITY_FACTOR = 4
+
+Grouping = Tuple[str, ...]
+
+# Per-row group ids: an array('i') column, or a NumPy array once vectorised
+GroupIds = Union[array, 'np.ndarray']
+
+
+def new_stats(build_numbers: bool = False, catalog: Optional['StringCatalog'] = None) -> Dict:
+    """Empty statistics entry for one parameter value; with a catalog, 'jobs' is a JobSet"""
+    stats = {
+        'total_builds': 0,
+        'successful_builds': 0,
+        'failed_builds': 0,
+        'unstable_builds': 0,
+        'aborted_builds': 0,
+        'total_duration': 0,
+        'jobs': JobSet(catalog) if catalog is not None else set()
+    }
+    if build_numbers:
+        stats['build_numbers'] = []
+    return stats
+
+
+def extract_parameter_value(build: Dict, parameter_name: str) -> Optional[str]:
+    """Extract specific parameter value from build"""
+    for action in build.get('actions') or []:
+        if action and 'parameters' in action:
+            for param in action['parameters']:
+                if param.get('name') == parameter_name:
+                    return str(param.get('value', ''))
+    return None
+
+
+def parameter_index(build: Dict, names: Optional[AbstractSet[str]] = None) -> Dict[str, Any]:
+    """Map parameter names of a build to their raw values in one pass over its actions
+
+    Built once per build so every tracked parameter, grouping and filter is a dict
+    lookup instead of another walk over all actions. With `names` (ideally a
+    frozenset) only those parameters are indexed and the walk stops as soon as all
+    of them are found. As with extract_parameter_value, the first occurrence wins.
+    """
+    index: Dict[str, Any] = {}
+    remaining = len(names) if names is not None else -1
+    for action in build.get('actions') or ():
+        if action:
+            params = action.get('parameters')
+            if params:
+                for param in params:
+                    name = param.get('name')
+                    if (names is None or name in names) and name not in index:
+                        index[name] = param.get('value', '')
+                        remaining -= 1
+                        if not remaining:
+                            return index
+    return index
+
+
+def indexed_parameter_value(index: Dict[str, Any], parameter_name: str) -> Optional[str]:
+    """extract_parameter_value() against a parameter_index() of the build"""
+    if parameter_name not in index:
+        return None
+    return str(index[parameter_name])
+
+
+def parse_grouping(spec: Union[str, Sequence[str]]) -> Grouping:
+    """Normalise 'environment', 'environment,branch' or a sequence of names to a tuple"""
+    names = spec.split(',') if isinstance(spec, str) else spec
+    grouping = tuple(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+    if not grouping:
+        raise ValueError(f"Empty parameter grouping: {spec!r}")
+    return grouping
+
+
+def grouping_name(grouping: Union[str, Sequence[str]]) -> str:
+    """Name used in messages and statistics_by_<name> files, e.g. 'environment+branch'"""
+    return '+'.join(parse_grouping(grouping))
+
+
+class StringCatalog:
+    """Intern strings as small integer ids"""
+
+    __slots__ = ('_ids', 'values')
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def intern(self, value: str) -> int:
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self._ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self._ids.get(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class TopValueCatalog:
+    """Intern only the values a Space-Saving sketch currently monitors
+
+    Each admission gets a fresh id and the ids of evicted values are forgotten,
+    so rows holding them count toward OTHER_LABEL. Memory is O(capacity) however
+    many distinct values are interned.
+    """
+
+    __slots__ = ('sketch', 'labels', '_ids', '_next_id')
+
+    def __init__(self, capacity: int):
+        self.sketch: SpaceSaving[str] = SpaceSaving(capacity)
+        # Ids of the monitored values, and their labels
+        self._ids: Dict[str, int] = {}
+        self.labels: Dict[int, str] = {}
+        self._next_id = 0
+
+    def intern(self, value: str) -> int:
+        evicted = self.sketch.add(value)
+        if evicted is not None:
+            del self.labels[self._ids.pop(evicted)]
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = self._next_id
+            self.labels[value_id] = value
+            self._next_id += 1
+        return value_id
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def to_dict(self) -> Dict:
+        return {'sketch': self.sketch.to_dict(), 'ids': dict(self._ids), 'next_id': self._next_id}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TopValueCatalog':
+        catalog = cls(data['sketch']['capacity'])
+        catalog.sketch = SpaceSaving.from_dict(data['sketch'])
+        catalog._ids = dict(data['ids'])
+        catalog.labels = {value_id: value for value, value_id in catalog._ids.items()}
+        catalog._next_id = data['next_id']
+        return catalog
+
+
+class JobSet(AbstractSetBase):
+    """Set of job names held as a bitset over the ids of a StringCatalog
+
+    Supports the read-only set API plus add/update. Union, intersection and
+    equality between JobSets on the same catalog are single integer operations.
+    """
+
+    __slots__ = ('catalog', 'bits')
+
+    def __init__(self, catalog: StringCatalog, bits: int = 0):
+        self.catalog = catalog
+        self.bits = bits
+
+    @classmethod
+    def from_ids(cls, catalog: StringCatalog, ids: Iterable[int]) -> 'JobSet':
+        ids = list(ids)
+        if not ids:
+            return cls(catalog)
+        buffer = bytearray(max(ids) // 8 + 1)
+        for job_id in ids:
+            buffer[job_id >> 3] |= 1 << (job_id & 7)
+        return cls(catalog, int.from_bytes(buffer, 'little'))
+
+    def ids(self) -> Iterator[int]:
+        """Catalog ids of the members, ascending"""
+        data = self.bits.to_bytes((self.bits.bit_length() + 7) // 8, 'little')
+        for index, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                yield index * 8 + low.bit_length() - 1
+                byte ^= low
+
+    def _bits_of(self, other: Iterable[str]) -> int:
+        if isinstance(other, JobSet) and other.catalog is self.catalog:
+            return other.bits
+        bits = 0
+        for name in other:
+            bits |= 1 << self.catalog.intern(name)
+        return bits
+
+    def __contains__(self, name: object) -> bool:
+        job_id = self.catalog.lookup(name) if isinstance(name, str) else None
+        return job_id is not None and bool(self.bits >> job_id & 1)
+
+    def __iter__(self) -> Iterator[str]:
+        names = self.catalog.values
+        return (names[job_id] for job_id in self.ids())
+
+    def __len__(self) -> int:
+        return bin(self.bits).count('1')
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, JobSet) and other.catalog is self.catalog:
+            return self.bits == other.bits
+        return super().__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __or__(self, other: Iterable[str]) -> 'JobSet':  # type: ignore[override]
+        return JobSet(self.catalog, self.bits | self._bits_of(other))
+
+    __ror__ = __or__
+
+    def __and__(self, other: Iterable[str]) -> 'JobSet':
+        if isinstance(other, JobSet) and other.catalog is self.catalog:
+            return JobSet(self.catalog, self.bits & other.bits)
+        job_ids = (self.catalog.lookup(name) for name in other)
+        return JobSet.from_ids(self.catalog, (job_id for job_id in job_ids
+                                              if job_id is not None and self.bits >> job_id & 1))
+
+    __rand__ = __and__
+
+    def union(self, *others: Iterable[str]) -> 'JobSet':
+        result = self.copy()
+        result.update(*others)
+        return result
+
+    def add(self, name: str) -> None:
+        self.bits |= 1 << self.catalog.intern(name)
+
+    def update(self, *others: Iterable[str]) -> None:
+        for other in others:
+            self.bits |= self._bits_of(other)
+
+    def copy(self) -> 'JobSet':
+        return JobSet(self.catalog, self.bits)
+
+    def __repr__(self) -> str:
+        return f"JobSet({sorted(self)!r})"
+
+
+def union_jobs(job_sets: Iterable[AbstractSet[str]]) -> AbstractSet[str]:
+    """Union of several job sets; bitwise when they are JobSets on one catalog"""
+    result: Optional[JobSet] = None
+    names: Set[str] = set()
+    for job_set in job_sets:
+        if isinstance(job_set, JobSet) and (result is None or job_set.catalog is result.catalog):
+            if result is None:
+                result = job_set.copy()
+            else:
+                result.bits |= job_set.bits
+        else:
+            names.update(job_set)
+    if result is None:
+        return names
+    result.update(names)
+    return result
+
+
+def _group_array(groups: GroupIds) -> 'np.ndarray':
+    """Zero-copy NumPy view of a group id column"""
+    if isinstance(groups, np.ndarray):
+        return groups
+    return np.frombuffer(groups, dtype=np.dtype(f'i{groups.itemsize}'))
+
+
+class BuildStore:
+    """Append-only columnar table of builds for a set of tracked parameters
+
+    With top_k, each parameter interns only the values its TopValueCatalog
+    monitors; rows of the other values are aggregated into OTHER_LABEL.
+    """
+
+    def __init__(self, parameters: Sequence[str] = (), top_k: Optional[int] = None):
+        if top_k is not None and top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        self.parameters = list(dict.fromkeys(parameters))
+        self._parameter_names = frozenset(self.parameters)
+        self.top_k = top_k
+        self.jobs = StringCatalog()
+        self.values = StringCatalog()
+        self.top_values: Dict[str, TopValueCatalog] = {
+            name: TopValueCatalog(TOP_K_CAPACITY_FACTOR * top_k) for name in self.parameters
+        } if top_k is not None else {}
+        # Where each parameter's values are interned
+        self._catalogs: Dict[str, Union[StringCatalog, TopValueCatalog]] = {
+            name: self.top_values.get(name, self.values) for name in self.parameters}
+        self.job = array('i')
+        self.number = array('q')
+        self.result = array('b')
+        self.duration = array('q')
+        self.timestamp = array('q')
+        self.params: Dict[str, array] = {name: array('i') for name in self.parameters}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.number)
+
+    def add_build(self, job_name: str, build: Dict,
+                  index: Optional[Dict[str, Any]] = None) -> None:
+        """Append one build from a Jenkins API payload
+
+        index may carry a parameter_index() of the build covering the tracked parameters,
+        when the caller already built one.
+        """
+        with self._lock:
+            self._append(self.jobs.intern(job_name), build, index)
+
+    def add_builds(self, job_name: str, builds: Iterable[Dict]) -> None:
+        """Append all builds of one job as a contiguous block of rows"""
+        with self._lock:
+            job_id = self.jobs.intern(job_name)
+            for build in builds:
+                self._append(job_id, build)
+
+    def _append(self, job_id: int, build: Dict,
+                index: Optional[Dict[str, Any]] = None) -> None:
+        self.job.append(job_id)
+        number = build.get('number')
+        self.number.append(number if isinstance(number, int) else MISSING)
+        self.result.append(RESULT_CODES.get((build.get('result') or '').upper(), RESULT_OTHER))
+        duration = build.get('duration') or 0
+        self.duration.append(int(duration) if duration > 0 else 0)
+        self.timestamp.append(int(build.get('timestamp') or 0))
+        if index is None and len(self.params) == 1:
+            # A single lookup is cheapest as a plain scan that stops at the first match
+            for name, column in self.params.items():
+                value = extract_parameter_value(build, name)
+                column.append(MISSING if value is None else self._catalogs[name].intern(value))
+        elif self.params:
+            if index is None:
+                index = parameter_index(build, self._parameter_names)
+            for name, column in self.params.items():
+                value = indexed_parameter_value(index, name)
+                column.append(MISSING if value is None else self._catalogs[name].intern(value))
+
+    def extend(self, other: 'BuildStore') -> None:
+        """Append every row of another store, re-mapping its interned ids"""
+        if not len(other):
+            return
+        with self._lock:
+            job_map = [self.jobs.intern(name) for name in other.jobs.values]
+            value_map: Optional[List[int]] = None
+            self.job.extend(job_map[job_id] for job_id in other.job)
+            self.number.extend(other.number)
+            self.result.extend(other.result)
+            self.duration.extend(other.duration)
+            self.timestamp.extend(other.timestamp)
+            for name, column in self.params.items():
+                source = other.params.get(name)
+                if source is None:
+                    column.extend([MISSING] * len(other))
+                elif name in self.top_values or name in other.top_values:
+                    # Row by row, so the sketch counts every occurrence
+                    catalog = self._catalogs[name]
+                    for value_id in source:
+                        label = other.value_label(name, value_id)
+                        column.append(catalog.intern(label) if label is not None
+                                      else MISSING if value_id == MISSING else FOLDED)
+                else:
+                    if value_map is None:
+                        value_map = [self.values.intern(value) for value in other.values.values]
+                    column.extend(MISSING if value_id < 0 else value_map[value_id]
+                                  for value_id in source)
+
+    def value_label(self, name: str, value_id: int) -> Optional[str]:
+        """Value behind a parameter's value id; None if unset or folded into OTHER_LABEL"""
+        if value_id < 0:
+            return None
+        catalog = self._catalogs[name]
+        if isinstance(catalog, TopValueCatalog):
+            return catalog.labels.get(value_id)
+        return catalog.values[value_id]
+
+    def value_column(self, name: str) -> Tuple[GroupIds, List[str]]:
+        """Per-row ids of a parameter's values (MISSING where unset) and the label of each id
+
+        In a top_k store the ids are renumbered densely and rows of values that
+        were not kept share the last id, labelled OTHER_LABEL.
+        """
+        column = self.params[name]
+        catalog = self.top_values.get(name)
+        if catalog is None:
+            return column, self.values.values
+        kept = sorted(catalog.labels)
+        other = len(kept)
+        labels = [catalog.labels[value_id] for value_id in kept] + [OTHER_LABEL]
+        if np is not None and len(self) >= NUMPY_MIN_ROWS:
+            ids = _group_array(column)
+            kept_ids = np.array(kept + [MISSING], dtype=np.int64)
+            indices = np.minimum(np.searchsorted(kept_ids[:-1], ids), other)
+            dense = np.where(kept_ids[indices] == ids, indices, other)
+            return np.where(ids == MISSING, MISSING, dense), labels
+        positions = {value_id: position for position, value_id in enumerate(kept)}
+        return array('i', (MISSING if value_id == MISSING else positions.get(value_id, other)
+                           for value_id in column)), labels
+
+    def _columns(self) -> Dict[str, array]:
+        columns = {'job': self.job, 'number': self.number, 'result': self.result,
+                   'duration': self.duration, 'timestamp': self.timestamp}
+        for name, column in self.params.items():
+            columns[f'param:{name}'] = column
+        return columns
+
+    def to_dict(self) -> Dict:
+        """JSON-serialisable snapshot of the store (columns as base64 machine arrays)"""
+        with self._lock:
+            data: Dict[str, Any] = {
+                'parameters': list(self.parameters),
+                'jobs': list(self.jobs.values),
+                'values': list(self.values.values),
+                'byteorder': sys.byteorder,
+                'columns': {name: {'type': column.typecode,
+                                   'data': base64.b64encode(column.tobytes()).decode('ascii')}
+                            for name, column in self._columns().items()},
+            }
+            if self.top_k is not None:
+                data['top_k'] = self.top_k
+                data['top_values'] = {name: catalog.to_dict()
+                                      for name, catalog in self.top_values.items()}
+            return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BuildStore':
+        """Rebuild a store saved with to_dict()"""
+        store = cls(data['parameters'], data.get('top_k'))
+        for name in data['jobs']:
+            store.jobs.intern(name)
+        for value in data['values']:
+            store.values.intern(value)
+        for name, saved_catalog in data.get('top_values', {}).items():
+            store.top_values[name] = store._catalogs[name] = \
+                TopValueCatalog.from_dict(saved_catalog)
+        for name, column in store._columns().items():
+            saved = data['columns'][name]
+            if saved['type'] != column.typecode:
+                raise ValueError(f"Column '{name}' was saved as '{saved['type']}', "
+                                 f"expected '{column.typecode}'")
+            column.frombytes(base64.b64decode(saved['data']))
+            if data['byteorder'] != sys.byteorder:
+                column.byteswap()
+        if len({len(column) for column in store._columns().values()}) > 1:
+            raise ValueError("Saved build store columns have different lengths")
+        return store
+
+    def as_numpy(self) -> Dict[str, 'np.ndarray']:
+        """Zero-copy NumPy views of the columns (requires numpy)"""
+        if np is None:
+            raise RuntimeError("NumPy is not installed")
+        columns = {
+            'job': np.frombuffer(self.job, dtype=np.dtype(f'i{self.job.itemsize}')),
+            'number': np.frombuffer(self.number, dtype=np.int64),
+            'result': np.frombuffer(self.result, dtype=np.int8),
+            'duration': np.frombuffer(self.duration, dtype=np.int64),
+            'timestamp': np.frombuffer(self.timestamp, dtype=np.int64),
+        }
+        for name, column in self.params.items():
+            columns[f'param:{name}'] = np.frombuffer(column, dtype=np.dtype(f'i{column.itemsize}'))
+        return columns
+
+    def aggregate(self, parameter: Union[str, Sequence[str]],
+                  build_numbers: bool = False, top_k: Optional[int] = None,
+                  duration_sketches: bool = False,
+                  sample_design: Optional[SampleDesign] = None) -> Dict[str, Dict]:
+        """Per-value statistics for a tracked parameter or grouping, in the exporter's dict format
+
+        A grouping such as ('environment', 'branch') counts builds that have every
+        parameter set, keyed by their values joined with GROUP_SEPARATOR. With
+        duration_sketches, each entry gets a 'duration_sketch' (DDSketch) for
+        duration percentiles. With sample_design, each entry also gets the design's
+        weighted estimates and confidence intervals (see SampleDesign.add_estimates).
+
+        With top_k, only the top_k most frequent values get their own entry; the
+        rest are folded into OTHER_LABEL, whose 'max_builds_per_value' bounds how
+        many builds any folded value can have. In a top_k store, OTHER_LABEL also
+        holds the values the store did not keep.
+        """
+        grouping = self._tracked_grouping(parameter)
+        if not len(self):
+            return {}
+        groups, labels = self._groups(grouping)
+        folded_id, other_bound = self._folded_at_ingest(grouping, labels)
+        if top_k is not None:
+            groups, labels, other_bound = self._fold_rare_groups(groups, labels, top_k,
+                                                                 folded_id, other_bound or 0)
+        if np is not None and len(self) >= NUMPY_MIN_ROWS:
+            stats = self._aggregate_numpy(groups, len(labels))
+        else:
+            stats = self._aggregate_python(groups)
+        if sample_design is not None:
+            result_keys = dict(RESULT_STAT_KEYS)
+            sample_design.add_estimates(stats, (
+                (group_id, self.jobs.values[self.job[row]], self.number[row],
+                 result_keys.get(self.result[row]), self.duration[row])
+                for row, group_id in enumerate(groups) if group_id >= 0))
+        if duration_sketches:
+            self._add_duration_sketches(groups, stats)
+        if build_numbers:
+            for group_id, entry in stats.items():
+                entry['build_numbers'] = []
+            for row, group_id in enumerate(groups):
+                if group_id >= 0:
+                    number = self.number[row]
+                    stats[group_id]['build_numbers'].append(number if number >= 0 else 'unknown')
+        if other_bound is not None and len(labels) - 1 in stats:
+            stats[len(labels) - 1]['max_builds_per_value'] = other_bound
+        return {labels[group_id]: entry for group_id, entry in stats.items()}
+
+    def aggregate_trend(self, parameter: Union[str, Sequence[str]], bucket: str,
+                        top_k: Optional[int] = None) -> Dict[str, Dict[str, Dict]]:
+        """Per-value statistics per time bucket, as {value: {bucket label: entry}}
+
+        bucket is one of trends.BUCKETS; buckets are listed in time order and
+        only buckets with builds appear. Every entry has a 'duration_sketch'.
+        Builds without a timestamp are left out.
+        """
+        grouping = self._tracked_grouping(parameter)
+        if not len(self):
+            return {}
+        groups, labels = self._groups(grouping)
+        if top_k is not None:
+            folded_id, folded_bound = self._folded_at_ingest(grouping, labels)
+            groups, labels, _ = self._fold_rare_groups(groups, labels, top_k,
+                                                       folded_id, folded_bound or 0)
+        combined: GroupIds
+        if np is not None and len(self) >= NUMPY_MIN_ROWS:
+            bucket_column, bucket_labels = bucket_ids(self.as_numpy()['timestamp'], bucket)
+            buckets = cast('np.ndarray', bucket_column)
+            width = len(bucket_labels)
+            group_array = _group_array(groups)
+            combined = np.where((group_array >= 0) & (buckets >= 0),
+                                group_array.astype(np.int64) * width + buckets, MISSING)
+            stats = self._aggregate_numpy(combined, len(labels) * width)
+        else:
+            bucket_list, bucket_labels = bucket_ids(self.timestamp, bucket)
+            width = len(bucket_labels)
+            combined = array('q', (group_id * width + bucket_id
+                                   if group_id >= 0 and bucket_id >= 0 else MISSING
+                                   for group_id, bucket_id in zip(groups, bucket_list)))
+            stats = self._aggregate_python(combined)
+        self._add_duration_sketches(combined, stats)
+        trend: Dict[str, Dict[str, Dict]] = {}
+        for combined_id in sorted(stats):
+            group_id, bucket_id = divmod(combined_id, width)
+            trend.setdefault(labels[group_id], {})[bucket_labels[bucket_id]] = stats[combined_id]
+        return trend
+
+    def _tracked_grouping(self, parameter: Union[str, Sequence[str]]) -> Grouping:
+        grouping = parse_grouping(parameter) if not isinstance(parameter, str) else (parameter,)
+        for name in grouping:
+            if name not in self.params:
+                raise KeyError(f"Parameter '{name}' is not tracked by this store")
+        return grouping
+
+    def _folded_at_ingest(self, grouping: Grouping,
+                          labels: List[str]) -> Tuple[Optional[int], Optional[int]]:
+        """Group id of the values a top_k store did not keep, and the most builds
+        any of them can have; (None, None) for a store without top_k"""
+        if not self.top_values:
+            return None, None
+        return len(labels) - 1, max(self.top_values[name].sketch.min_count()
+                                    for name in grouping)
+
+    def _fold_rare_groups(self, groups: GroupIds, labels: List[str], top_k: int,
+                          folded_id: Optional[int] = None,
+                          folded_bound: int = 0) -> Tuple[GroupIds, List[str], int]:
+        """Renumber group ids so the top_k most frequent come first and the rest share one id
+
+        Returns the new group ids, their labels (OTHER_LABEL last) and the most
+        builds any folded value can have. folded_id is a group already folded at
+        ingest, whose values have at most folded_bound builds each; it never
+        makes the top_k. Memory beyond the group column is O(top_k) in pure
+        Python; NumPy counts exactly with one integer per group id.
+        """
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        folded: GroupIds
+        kept: List[int]
+        if np is not None and len(self) >= NUMPY_MIN_ROWS:
+            ids = _group_array(groups)
+            counts = np.bincount(ids[ids >= 0], minlength=len(labels))
+            if folded_id is not None:
+                counts[folded_id] = 0
+            top = np.argsort(-counts, kind='stable')[:top_k]
+            top = top[counts[top] > 0]
+            rest = counts.copy()
+            rest[top] = 0
+            bound = max(int(rest.max(initial=0)), folded_bound)
+            remap = np.full(counts.size, len(top), dtype=np.int64)
+            remap[top] = np.arange(len(top))
+            folded = np.where(ids >= 0, remap[np.maximum(ids, 0)], MISSING)
+            kept = top.tolist()
+        else:
+            # Candidates from a fixed-size sketch, then exact counts for those alone
+            candidates, bound = frequent_items(
+                (g for g in groups if g >= 0 and g != folded_id), 2 * top_k)
+            exact = dict.fromkeys(candidates, 0)
+            for group_id in groups:
+                if group_id in exact:
+                    exact[group_id] += 1
+            ranked = sorted(exact, key=lambda group_id: (-exact[group_id], group_id))
+            kept = ranked[:top_k]
+            bound = max([bound, folded_bound] + [exact[group_id] for group_id in ranked[top_k:]])
+            positions = {group_id: position for position, group_id in enumerate(kept)}
+            other = len(kept)
+            folded = array('i', (MISSING if group_id < 0 else positions.get(group_id, other)
+                                 for group_id in groups))
+        return folded, [labels[group_id] for group_id in kept] + [OTHER_LABEL], bound
+
+    def _add_duration_sketches(self, groups: GroupIds, stats: Dict[int, Dict]) -> None:
+        """Give each group's entry a DDSketch of its build durations"""
+        if not stats:
+            return
+        for entry in stats.values():
+            entry['duration_sketch'] = DDSketch()
+        if np is None or len(self) < NUMPY_MIN_ROWS:
+            for row, group_id in enumerate(groups):
+                if group_id >= 0:
+                    stats[group_id]['duration_sketch'].add(self.duration[row])
+            return
+        group_array = _group_array(groups)
+        mask = group_array >= 0
+        values = group_array[mask].astype(np.int64)
+        durations = self.as_numpy()['duration'][mask]
+        positive = durations > 0
+        zeros = np.bincount(values[~positive], minlength=max(stats) + 1)
+        # Same bucket keys as DDSketch.key(), computed for every row at once
+        log_gamma = np.log(next(iter(stats.values()))['duration_sketch'].gamma)
+        keys = np.ceil(np.log(durations[positive]) / log_gamma).astype(np.int64)
+        pairs, counts = np.unique(np.stack([values[positive], keys], axis=1), axis=0,
+                                  return_counts=True)
+        buckets: Dict[int, List[Tuple[int, int]]] = {}
+        for (group_id, key), count in zip(pairs.tolist(), counts.tolist()):
+            buckets.setdefault(group_id, []).append((key, count))
+        for group_id, entry in stats.items():
+            entry['duration_sketch'].add_buckets(buckets.get(group_id, ()), int(zeros[group_id]))
+
+    def _groups(self, grouping: Grouping) -> Tuple[GroupIds, List[str]]:
+        """Per-row group ids (MISSING where a parameter is unset) and the label of each id
+
+        For a single parameter the group ids are the value ids of value_column().
+        In a top_k store, combinations with a value the store did not keep share
+        the last id, labelled OTHER_LABEL.
+        """
+        if len(grouping) == 1:
+            return self.value_column(grouping[0])
+        columns, value_labels = zip(*(self.value_column(name) for name in grouping))
+        # Per-column id of OTHER_LABEL, or MISSING (never matches a present row) if none
+        other_ids = [len(labels) - 1 if self.top_values else MISSING for labels in value_labels]
+        groups: GroupIds
+        keys: List[Sequence[int]]
+        if np is not None and len(self) >= NUMPY_MIN_ROWS:
+            stacked = np.stack([_group_array(column) for column in columns], axis=1)
+            present = (stacked >= 0).all(axis=1)
+            folded_rows = present & (stacked == np.array(other_ids)).any(axis=1)
+            present &= ~folded_rows
+            unique, inverse = np.unique(stacked[present], axis=0, return_inverse=True)
+            group_array = np.full(len(self), MISSING, dtype=np.int64)
+            group_array[present] = inverse.reshape(-1)
+            group_array[folded_rows] = len(unique)
+            groups = group_array
+            keys = unique.tolist()
+        else:
+            ids: Dict[Tuple[int, ...], int] = {}
+            folded_rows = []
+            group_column = array('i')
+            for key in zip(*columns):
+                if min(key) < 0:
+                    group_column.append(MISSING)
+                elif any(value_id == other for value_id, other in zip(key, other_ids)):
+                    # Numbered once every kept combination is known
+                    folded_rows.append(len(group_column))
+                    group_column.append(MISSING)
+                else:
+                    group_column.append(ids.setdefault(key, len(ids)))
+            for row in folded_rows:
+                group_column[row] = len(ids)
+            groups = group_column
+            keys = list(ids)
+        labels = [GROUP_SEPARATOR.join(value_labels[position][value_id]
+                                       for position, value_id in enumerate(key))
+                  for key in keys]
+        if self.top_values:
+            labels.append(OTHER_LABEL)
+        return groups, labels
+
+    def _aggregate_python(self, groups: GroupIds) -> Dict[int, Dict]:
+        stats: Dict[int, Dict] = {}
+        job_sets: Dict[int, Set[int]] = {}
+        result_keys = dict(RESULT_STAT_KEYS)
+        for row, group_id in enumerate(groups):
+            if group_id < 0:
+                continue
+            entry = stats.get(group_id)
+            if entry is None:
+                entry = stats[group_id] = new_stats()
+                job_sets[group_id] = set()
+            entry['total_builds'] += 1
+            key = result_keys.get(self.result[row])
+            if key is not None:
+                entry[key] += 1
+            entry['total_duration'] += self.duration[row]
+            job_sets[group_id].add(self.job[row])
+        for group_id, entry in stats.items():
+            entry['jobs'] = JobSet.from_ids(self.jobs, job_sets[group_id])
+        return stats
+
+    def _aggregate_numpy(self, groups: GroupIds, size: int) -> Dict[int, Dict]:
+        columns = self.as_numpy()
+        group_array = _group_array(groups)
+        mask = group_array >= 0
+        values = group_array[mask]
+        results = columns['result'][mask]
+        durations = columns['duration'][mask]
+        jobs = columns['job'][mask].astype(np.int64)
+
+        totals = np.bincount(values, minlength=size)
+        duration_sums = np.bincount(values, weights=durations, minlength=size)
+        by_result = {key: np.bincount(values[results == code], minlength=size)
+                     for code, key in RESULT_STAT_KEYS}
+        job_count = max(1, len(self.jobs))
+        pairs = np.unique(values.astype(np.int64) * job_count + jobs)
+
+        stats: Dict[int, Dict] = {}
+        for group_id in np.nonzero(totals)[0].tolist():
+            entry = new_stats(catalog=self.jobs)
+            entry['total_builds'] = int(totals[group_id])
+            for key, counts in by_result.items():
+                entry[key] = int(counts[group_id])
+            entry['total_duration'] = int(duration_sums[group_id])
+            stats[group_id] = entry
+        # pairs are sorted, so each group's job ids form one contiguous run
+        pair_groups = pairs // job_count
+        pair_jobs = pairs % job_count
+        starts = np.flatnonzero(np.r_[True, pair_groups[1:] != pair_groups[:-1]]) \
+            if len(pairs) else np.array([], dtype=np.int64)
+        ends = np.r_[starts[1:], len(pairs)]
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            stats[int(pair_groups[start])]['jobs'] = JobSet.from_ids(
+                self.jobs, pair_jobs[start:end].tolist())
+        return stats
@@ -0,0 +1,274 @@
+"""
+Stratified sampling of build history for --sample
+
+A job's build range (newest first, up to --max-builds) is cut into pages of
+SAMPLE_PAGE_SIZE builds, and the pages into SAMPLE_STRATA contiguous strata,
+so recent and old builds are both represented. Each round fetches one random
+unsampled page per stratum; sampling stops once the success rate of every
+common parameter value is known to within the requested precision, or when
+every page has been fetched.
+
+Jobs are sampled independently and at different rates (a small job may be
+fetched whole while a busy one gives up 5% of its builds), so pooled counts
+would over-represent small jobs. SampleDesign weights each sampled page by
+the inverse of its stratum's sampling fraction, and the statistics report
+the weighted success rate, failure rate and average duration. Their 95%
+intervals come from a linearised variance of the page totals: builds on one
+page are fetched together and tend to share outcomes, so pages, not builds,
+are the independent units. Rates get a Wilson score interval at the design's
+effective sample size, average durations a normal-approximation interval.
+"""
+
+import math
+import random
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Two-sided 95% confidence
+Z_95 = 1.959964
+
+# Default half-width of the success-rate interval
+DEFAULT_PRECISION = 0.02
+
+# Builds per sampled page, and strata per job
+SAMPLE_PAGE_SIZE = 20
+SAMPLE_STRATA = 10
+
+# Values rarer than this share of the sample don't hold up the stopping rule
+SAMPLE_MIN_SHARE = 0.05
+
+# Never stop before this many sampled builds
+SAMPLE_MIN_BUILDS = 30
+
+
+def wilson_interval(successes: float, n: float, z: float = Z_95) -> Tuple[float, float]:
+    """Wilson score interval for a proportion; (0, 1) when there is no data"""
+    if n <= 0:
+        return 0.0, 1.0
+    p = successes / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def rate_interval(rate: float, variance: float, n: int, z: float = Z_95) -> Tuple[float, float]:
+    """Wilson interval for an estimated rate with the given sampling variance
+
+    The effective sample size is the one at which simple random sampling would
+    give the same variance. A rate of exactly 0 or 1 has no variance to go by,
+    so the n sampled builds behind it are used instead.
+    """
+    effective = rate * (1 - rate) / variance if variance > 0 and 0 < rate < 1 else n
+    return wilson_interval(rate * effective, effective, z)
+
+
+def precise_enough(stats: Dict[str, Dict], sampled: int, precision: float,
+                   z: float = Z_95) -> bool:
+    """Whether every common value's success rate is known to within +/- precision
+
+    Entries with a 'success_rate_ci' (from SampleDesign) use it; others get a
+    Wilson interval from their counts. sampled counts all builds fetched so far;
+    a job whose sample has no builds with the parameter at all is not worth
+    sampling further.
+    """
+    if sampled < SAMPLE_MIN_BUILDS:
+        return False
+    total = sum(entry['total_builds'] for entry in stats.values())
+    for entry in stats.values():
+        n = entry['total_builds']
+        if n < SAMPLE_MIN_SHARE * total:
+            continue
+        low, high = entry.get('success_rate_ci') or wilson_interval(entry['successful_builds'],
+                                                                    n, z)
+        if (high - low) / 2 > precision:
+            return False
+    return True
+
+
+class StratifiedSampler:
+    """Hand out pages of a job's build range, one random page per stratum per round"""
+
+    def __init__(self, total: int, page_size: int = SAMPLE_PAGE_SIZE,
+                 strata: int = SAMPLE_STRATA, seed: Optional[int] = None):
+        pages = [(start, min(total, start + page_size)) for start in range(0, total, page_size)]
+        strata = max(1, min(strata, len(pages)))
+        rng = random.Random(seed)
+        self._strata: List[List[Tuple[int, int]]] = []
+        for index in range(strata):
+            stratum = pages[index * len(pages) // strata:(index + 1) * len(pages) // strata]
+            rng.shuffle(stratum)
+            self._strata.append(stratum)
+        self.total_pages = len(pages)
+        self.sampled_pages = 0
+        # Pages per stratum, and the stratum each page range belongs to
+        self.stratum_sizes = [len(stratum) for stratum in self._strata]
+        self.stratum_of = {page: index for index, stratum in enumerate(self._strata)
+                           for page in stratum}
+
+    @property
+    def exhausted(self) -> bool:
+        return self.sampled_pages >= self.total_pages
+
+    def next_round(self) -> List[Tuple[int, int]]:
+        """(start, end) ranges to fetch next, newest stratum first"""
+        ranges = [stratum.pop() for stratum in self._strata if stratum]
+        self.sampled_pages += len(ranges)
+        return ranges
+
+
+class SampleDesign:
+    """Strata and sampled pages of each sampled job, for design-weighted estimates
+
+    A page drawn from a stratum of M pages, of which m were sampled, stands for
+    M / m pages' worth of builds. Builds the design doesn't know (from jobs that
+    weren't sampled) count once, with no sampling variance.
+    """
+
+    def __init__(self) -> None:
+        # Job name -> pages in each stratum of its build range
+        self.strata: Dict[str, List[int]] = {}
+        # Job name -> (stratum, build numbers) of each sampled page
+        self.pages: Dict[str, List[Tuple[int, List[int]]]] = {}
+
+    def add_job(self, job_name: str, sampler: StratifiedSampler) -> None:
+        self.strata[job_name] = list(sampler.stratum_sizes)
+        self.pages[job_name] = []
+
+    def add_page(self, job_name: str, stratum: int, builds: Iterable[Dict]) -> None:
+        numbers = [build['number'] for build in builds if isinstance(build.get('number'), int)]
+        self.pages[job_name].append((stratum, numbers))
+
+    def only(self, job_name: str) -> 'SampleDesign':
+        """The part of the design that covers one job"""
+        design = SampleDesign()
+        design.strata[job_name] = self.strata[job_name]
+        design.pages[job_name] = list(self.pages[job_name])
+        return design
+
+    def update(self, other: 'SampleDesign') -> None:
+        self.strata.update(other.strata)
+        self.pages.update(other.pages)
+
+    def to_dict(self) -> Dict:
+        return {'strata': self.strata,
+                'pages': {job: [[stratum, numbers] for stratum, numbers in pages]
+                          for job, pages in self.pages.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SampleDesign':
+        design = cls()
+        design.strata = {job: list(sizes) for job, sizes in data['strata'].items()}
+        design.pages = {job: [(stratum, list(numbers)) for stratum, numbers in pages]
+                        for job, pages in data['pages'].items()}
+        return design
+
+    def _clusters(self) -> Tuple[Dict[Tuple[str, int], int], List[float],
+                                 List[Tuple[List[int], float]], Set[int]]:
+        """Page lookup by (job, build number), each page's weight, and the variance strata
+
+        Variance strata are a job's own strata once each holds two sampled pages;
+        before that the job's strata are collapsed into one, which overstates the
+        variance rather than leaving it undefined. Each variance stratum lists its
+        pages and its sampling fraction; pages of fully fetched strata are exact.
+        """
+        lookup: Dict[Tuple[str, int], int] = {}
+        weights: List[float] = []
+        variance_strata: List[Tuple[List[int], float]] = []
+        for job, pages in self.pages.items():
+            sizes = self.strata[job]
+            sampled = [0] * len(sizes)
+            for stratum, _ in pages:
+                sampled[stratum] += 1
+            by_stratum: Dict[int, List[int]] = {}
+            for stratum, numbers in pages:
+                cluster = len(weights)
+                weights.append(sizes[stratum] / sampled[stratum])
+                by_stratum.setdefault(stratum, []).append(cluster)
+                for number in numbers:
+                    lookup[(job, number)] = cluster
+            if all(count >= 2 for count in sampled):
+                for stratum, clusters in by_stratum.items():
+                    variance_strata.append((clusters, sampled[stratum] / sizes[stratum]))
+            elif pages:
+                clusters = [cluster for group in by_stratum.values() for cluster in group]
+                variance_strata.append((clusters, len(pages) / sum(sizes)))
+        exact = {cluster for clusters, fraction in variance_strata if fraction >= 1
+                 for cluster in clusters}
+        return lookup, weights, variance_strata, exact
+
+    def add_estimates(self, stats: Dict, rows: Iterable[Tuple[int, str, int, Optional[str], int]],
+                      z: float = Z_95) -> None:
+        """Add weighted estimates and 95% intervals to aggregated statistics
+
+        rows are (group id, job name, build number, result key, duration) for every
+        build counted in stats, which is keyed by group id. Each entry gains
+        estimated_builds, success_rate, failure_rate and avg_duration_ms with
+        success_rate_ci, failure_rate_ci and avg_duration_ms_ci.
+        """
+        lookup, weights, variance_strata, exact = self._clusters()
+        # Group id -> cluster -> [builds, successes, failures, duration]
+        totals: Dict[int, Dict[object, List[float]]] = {group_id: {} for group_id in stats}
+        for group_id, job, number, result, duration in rows:
+            cluster = lookup.get((job, number), (job, number))
+            sums = totals[group_id].setdefault(cluster, [0, 0, 0, 0])
+            sums[0] += 1
+            sums[1] += result == 'successful_builds'
+            sums[2] += result == 'failed_builds'
+            sums[3] += duration
+        for group_id, entry in stats.items():
+            clusters = totals[group_id]
+            weighted: List[float] = [sum(self._weight(weights, cluster) * sums[index]
+                                         for cluster, sums in clusters.items())
+                                     for index in range(4)]
+            builds = weighted[0]
+            success, failure, mean_duration = (value / builds if builds else 0.0
+                                               for value in weighted[1:])
+            entry['estimated_builds'] = round(builds)
+            entry['success_rate'] = success
+            entry['failure_rate'] = failure
+            entry['avg_duration_ms'] = mean_duration
+            if all(cluster in exact or not isinstance(cluster, int) for cluster in clusters):
+                # Every build behind the entry was fetched: the estimates are exact
+                entry['success_rate_ci'] = [success, success]
+                entry['failure_rate_ci'] = [failure, failure]
+                entry['avg_duration_ms_ci'] = [mean_duration, mean_duration]
+                continue
+            n = entry['total_builds']
+            entry['success_rate_ci'] = list(rate_interval(
+                success, self._ratio_variance(clusters, weights, variance_strata, 1, success), n, z))
+            entry['failure_rate_ci'] = list(rate_interval(
+                failure, self._ratio_variance(clusters, weights, variance_strata, 2, failure), n, z))
+            margin = z * math.sqrt(self._ratio_variance(clusters, weights, variance_strata, 3,
+                                                        mean_duration))
+            entry['avg_duration_ms_ci'] = [max(0.0, mean_duration - margin),
+                                           mean_duration + margin]
+
+    @staticmethod
+    def _weight(weights: List[float], cluster: object) -> float:
+        return weights[cluster] if isinstance(cluster, int) else 1.0
+
+    @staticmethod
+    def _ratio_variance(clusters: Dict[object, List[float]], weights: List[float],
+                        variance_strata: List[Tuple[List[int], float]], index: int,
+                        ratio: float) -> float:
+        """Linearised variance of sum(w * y) / sum(w * x) for column index of the page totals
+
+        Pages without any of the group's builds still count, with a zero residual.
+        """
+        builds = sum(SampleDesign._weight(weights, cluster) * sums[0]
+                     for cluster, sums in clusters.items())
+        if not builds:
+            return 0.0
+        variance = 0.0
+        for members, fraction in variance_strata:
+            m = len(members)
+            if m < 2 or fraction >= 1:
+                continue
+            residuals = []
+            for cluster in members:
+                sums = clusters.get(cluster)
+                residuals.append(0.0 if sums is None
+                                 else weights[cluster] * (sums[index] - ratio * sums[0]))
+            mean = sum(residuals) / m
+            variance += (1 - fraction) * m / (m - 1) * sum((r - mean) ** 2 for r in residuals)
+        return variance / (builds * builds)
@@ -0,0 +1,203 @@
+"""
+Fixed-size summaries for high-cardinality data
+
+frequent_items() finds the heavy hitters of a stream with a fixed number of
+counters (the Misra-Gries "Frequent" algorithm, a close relative of
+Space-Saving). Every item occurring more than n / (capacity + 1) times is
+guaranteed to be among the candidates it returns, and any item it drops
+occurs at most `bound` times.
+
+SpaceSaving tracks the heavy hitters of an unbounded stream as it arrives,
+with a fixed number of counters, so callers can keep data for the monitored
+items only.
+
+DDSketch estimates quantiles (p50/p90/p99 build durations) with a bounded
+relative error from logarithmically sized buckets. Sketches with the same
+accuracy merge exactly by adding bucket counts.
+"""
+
+import math
+from typing import Dict, Generic, Hashable, Iterable, Optional, Tuple, TypeVar
+
+# Quantile estimates are within 1% of the true value
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Enough for 1 ms to ~30 years at 1% accuracy; beyond this the lowest buckets are merged
+DEFAULT_MAX_BUCKETS = 2048
+
+T = TypeVar('T', bound=Hashable)
+
+
+def frequent_items(stream: Iterable[T], capacity: int) -> Tuple[Dict[T, int], int]:
+    """Heavy-hitter candidates with lower-bound counts, and the bound on every other item"""
+    if capacity < 1:
+        raise ValueError("capacity must be at least 1")
+    counters: Dict[T, int] = {}
+    decrements = 0
+    for item in stream:
+        if item in counters:
+            counters[item] += 1
+        elif len(counters) < capacity:
+            counters[item] = 1
+        else:
+            # Decrementing every counter is O(capacity) but happens at most n / capacity times
+            decrements += 1
+            for key in list(counters):
+                counters[key] -= 1
+                if not counters[key]:
+                    del counters[key]
+    return counters, decrements
+
+
+class SpaceSaving(Generic[T]):
+    """Fixed-size heavy-hitter counters over a stream (Space-Saving, Metwally et al.)
+
+    At most capacity items are monitored. An unmonitored item replaces the one
+    with the lowest count and inherits that count as its error, so a monitored
+    item's true count lies in [count - error, count] and an unmonitored item
+    occurs at most min_count() times. Every item occurring more than
+    n / capacity times is monitored.
+    """
+
+    __slots__ = ('capacity', 'counts', 'errors', '_by_count', '_min')
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.counts: Dict[T, int] = {}
+        self.errors: Dict[T, int] = {}
+        # Monitored items by count, oldest first, for O(1) eviction of a minimum
+        self._by_count: Dict[int, Dict[T, None]] = {}
+        self._min = 0
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self.counts
+
+    def add(self, item: T) -> Optional[T]:
+        """Count one occurrence of item; returns the item it evicted, if any"""
+        evicted = None
+        count = self.counts.get(item)
+        if count is not None:
+            self._unlink(item, count)
+        elif len(self.counts) < self.capacity:
+            count = 0
+            self.errors[item] = 0
+        else:
+            count = self._min
+            evicted = next(iter(self._by_count[count]))
+            self._unlink(evicted, count)
+            del self.counts[evicted], self.errors[evicted]
+            self.errors[item] = count
+        self.counts[item] = count + 1
+        self._by_count.setdefault(count + 1, {})[item] = None
+        if count == 0 or count == self._min and count not in self._by_count:
+            self._min = count + 1
+        return evicted
+
+    def _unlink(self, item: T, count: int) -> None:
+        bucket = self._by_count[count]
+        del bucket[item]
+        if not bucket:
+            del self._by_count[count]
+
+    def min_count(self) -> int:
+        """Most occurrences any unmonitored item can have"""
+        return self._min if len(self.counts) >= self.capacity else 0
+
+    def to_dict(self) -> Dict:
+        return {'capacity': self.capacity,
+                'items': [[item, self.counts[item], self.errors[item]]
+                          for count in sorted(self._by_count) for item in self._by_count[count]]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SpaceSaving':
+        sketch: SpaceSaving = cls(data['capacity'])
+        for item, count, error in data['items']:
+            sketch.counts[item] = count
+            sketch.errors[item] = error
+            sketch._by_count.setdefault(count, {})[item] = None
+        sketch._min = min(sketch._by_count, default=0)
+        return sketch
+
+
+class DDSketch:
+    """Mergeable quantile sketch with relative-error guarantees for non-negative values"""
+
+    __slots__ = ('relative_accuracy', 'gamma', '_log_gamma', 'max_buckets', 'buckets',
+                 'zero_count', 'count')
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+                 max_buckets: int = DEFAULT_MAX_BUCKETS):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        # Bucket key k counts values in (gamma^(k-1), gamma^k]
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DDSketch):
+            return NotImplemented
+        return (self.gamma, self.zero_count, self.buckets) == \
+            (other.gamma, other.zero_count, other.buckets)
+
+    def __repr__(self) -> str:
+        return f"DDSketch(count={self.count}, buckets={len(self.buckets)})"
+
+    def key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0:
+            self.zero_count += count
+        else:
+            key = self.key(value)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def add_buckets(self, buckets: Iterable[Tuple[int, int]], zero_count: int = 0) -> None:
+        """Add precomputed (key, count) pairs, e.g. from a vectorised pass"""
+        for key, count in buckets:
+            self.buckets[key] = self.buckets.get(key, 0) + count
+            self.count += count
+        self.zero_count += zero_count
+        self.count += zero_count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: 'DDSketch') -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.add_buckets(other.buckets.items(), other.zero_count)
+
+    def _collapse(self) -> None:
+        # Fold the lowest buckets together; only the smallest quantiles lose accuracy
+        keys = sorted(self.buckets)
+        excess = len(keys) - self.max_buckets
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.buckets[target] += self.buckets.pop(key)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate of the q-quantile (0 <= q <= 1); None if the sketch is empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
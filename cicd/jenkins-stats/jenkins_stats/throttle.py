@@ -0,0 +1,223 @@
+"""
+Request throttling shared by every thread that talks to Jenkins
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+class RateLimiter:
+    """Global minimum-interval limiter: at most one call start per `delay` seconds.
+
+    Unlike a per-thread sleep, the interval is enforced across all workers, so
+    `--delay 0.1` still means roughly ten requests per second in total no matter
+    how many workers are running.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = max(0.0, delay)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def reserve(self) -> float:
+        """Claim the next slot and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.delay
+            return slot - now
+
+    def wait(self) -> None:
+        """Block until the caller's slot comes up"""
+        if self.delay <= 0:
+            return
+        pause = self.reserve()
+        if pause > 0:
+            time.sleep(pause)
+
+
+# Responses that mean the controller wants us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+# Smoothed latency below this is never treated as congestion
+LATENCY_FLOOR = 0.25
+
+# Multiplicative decreases closer together than this count as one event
+DECREASE_INTERVAL = 1.0
+
+# How often waiters re-check for a free concurrency slot
+SLOT_POLL_INTERVAL = 0.01
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveThrottle:
+    """Token-bucket rate plus an AIMD concurrency limit driven by controller feedback.
+
+    Every request takes a token (refilled at `rate` per second) and an in-flight
+    slot (at most `limit`). Each healthy window of `limit` responses raises both,
+    doubling during slow start and additively afterwards. A 429/503, a transport
+    error or latency well above the best observed latency halves both, and a
+    Retry-After header pauses all requests until it expires.
+    """
+
+    def __init__(self, initial_rate: float = 10.0, max_rate: float = 50.0,
+                 min_rate: float = 0.5, max_concurrency: int = 1, rate_step: float = 1.0,
+                 latency_tolerance: float = 3.0, backoff: float = 0.5,
+                 max_retries: int = 3, max_retry_after: float = 120.0):
+        self.max_rate = max(min_rate, max_rate)
+        self.min_rate = min_rate
+        self.rate = min(self.max_rate, max(min_rate, initial_rate))
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = 1
+        self.rate_step = rate_step
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.max_retries = max_retries
+        self.max_retry_after = max_retry_after
+        self.in_flight = 0
+
+        self._cond = threading.Condition()
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._slow_start = True
+        self._window = 0
+        self._last_decrease = float('-inf')
+        self._smoothed: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self.stats = {
+            'responses': 0, 'increases': 0, 'decreases': 0, 'throttled': 0,
+            'slow': 0, 'errors': 0, 'retries': 0, 'retry_after_wait': 0.0,
+            'peak_rate': self.rate, 'peak_limit': self.limit,
+        }
+
+    def _try_acquire(self) -> float:
+        """Take a token and a slot, or return how long to wait before trying again"""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        capacity = float(self.limit)
+        self._tokens = min(capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.in_flight >= self.limit:
+            return SLOT_POLL_INTERVAL
+        if self._tokens < 1.0:
+            return (1.0 - self._tokens) / self.rate
+        self._tokens -= 1.0
+        self.in_flight += 1
+        return 0.0
+
+    def acquire(self) -> None:
+        """Block until a request may start"""
+        with self._cond:
+            while True:
+                pause = self._try_acquire()
+                if pause <= 0:
+                    return
+                self._cond.wait(pause)
+
+    async def acquire_async(self) -> None:
+        """acquire() for coroutines, without blocking the event loop"""
+        while True:
+            with self._cond:
+                pause = self._try_acquire()
+            if pause <= 0:
+                return
+            await asyncio.sleep(pause)
+
+    def release(self, status_code: Optional[int] = None, latency: Optional[float] = None,
+                retry_after: Optional[str] = None) -> None:
+        """Return the slot and adapt to the response (status_code None = transport error)"""
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._on_response(status_code, latency, retry_after)
+            self._cond.notify_all()
+
+    def should_retry(self, status_code: int, attempt: int) -> bool:
+        """Whether a throttled response should be retried (attempt counts from 0)"""
+        if status_code in THROTTLE_STATUSES and attempt < self.max_retries:
+            with self._cond:
+                self.stats['retries'] += 1
+            return True
+        return False
+
+    def _on_response(self, status_code: Optional[int], latency: Optional[float],
+                     retry_after: Optional[str]) -> None:
+        now = time.monotonic()
+        self.stats['responses'] += 1
+        if status_code is None:
+            self._decrease(now, 'errors')
+            return
+        if status_code in THROTTLE_STATUSES:
+            pause = parse_retry_after(retry_after)
+            if pause is not None:
+                until = now + min(pause, self.max_retry_after)
+                if until > self._paused_until:
+                    self.stats['retry_after_wait'] += until - max(now, self._paused_until)
+                    self._paused_until = until
+            self._decrease(now, 'throttled')
+            return
+        if latency is not None:
+            self._smoothed = latency if self._smoothed is None else 0.8 * self._smoothed + 0.2 * latency
+            # The baseline follows the best recent latency and drifts up slowly so a
+            # few fast early requests don't mark everything after them as slow
+            if self._baseline is None:
+                self._baseline = self._smoothed
+            else:
+                self._baseline = min(self._smoothed, self._baseline * 1.01)
+            if self._smoothed > max(LATENCY_FLOOR, self._baseline * self.latency_tolerance):
+                self._decrease(now, 'slow')
+                return
+        self._window += 1
+        if self._window >= self.limit:
+            self._window = 0
+            self._increase()
+
+    def _increase(self) -> None:
+        if self._slow_start:
+            limit, rate = self.limit * 2, self.rate * 2
+        else:
+            limit, rate = self.limit + 1, self.rate + self.rate_step
+        limit, rate = min(self.max_concurrency, limit), min(self.max_rate, rate)
+        if (limit, rate) != (self.limit, self.rate):
+            self.limit, self.rate = limit, rate
+            self.stats['increases'] += 1
+            self.stats['peak_rate'] = max(self.stats['peak_rate'], rate)
+            self.stats['peak_limit'] = max(self.stats['peak_limit'], limit)
+
+    def _decrease(self, now: float, reason: str) -> None:
+        self.stats[reason] += 1
+        self._slow_start = False
+        self._window = 0
+        if now - self._last_decrease < DECREASE_INTERVAL:
+            return
+        self._last_decrease = now
+        self.limit = max(1, int(self.limit * self.backoff))
+        self.rate = max(self.min_rate, self.rate * self.backoff)
+        self._tokens = min(self._tokens, float(self.limit))
+        self.stats['decreases'] += 1
+
+    def summary(self) -> Dict:
+        """Current settings and the decisions taken so far"""
+        with self._cond:
+            return dict(self.stats, rate=self.rate, limit=self.limit)
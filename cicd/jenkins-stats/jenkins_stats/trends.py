@@ -0,0 +1,85 @@
+"""
+Time buckets for --bucket trend output
+
+Build timestamps (epoch milliseconds) are mapped to the UTC day, week
+(starting Monday) or calendar month they fall in. Bucket ids are numbered in
+time order from the earliest bucket present, so a (value, bucket) pair can be
+combined into a single group id and aggregated like any other grouping. Labels
+are the bucket's first day ('2024-05-06'), or the month ('2024-05').
+
+With NumPy the whole timestamp column is bucketed in a few array operations;
+the pure-Python loop gives the same ids.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - pure-Python fallback is always available
+    np = None  # type: ignore[assignment]
+
+# Bucket sizes accepted by --bucket
+BUCKETS = ('day', 'week', 'month')
+
+MS_PER_DAY = 86400 * 1000
+
+# 1970-01-01 was a Thursday; shifting day numbers by 3 makes weeks start on Monday
+EPOCH_WEEKDAY = 3
+
+EPOCH = date(1970, 1, 1)
+
+
+def _ordinal(days: int, bucket: str) -> int:
+    """Bucket number of a day since the epoch: days, weeks or months since 1970"""
+    if bucket == 'day':
+        return days
+    if bucket == 'week':
+        return (days + EPOCH_WEEKDAY) // 7
+    day = EPOCH + timedelta(days=days)
+    return (day.year - 1970) * 12 + day.month - 1
+
+
+def _label(ordinal: int, bucket: str) -> str:
+    if bucket == 'day':
+        return (EPOCH + timedelta(days=ordinal)).isoformat()
+    if bucket == 'week':
+        return (EPOCH + timedelta(days=ordinal * 7 - EPOCH_WEEKDAY)).isoformat()
+    return f"{1970 + ordinal // 12:04d}-{ordinal % 12 + 1:02d}"
+
+
+def bucket_ids(timestamps: Union[Sequence[int], 'np.ndarray'],
+               bucket: str) -> Tuple[Union[List[int], 'np.ndarray'], List[str]]:
+    """Per-build bucket ids (-1 where the timestamp is unknown) and each id's label
+
+    A NumPy array of timestamps gets a NumPy array of ids back.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket '{bucket}'. Choose from: {', '.join(BUCKETS)}")
+    if np is not None and isinstance(timestamps, np.ndarray):
+        known = timestamps > 0
+        if bucket == 'month':
+            codes = timestamps[known].astype('datetime64[ms]').astype('datetime64[M]') \
+                .astype(np.int64)
+        else:
+            day_numbers = timestamps[known] // MS_PER_DAY
+            codes = day_numbers if bucket == 'day' else (day_numbers + EPOCH_WEEKDAY) // 7
+        unique, inverse = np.unique(codes, return_inverse=True)
+        array_ids = np.full(len(timestamps), -1, dtype=np.int64)
+        array_ids[known] = inverse.reshape(-1)
+        return array_ids, [_label(ordinal, bucket) for ordinal in unique.tolist()]
+    # Many builds share a day, so convert each day once
+    by_day: Dict[int, int] = {}
+    ordinals: List[Optional[int]] = []
+    for timestamp in timestamps:
+        if timestamp <= 0:
+            ordinals.append(None)
+            continue
+        days = timestamp // MS_PER_DAY
+        if days not in by_day:
+            by_day[days] = _ordinal(days, bucket)
+        ordinals.append(by_day[days])
+    present = sorted(set(by_day.values()))
+    positions = {ordinal: position for position, ordinal in enumerate(present)}
+    ids = [-1 if ordinal is None else positions[ordinal] for ordinal in ordinals]
+    return ids, [_label(ordinal, bucket) for ordinal in present]
@@ -0,0 +1,77 @@
+"""
+Time windows for --since/--until
+
+Bounds are given as an ISO date or time ('2024-05-01', '2024-05-01T12:00')
+or as an age relative to now ('7d', '12h', '30m', '2w') and compared with the
+build 'timestamp' field, which Jenkins reports in epoch milliseconds.
+
+Jenkins lists builds newest first, so once a page contains a build older than
+the lower bound, every later page is older still and paging can stop.
+"""
+
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Units accepted in relative bounds such as '7d'
+AGE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+AGE_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)([smhdw])$')
+
+
+def parse_time_bound(value: str, now: Optional[float] = None) -> int:
+    """Epoch milliseconds for an ISO date/time or an age such as '7d'
+
+    Dates and times without a UTC offset are taken as local time.
+    """
+    text = value.strip()
+    match = AGE_PATTERN.match(text.lower())
+    if match:
+        now = time.time() if now is None else now
+        return int((now - float(match.group(1)) * AGE_UNITS[match.group(2)]) * 1000)
+    try:
+        moment = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"Invalid time '{value}': use an ISO date or time "
+                         f"(2024-05-01, 2024-05-01T12:00) or an age such as 7d, 12h or 30m")
+    return int(moment.timestamp() * 1000)
+
+
+class TimeWindow:
+    """Half-open [since, until) range of build start times in epoch milliseconds"""
+
+    def __init__(self, since: Optional[int] = None, until: Optional[int] = None):
+        if since is not None and until is not None and since >= until:
+            raise ValueError("--since must be earlier than --until")
+        self.since = since
+        self.until = until
+
+    def __bool__(self) -> bool:
+        return self.since is not None or self.until is not None
+
+    def contains(self, build: Dict) -> bool:
+        """Whether a build started inside the window; builds without a timestamp are kept"""
+        timestamp = build.get('timestamp')
+        if timestamp is None:
+            return True
+        if self.since is not None and timestamp < self.since:
+            return False
+        return self.until is None or timestamp < self.until
+
+    def clip(self, builds: List[Dict]) -> Tuple[List[Dict], bool]:
+        """Builds of one newest-first page inside the window, and whether the page
+        reached past the lower bound (so no later page can match)"""
+        if not self:
+            return builds, False
+        passed = self.since is not None and any(
+            build.get('timestamp') is not None and build['timestamp'] < self.since
+            for build in builds)
+        return [build for build in builds if self.contains(build)], passed
+
+    def describe(self) -> str:
+        def fmt(ms: int) -> str:
+            return datetime.fromtimestamp(ms / 1000).strftime('%Y-%m-%d %H:%M')
+        since = fmt(self.since) if self.since is not None else 'the beginning'
+        until = fmt(self.until) if self.until is not None else 'now'
+        return f"{since} to {until}"
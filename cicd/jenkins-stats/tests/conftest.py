@@ -0,0 +1,106 @@
+"""Shared fixtures: a stub Jenkins HTTP server running on localhost."""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+class StubJenkins:
+    """Serve canned Jenkins API responses and record every request path.
+
+    A route is a JSON-able body, an XML string, a (status, body) or
+    (status, body, headers) tuple, or a callable taking the query dict and
+    returning any of those.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                with stub._lock:
+                    stub.requests.append((parsed.path, query))
+                route = stub.routes.get(parsed.path)
+                if route is None:
+                    self._send(404, b'not found', 'text/plain')
+                    return
+                body = route(query) if callable(route) else route
+                headers = {}
+                if isinstance(body, tuple):
+                    status, body, *extra = body
+                    if extra:
+                        headers = extra[0]
+                else:
+                    status = 200
+                if isinstance(body, str):
+                    self._send(status, body.encode('utf-8'), 'application/xml', headers)
+                else:
+                    self._send(status, json.dumps(body).encode('utf-8'), 'application/json',
+                               headers)
+
+            def _send(self, status, payload, content_type, headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever,
+                                        kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+
+    def add_job(self, path, builds, name=None, loaded=None):
+        """Serve a job like Jenkins: firstBuild/lastBuild and builds[...]{start,end} ranges
+
+        builds are given newest first; range ends are exclusive, as in Jenkins.
+        With loaded, 'builds' only lists that many builds (Jenkins' lazily loaded
+        window) while 'allBuilds' lists them all.
+        """
+        def route(query):
+            tree = query.get('tree', '')
+            body = {'name': name or path.rstrip('/').split('/')[-1]}
+            numbers = [build['number'] for build in builds]
+            if 'firstBuild' in tree:
+                body['firstBuild'] = {'number': min(numbers)} if numbers else None
+            if 'lastBuild' in tree:
+                body['lastBuild'] = {'number': max(numbers)} if numbers else None
+            for field, listed in (('builds', builds[:loaded]), ('allBuilds', builds)):
+                if f'{field}[' in tree:
+                    match = re.search(r'\{(\d+),(\d+)\}$', tree)
+                    start, end = (int(match.group(1)), int(match.group(2))) if match else (0, 100)
+                    body[field] = listed[start:end]
+            return body
+        self.routes[f"{path}/api/json"] = route
+
+    def paths(self):
+        with self._lock:
+            return [path for path, _ in self.requests]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_jenkins():
+    stub = StubJenkins()
+    yield stub
+    stub.close()
@@ -0,0 +1,75 @@
+"""Tests for the optional async backend against a local stub server."""
+
+import pytest
+
+from jenkins_stats.exporter import JenkinsJobExporter
+
+pytest.importorskip("httpx")
+
+
+def make_builds(job_name, count=3):
+    return {"builds": [
+        {"number": n, "result": "SUCCESS" if n % 2 else "FAILURE", "duration": 60000,
+         "actions": [{"parameters": [{"name": "env", "value": "prod" if n % 2 else "dev"}]}]}
+        for n in range(1, count + 1)
+    ]}
+
+
+def install_jobs(stub, count):
+    stub.routes["/api/json"] = {"jobs": [
+        {"name": f"job-{i}", "url": f"{stub.url}/job/job-{i}/"} for i in range(count)
+    ]}
+    for i in range(count):
+        stub.routes[f"/job/job-{i}/api/json"] = make_builds(f"job-{i}")
+        stub.routes[f"/job/job-{i}/config.xml"] = f"<project>job-{i}</project>"
+
+
+def test_async_backend_matches_requests_backend(stub_jenkins, tmp_path):
+    """Both backends produce identical statistics from the same server."""
+    install_jobs(stub_jenkins, 10)
+
+    results = {}
+    for backend in ("requests", "async"):
+        exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                      workers=4, backend=backend, connections=2)
+        try:
+            results[backend] = exporter.export_jobs_with_stats(
+                str(tmp_path / backend), "env", export_configs=True)
+        finally:
+            exporter.close()
+
+    assert results["async"] == results["requests"]
+    assert results["async"]["prod"]["total_builds"] == 20
+    assert len(results["async"]["dev"]["jobs"]) == 10
+    assert (tmp_path / "async" / "job-3_config.xml").read_text() == "<project>job-3</project>"
+
+
+def test_async_backend_single_request_api(stub_jenkins):
+    """Synchronous exporter methods work unchanged on the async backend."""
+    install_jobs(stub_jenkins, 2)
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  backend="async")
+    try:
+        assert [job["name"] for job in exporter.get_all_jobs()] == ["job-0", "job-1"]
+        assert len(exporter.get_job_builds("job-1")["builds"]) == 3
+        assert exporter.get_job_config("job-0") == "<project>job-0</project>"
+    finally:
+        exporter.close()
+
+
+def test_async_backend_http_errors_match_requests(stub_jenkins):
+    """HTTP errors surface as requests exceptions regardless of backend."""
+    import requests
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  backend="async")
+    try:
+        with pytest.raises(requests.exceptions.HTTPError):
+            exporter.get_job_builds("missing")
+    finally:
+        exporter.close()
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        JenkinsJobExporter("http://jenkins.example.com", backend="carrier-pigeon")
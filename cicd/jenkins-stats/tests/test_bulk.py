@@ -0,0 +1,70 @@
+"""Tests for bulk multi-job build queries."""
+
+import re
+
+from jenkins_stats.exporter import JenkinsJobExporter
+
+
+def job_builds(name, count=4):
+    return [{"number": n, "result": "SUCCESS", "duration": 100,
+             "actions": [{"parameters": [{"name": "env", "value": name[-1]}]}]}
+            for n in range(count, 0, -1)]
+
+
+def install_root(stub, names, broken=()):
+    def root(query):
+        tree = query["tree"]
+        entries = [{"name": name, "url": f"{stub.url}/job/{name}/", "fullName": name}
+                   for name in names]
+        if not tree.startswith("jobs[name,builds["):
+            return {"jobs": entries}
+        job_range = re.search(r"\]\{(\d+),(\d+)\}$", tree)
+        start, end = int(job_range.group(1)), int(job_range.group(2))
+        if any(start <= names.index(name) < end for name in broken):
+            return 500, {"error": "boom"}
+        return {"jobs": [{"name": name, "builds": job_builds(name)} for name in names[start:end]]}
+
+    stub.routes["/api/json"] = root
+    for name in names:
+        stub.routes[f"/job/{name}/api/json"] = {"builds": job_builds(name)}
+
+
+def test_bulk_mode_fetches_sibling_jobs_per_request(stub_jenkins, tmp_path):
+    names = [f"job-{i}" for i in range(10)]
+    install_root(stub_jenkins, names)
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent")
+    stats = exporter.export_jobs_with_stats(str(tmp_path), "env", max_builds=4,
+                                            bulk=True, bulk_max_builds=16)
+
+    # Discovery plus 10 jobs / (16 // 4) per request = 3 bulk requests
+    assert stub_jenkins.paths() == ["/api/json"] * 4
+    assert sum(s["total_builds"] for s in stats.values()) == 40
+    assert stats["3"]["jobs"] == {"job-3"}
+
+
+def test_bulk_mode_respects_filtered_gaps(stub_jenkins, tmp_path):
+    """Filtered-out siblings still count against the chunk span."""
+    names = ["deploy-a", "x1", "x2", "x3", "x4", "deploy-b"]
+    install_root(stub_jenkins, names)
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent")
+    jobs = exporter.get_all_jobs(job_filter="deploy")
+
+    chunks = exporter._plan_bulk_chunks(jobs, max_builds=10, bulk_max_builds=30)
+    assert [[job["name"] for job in chunk] for chunk in chunks] == [["deploy-a"], ["deploy-b"]]
+    chunks = exporter._plan_bulk_chunks(jobs, max_builds=10, bulk_max_builds=60)
+    assert [[job["name"] for job in chunk] for chunk in chunks] == [["deploy-a", "deploy-b"]]
+
+
+def test_bulk_mode_falls_back_to_per_job_requests(stub_jenkins, tmp_path):
+    names = [f"job-{i}" for i in range(4)]
+    install_root(stub_jenkins, names, broken=["job-1"])
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent")
+    stats = exporter.export_jobs_with_stats(str(tmp_path), "env", max_builds=4,
+                                            bulk=True, bulk_max_builds=8)
+
+    assert sum(s["total_builds"] for s in stats.values()) == 16
+    assert exporter.bulk_fallbacks == 2
+    assert sorted(p for p in stub_jenkins.paths() if p != "/api/json") == \
+        ["/job/job-0/api/json", "/job/job-1/api/json"]
@@ -0,0 +1,225 @@
+"""Tests for the persistent build cache and incremental refresh."""
+
+import re
+
+import pytest
+import requests
+
+from jenkins_stats.cache import BuildCache
+from jenkins_stats.exporter import JenkinsJobExporter
+from jenkins_stats.window import TimeWindow
+
+
+def build(number, result="SUCCESS", building=False):
+    return {"number": number, "result": None if building else result, "building": building,
+            "duration": 1000, "timestamp": number * 1000,
+            "actions": [{"parameters": [{"name": "env", "value": "prod"}]}]}
+
+
+def ranged_builds(history):
+    """Route that honours the {start,end} range of a builds tree query."""
+    def route(query):
+        match = re.search(r"\{(\d+),(\d+)\}", query.get("tree", ""))
+        start, end = (int(match.group(1)), int(match.group(2))) if match else (0, len(history))
+        return {"builds": history[start:end]}
+    return route
+
+
+def test_build_cache_roundtrip(tmp_path):
+    cache = BuildCache(str(tmp_path / "builds.db"))
+    cache.store_builds("http://j/job/a/", [build(1), build(3, building=True), build(2)])
+
+    assert cache.latest_number("http://j/job/a") == 3
+    assert cache.running_numbers("http://j/job/a") == [3]
+    assert [b["number"] for b in cache.get_builds("http://j/job/a")] == [3, 2, 1]
+    assert [b["number"] for b in cache.get_builds("http://j/job/a", limit=2)] == [3, 2]
+    assert cache.latest_number("http://j/job/other") is None
+    cache.close()
+
+
+def test_incremental_refresh_fetches_only_new_builds(stub_jenkins, tmp_path):
+    """The second run asks for one small page and re-polls only the running build."""
+    history = [build(n) for n in range(50, 0, -1)]
+    history[0] = build(50, building=True)
+    stub_jenkins.routes["/job/app/api/json"] = ranged_builds(history)
+    cache_path = str(tmp_path / "cache.db")
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  cache_path=cache_path)
+    first = exporter.get_job_builds("app", max_builds=40)["builds"]
+    exporter.close()
+    assert [b["number"] for b in first] == list(range(50, 10, -1))
+
+    # Two new builds arrive and build 50 finishes
+    history[:1] = [build(52), build(51), build(50, result="FAILURE")]
+    stub_jenkins.requests.clear()
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  cache_path=cache_path)
+    second = exporter.get_job_builds("app", max_builds=40)["builds"]
+    counts = exporter.cache.counts
+    exporter.close()
+
+    # Build 50 came back in the first page, so no separate re-poll was needed
+    assert stub_jenkins.paths() == ["/job/app/api/json"]
+    assert "{0,10}" in stub_jenkins.requests[0][1]["tree"]
+    assert [b["number"] for b in second] == list(range(52, 12, -1))
+    assert second[2]["result"] == "FAILURE"
+    assert counts == {"cached_builds": 37, "new_builds": 2, "repolled_builds": 1}
+
+
+def test_incremental_refresh_repolls_running_build_outside_page(stub_jenkins, tmp_path):
+    """A running build older than the first page is re-polled individually."""
+    history = [build(n) for n in range(30, 0, -1)]
+    history[20] = build(10, building=True)
+    stub_jenkins.routes["/job/app/api/json"] = ranged_builds(history)
+    stub_jenkins.routes["/job/app/10/api/json"] = build(10, result="ABORTED")
+    cache_path = str(tmp_path / "cache.db")
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  cache_path=cache_path)
+    exporter.get_job_builds("app", max_builds=30)
+    stub_jenkins.requests.clear()
+    builds = exporter.get_job_builds("app", max_builds=30)["builds"]
+    exporter.close()
+
+    assert stub_jenkins.paths() == ["/job/app/api/json", "/job/app/10/api/json"]
+    assert builds[20]["result"] == "ABORTED"
+
+
+def test_skip_unchanged_serves_quiet_jobs_from_cache(stub_jenkins, tmp_path):
+    """A second run only fetches the job with a new build; the rest cost no request."""
+    histories = {"quiet": [build(n) for n in range(5, 0, -1)],
+                 "busy": [build(n) for n in range(3, 0, -1)]}
+    jobs = [{"name": name, "url": f"{stub_jenkins.url}/job/{name}/", "buildable": True,
+             "color": "blue", "lastBuild": {key: h[0][key] for key in ("number", "timestamp")}}
+            for name, h in histories.items()]
+    jobs.append({"name": "off", "url": f"{stub_jenkins.url}/job/off/", "buildable": False,
+                 "color": "disabled", "lastBuild": {"number": 1, "timestamp": 1000}})
+    jobs.append({"name": "new", "url": f"{stub_jenkins.url}/job/new/", "buildable": True,
+                 "color": "notbuilt", "lastBuild": None})
+    stub_jenkins.routes["/api/json"] = {"jobs": jobs}
+    for name, history in histories.items():
+        stub_jenkins.routes[f"/job/{name}/api/json"] = ranged_builds(history)
+    cache_path = str(tmp_path / "cache.db")
+
+    def run():
+        stub_jenkins.requests.clear()
+        exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                      cache_path=cache_path, folder_depth=1, skip_unchanged=True)
+        stats = exporter.export_jobs_with_stats(str(tmp_path / "out"), "env", max_builds=10)
+        skipped = dict(exporter.skipped_jobs)
+        exporter.close()
+        return stats, skipped
+
+    stats, skipped = run()
+    assert "lastBuild[number,timestamp]" in stub_jenkins.requests[0][1]["tree"]
+    assert sorted(stub_jenkins.paths()[1:]) == ["/job/busy/api/json", "/job/quiet/api/json"]
+    assert skipped == {"disabled": 1, "never built": 1, "unchanged": 0}
+    assert stats["prod"]["total_builds"] == 8
+
+    histories["busy"].insert(0, build(4))
+    jobs[1]["lastBuild"] = {"number": 4, "timestamp": 4000}
+    stats, skipped = run()
+    assert stub_jenkins.paths()[1:] == ["/job/busy/api/json"]
+    assert skipped == {"disabled": 1, "never built": 1, "unchanged": 1}
+    assert stats["prod"]["total_builds"] == 9
+    assert stats["prod"]["jobs"] == {"quiet", "busy"}
+
+
+def test_raising_max_builds_backfills_older_builds(stub_jenkins, tmp_path):
+    """A larger -b (or --deep-history) fetches the older builds the cache lacks."""
+    stub_jenkins.add_job("/job/a", [build(n) for n in range(50, 0, -1)], loaded=30)
+    cache_path = str(tmp_path / "builds.db")
+
+    def fetch(max_builds, **kwargs):
+        exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                      cache_path=cache_path, **kwargs)
+        try:
+            return [b["number"] for b in exporter.get_job_builds("a", max_builds)["builds"]]
+        finally:
+            exporter.close()
+
+    assert fetch(5) == list(range(50, 45, -1))
+    assert fetch(40) == list(range(50, 20, -1))
+    # 'builds' stopped at the 30 loaded builds; a repeat run doesn't ask for older ones again
+    stub_jenkins.requests.clear()
+    assert fetch(40) == list(range(50, 20, -1))
+    assert len(stub_jenkins.requests) == 1
+    # allBuilds reaches further back
+    assert fetch(45, deep_history=True) == list(range(50, 5, -1))
+    assert fetch(60, deep_history=True) == list(range(50, 0, -1))
+    stub_jenkins.requests.clear()
+    assert fetch(60, deep_history=True) == list(range(50, 0, -1))
+    assert len(stub_jenkins.requests) == 1
+
+
+def _cached_exporter(stub_jenkins, cache_path, **kwargs):
+    return JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                              cache_path=cache_path, min_page_size=10, max_page_size=20, **kwargs)
+
+
+def test_first_fetch_pages_into_cache_down_to_since(stub_jenkins, tmp_path):
+    """The first cached fetch pages like a live one and stops at the page crossing --since."""
+    stub_jenkins.routes["/job/app/api/json"] = ranged_builds([build(n) for n in range(100, 0, -1)])
+    cache_path = str(tmp_path / "cache.db")
+
+    for requests_made in (2, 1):
+        stub_jenkins.requests.clear()
+        exporter = _cached_exporter(stub_jenkins, cache_path)
+        exporter.window = TimeWindow(since=65 * 1000)
+        builds = exporter.get_job_builds("app", max_builds=100)["builds"]
+        exporter.close()
+        assert [b["number"] for b in builds] == list(range(100, 64, -1))
+        # The second run's cache already reaches past --since, so nothing is backfilled
+        assert len(stub_jenkins.requests) == requests_made
+
+
+def test_interrupted_first_fetch_keeps_stored_pages(stub_jenkins, tmp_path):
+    """Pages are cached as they arrive; the next run backfills from where the first stopped."""
+    history = [build(n) for n in range(50, 0, -1)]
+    serve = ranged_builds(history)
+    failing = {"from": 20}
+
+    def route(query):
+        start = int(re.search(r"\{(\d+),", query["tree"]).group(1))
+        return (500, "Internal Server Error") if start >= failing["from"] else serve(query)
+    stub_jenkins.routes["/job/app/api/json"] = route
+    cache_path = str(tmp_path / "cache.db")
+
+    exporter = _cached_exporter(stub_jenkins, cache_path)
+    with pytest.raises(requests.exceptions.HTTPError):
+        exporter.get_job_builds("app", max_builds=50)
+    assert exporter.cache.build_count(f"{stub_jenkins.url}/job/app") == 20
+    exporter.close()
+
+    failing["from"] = len(history)
+    exporter = _cached_exporter(stub_jenkins, cache_path)
+    builds = exporter.get_job_builds("app", max_builds=50)["builds"]
+    exporter.close()
+    assert [b["number"] for b in builds] == list(range(50, 0, -1))
+
+
+def test_cached_fetches_use_and_report_adaptive_pages(stub_jenkins, tmp_path, capsys):
+    """Top-ups start at 10 builds and grow; every cached page shows in the -v page summary."""
+    history = [build(n) for n in range(100, 0, -1)]
+    stub_jenkins.routes["/job/app/api/json"] = ranged_builds(history)
+    cache_path = str(tmp_path / "cache.db")
+    exporter = _cached_exporter(stub_jenkins, cache_path)
+    exporter.get_job_builds("app", max_builds=30)
+    exporter.close()
+
+    history[:0] = [build(n) for n in range(135, 100, -1)]
+    stub_jenkins.requests.clear()
+    exporter = _cached_exporter(stub_jenkins, cache_path)
+    builds = exporter.get_job_builds("app", max_builds=80)["builds"]
+    exporter.print_page_summary()
+    exporter.close()
+
+    assert [b["number"] for b in builds] == list(range(135, 55, -1))
+    ranges = [re.search(r"\{(\d+),(\d+)\}", query["tree"]).groups()
+              for _, query in stub_jenkins.requests]
+    # Top-up pages grow from 10 to the 20-build maximum until they reach cached build 100;
+    # the backfill then continues below the 65 builds now cached
+    assert ranges == [("0", "10"), ("10", "30"), ("30", "50"), ("65", "80")]
+    assert "Build pages: 4 requested" in capsys.readouterr().out
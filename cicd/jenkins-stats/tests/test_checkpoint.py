@@ -0,0 +1,198 @@
+"""Tests for checkpointed, resumable crawls."""
+
+import time
+
+import pytest
+import requests
+
+from jenkins_stats import exporter as exporter_module
+from jenkins_stats.checkpoint import CrawlCheckpoint, is_transient
+from jenkins_stats.exporter import JenkinsJobExporter
+from jenkins_stats.records import BuildStore
+
+
+def builds_for(value, count=2):
+    return {"builds": [{"number": n, "result": "SUCCESS", "duration": 10,
+                        "actions": [{"parameters": [{"name": "env", "value": value}]}]}
+                       for n in range(count, 0, -1)]}
+
+
+def serve_jobs(stub_jenkins, names):
+    stub_jenkins.routes["/api/json"] = {"jobs": [
+        {"name": name, "url": f"{stub_jenkins.url}/job/{name}/"} for name in names]}
+    for name in names:
+        stub_jenkins.routes[f"/job/{name}/api/json"] = builds_for("qa")
+
+
+def test_store_round_trips_through_checkpoint(tmp_path):
+    store = BuildStore(["env", "branch"])
+    store.add_builds("a", [{"number": 1, "result": "FAILURE", "duration": 5, "timestamp": 7,
+                            "actions": [{"parameters": [{"name": "env", "value": "qa"}]}]}])
+    checkpoint = CrawlCheckpoint(tmp_path, "http://jenkins", ["env"])
+    checkpoint.start()
+    checkpoint.add_job("a", store)
+    checkpoint.save()
+    checkpoint.close()
+
+    loaded, completed = checkpoint.load()
+    assert completed == {"a"}
+    assert loaded.aggregate("env") == store.aggregate("env")
+    assert list(loaded.timestamp) == [7]
+    checkpoint.close()
+
+    with pytest.raises(ValueError):
+        CrawlCheckpoint(tmp_path, "http://other", ["env"]).load()
+    with pytest.raises(ValueError):
+        CrawlCheckpoint(tmp_path, "http://jenkins", ["version"]).load()
+
+
+def test_checkpoint_appends_segments_and_drops_a_cut_short_one(tmp_path):
+    store = BuildStore(["env"])
+    store.add_builds("a", builds_for("qa")["builds"])
+    checkpoint = CrawlCheckpoint(tmp_path, "http://jenkins", ["env"])
+    checkpoint.start()
+    checkpoint.add_job("a", store)
+    checkpoint.save()
+    first = checkpoint.path.read_text()
+    checkpoint.add_job("b", store)
+    checkpoint.save(["c"])
+    checkpoint.close()
+    # Later saves only append
+    text = checkpoint.path.read_text()
+    assert text.startswith(first)
+    assert [line[:8] for line in text[len(first):].splitlines()] == ['{"job": ', '{"failed']
+
+    # An interruption in the middle of writing b's segment again
+    with checkpoint.path.open("a") as f:
+        f.write('{"job": "c", "store": {"par')
+    resumed = CrawlCheckpoint(tmp_path, "http://jenkins", ["env"])
+    loaded, completed = resumed.load()
+    assert completed == {"a", "b"}
+    assert loaded.aggregate("env")["qa"]["total_builds"] == 4
+    resumed.add_job("c", store)
+    resumed.save()
+    resumed.close()
+    assert CrawlCheckpoint(tmp_path, "http://jenkins", ["env"]).load()[1] == {"a", "b", "c"}
+
+
+def test_resume_refuses_changed_options(tmp_path):
+    options = {"max_builds": 100, "since": None, "until": None, "groupings": [["env"]]}
+    checkpoint = CrawlCheckpoint(tmp_path, "http://jenkins", ["env"], options)
+    checkpoint.start()
+    checkpoint.close()
+
+    for changed in ({"max_builds": 50}, {"groupings": [["env"], ["branch"]]}):
+        with pytest.raises(ValueError, match=next(iter(changed))):
+            CrawlCheckpoint(tmp_path, "http://jenkins", ["env"], {**options, **changed}).load()
+    resumed = CrawlCheckpoint(tmp_path, "http://jenkins", ["env"], {**options, "since": 5})
+    resumed.load()
+    resumed.close()
+    assert resumed.saved_options == options
+
+
+def test_transient_errors():
+    response = requests.Response()
+    response.status_code = 503
+    assert is_transient(requests.exceptions.HTTPError(response=response))
+    response.status_code = 404
+    assert not is_transient(requests.exceptions.HTTPError(response=response))
+    assert is_transient(requests.exceptions.ConnectionError())
+    assert not is_transient(ValueError())
+
+
+def test_transient_failures_are_retried(stub_jenkins, tmp_path, monkeypatch):
+    monkeypatch.setattr(exporter_module, "RETRY_BACKOFF", 0)
+    serve_jobs(stub_jenkins, ["a", "b"])
+    responses = [(503, "busy"), builds_for("prod")]
+    stub_jenkins.routes["/job/b/api/json"] = lambda query: responses.pop(0)
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent")
+    stats = exporter.export_jobs_with_stats(str(tmp_path), "env")
+
+    assert stats["prod"]["jobs"] == {"b"}
+    assert stats["qa"]["jobs"] == {"a"}
+    assert not (tmp_path / "checkpoint.ndjson").exists()
+
+
+def test_interrupted_crawl_resumes_from_checkpoint(stub_jenkins, tmp_path, monkeypatch):
+    serve_jobs(stub_jenkins, ["a", "b", "c"])
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent")
+    original = exporter._export_single_job
+
+    def export_single_job(job_name, *args, **kwargs):
+        if job_name == "c":
+            raise KeyboardInterrupt
+        return original(job_name, *args, **kwargs)
+
+    monkeypatch.setattr(exporter, "_export_single_job", export_single_job)
+
+    with pytest.raises(KeyboardInterrupt):
+        exporter.export_jobs_with_stats(str(tmp_path), "env", checkpoint_interval=0)
+    assert (tmp_path / "checkpoint.ndjson").exists()
+
+    resumed = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent")
+    stub_jenkins.requests.clear()
+    stats = resumed.export_jobs_with_stats(str(tmp_path), "env", resume=True)
+
+    assert "/job/a/api/json" not in stub_jenkins.paths()
+    assert stub_jenkins.paths().count("/job/c/api/json") == 1
+    assert stats["qa"]["total_builds"] == 6
+    assert stats["qa"]["jobs"] == {"a", "b", "c"}
+    assert not (tmp_path / "checkpoint.ndjson").exists()
+
+
+def test_resume_keeps_the_checkpoint_time_window(stub_jenkins, tmp_path, monkeypatch, capsys):
+    serve_jobs(stub_jenkins, ["a", "b"])
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent")
+    original = exporter._export_single_job
+
+    def export_single_job(job_name, *args, **kwargs):
+        if job_name == "b":
+            raise KeyboardInterrupt
+        return original(job_name, *args, **kwargs)
+
+    monkeypatch.setattr(exporter, "_export_single_job", export_single_job)
+    with pytest.raises(KeyboardInterrupt):
+        exporter.export_jobs_with_stats(str(tmp_path), "env", since=1000)
+
+    resumed = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent")
+    resumed.export_jobs_with_stats(str(tmp_path), "env", since=2000, resume=True)
+    assert resumed.window.since == 1000
+    assert "resuming with that time window" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_interrupt_stops_multi_worker_crawl(stub_jenkins, tmp_path, monkeypatch, bulk):
+    """Ctrl-C cancels the queued jobs instead of fetching all of them first."""
+    names = [f"job{i:02d}" for i in range(20)]
+    serve_jobs(stub_jenkins, names)
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  workers=2, folder_depth=0)
+    fetched = []
+    slow = exporter._fetch_bulk_chunk if bulk else exporter._export_single_job
+
+    def fetch(first, *args, **kwargs):
+        fetched.append(first)
+        time.sleep(0.05)
+        return slow(first, *args, **kwargs)
+
+    monkeypatch.setattr(exporter, "_fetch_bulk_chunk" if bulk else "_export_single_job", fetch)
+    monkeypatch.setattr(exporter, "_plan_bulk_chunks",
+                        lambda jobs, *args: [[job] for job in jobs])
+    saves = []
+    original_save = exporter._save_checkpoint
+
+    def save_checkpoint(*args):
+        saves.append(args)
+        if len(saves) == 1:
+            raise KeyboardInterrupt
+        original_save(*args)
+
+    monkeypatch.setattr(exporter, "_save_checkpoint", save_checkpoint)
+    with pytest.raises(KeyboardInterrupt):
+        exporter.export_jobs_with_stats(str(tmp_path), "env", bulk=bulk,
+                                        checkpoint_interval=1e-9)
+
+    assert len(fetched) <= 4
+    assert (tmp_path / "checkpoint.ndjson").exists()
@@ -0,0 +1,76 @@
+"""Tests for --columnar Parquet/Arrow output."""
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from jenkins_stats.columnar import builds_table  # noqa: E402
+from jenkins_stats.exporter import JenkinsJobExporter  # noqa: E402
+from jenkins_stats.records import BuildStore  # noqa: E402
+
+
+def build(number, result, env=None, branch=None):
+    params = [{"name": name, "value": value}
+              for name, value in (("env", env), ("branch", branch)) if value is not None]
+    return {"number": number, "result": result, "duration": number * 1000,
+            "timestamp": 1_700_000_000_000 + number, "actions": [{"parameters": params}]}
+
+
+def test_builds_table_has_a_column_per_parameter():
+    store = BuildStore(["env", "branch"])
+    store.add_build("app", build(2, "SUCCESS", "qa", "main"))
+    store.add_build("lib", build(1, None, "prod"))
+    store.add_build("lib", {"result": "FAILURE", "actions": []})
+
+    table = builds_table(store)
+    assert table.column_names == ["job", "number", "result", "duration_ms", "timestamp",
+                                  "env", "branch"]
+    assert pa.types.is_dictionary(table.schema.field("env").type)
+    rows = table.to_pylist()
+    assert [row["job"] for row in rows] == ["app", "lib", "lib"]
+    assert [row["number"] for row in rows] == [2, 1, None]
+    assert [row["result"] for row in rows] == ["SUCCESS", None, "FAILURE"]
+    assert [row["env"] for row in rows] == ["qa", "prod", None]
+    assert [row["branch"] for row in rows] == ["main", None, None]
+    assert rows[2]["timestamp"] is None
+
+    # The table borrows the store's buffers; once it is gone the store can grow again
+    del table, rows
+    store.add_build("app", build(3, "SUCCESS", "qa"))
+    assert len(store) == 4
+
+
+@pytest.mark.parametrize("columnar_format", ["parquet", "arrow"])
+def test_export_writes_columnar_statistics_and_builds(stub_jenkins, tmp_path, columnar_format):
+    stub_jenkins.routes["/api/json"] = {"jobs": [
+        {"name": name, "url": f"{stub_jenkins.url}/job/{name}/"} for name in ("app", "lib")]}
+    stub_jenkins.add_job("/job/app", [build(n, "SUCCESS" if n % 3 else "FAILURE", "qa")
+                                      for n in range(9, 0, -1)])
+    stub_jenkins.add_job("/job/lib", [build(n, "SUCCESS", "prod" if n % 2 else "qa")
+                                      for n in range(4, 0, -1)])
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  columnar_format=columnar_format)
+    exporter.export_jobs_with_stats(str(tmp_path), "env")
+
+    if columnar_format == "parquet":
+        stats = pq.read_table(tmp_path / "statistics_by_env.parquet")
+        builds = pq.read_table(tmp_path / "builds.parquet")
+    else:
+        with pa.memory_map(str(tmp_path / "statistics_by_env.arrow")) as source:
+            stats = pa.ipc.open_file(source).read_all()
+        with pa.memory_map(str(tmp_path / "builds.arrow")) as source:
+            builds = pa.ipc.open_file(source).read_all()
+
+    by_value = {row["parameter_value"]: row for row in stats.to_pylist()}
+    assert by_value["qa"]["total_builds"] == 11
+    assert by_value["qa"]["jobs"] == ["app", "lib"]
+    assert by_value["prod"]["jobs"] == ["lib"]
+    assert by_value["qa"]["p50_duration_ms"] > 0
+    assert builds.num_rows == 13
+    assert sorted(set(builds.column("env").to_pylist())) == ["prod", "qa"]
+
+
+def test_unknown_columnar_format():
+    with pytest.raises(ValueError):
+        JenkinsJobExporter("http://jenkins.example.com", columnar_format="orc")
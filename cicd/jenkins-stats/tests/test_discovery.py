@@ -0,0 +1,113 @@
+"""Tests for recursive folder and multibranch job discovery."""
+
+from jenkins_stats.exporter import JenkinsJobExporter
+
+# folder path -> children; a child is a job name (str) or a nested folder (tuple)
+TREE = {
+    "": ["top-job", ("team-a",)],
+    "team-a": ["build", ("services",)],
+    "team-a/services": [("api",), "deploy"],
+    "team-a/services/api": ["main", "feature%2Fx"],
+}
+
+
+def render(stub, path, depth):
+    """Emulate Jenkins for a depth-limited jobs[...] tree query on a folder."""
+    entries = []
+    for child in TREE[path]:
+        name = child[0] if isinstance(child, tuple) else child
+        full = f"{path}/{name}" if path else name
+        url = stub.url + "".join(f"/job/{part}" for part in full.split("/")) + "/"
+        if depth == 0:
+            if isinstance(child, tuple):
+                entries.append({"url": url})
+            continue
+        entry = {"name": name, "url": url, "fullName": full}
+        if isinstance(child, tuple):
+            entry["jobs"] = render(stub, full, depth - 1)
+        entries.append(entry)
+    return entries
+
+
+def install_tree(stub):
+    for path in TREE:
+        route = "/api/json" if not path else \
+            "".join(f"/job/{part}" for part in path.split("/")) + "/api/json"
+        stub.routes[route] = (lambda p: lambda q: {
+            "jobs": render(stub, p, q["tree"].count("jobs[") - 1)})(path)
+
+
+def test_discovers_nested_jobs_with_depth_limited_queries(stub_jenkins):
+    install_tree(stub_jenkins)
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  workers=4, folder_depth=2)
+    jobs = exporter.get_all_jobs()
+
+    assert sorted(job["fullName"] for job in jobs) == [
+        "team-a/build", "team-a/services/api/feature%2Fx", "team-a/services/api/main",
+        "team-a/services/deploy", "top-job",
+    ]
+    # Root request covers two levels; one more request lists the deeper folder
+    assert stub_jenkins.paths() == ["/api/json", "/job/team-a/job/services/api/json"]
+    assert exporter.job_url("team-a/services/api/main") == \
+        f"{stub_jenkins.url}/job/team-a/job/services/job/api/job/main"
+
+
+def test_root_only_discovery(stub_jenkins):
+    install_tree(stub_jenkins)
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  folder_depth=0)
+    assert [job["fullName"] for job in exporter.get_all_jobs()] == ["top-job"]
+
+
+def test_nested_jobs_feed_aggregation(stub_jenkins, tmp_path):
+    """Builds are fetched from each nested job's own URL and written with safe names."""
+    install_tree(stub_jenkins)
+    builds = {"builds": [{"number": 1, "result": "SUCCESS", "duration": 5,
+                          "actions": [{"parameters": [{"name": "env", "value": "qa"}]}]}]}
+    stub_jenkins.routes["/job/team-a/job/services/job/deploy/api/json"] = builds
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent")
+    stats = exporter.export_jobs_with_stats(str(tmp_path), "env", job_filter="deploy",
+                                            export_build_data=True)
+
+    assert stats["qa"]["jobs"] == {"team-a/services/deploy"}
+    assert (tmp_path / "team-a_services_deploy_builds.json").exists()
+
+
+def test_job_url_rebased_onto_given_url():
+    """API URLs that use the controller's configured root are rebased onto ours."""
+    exporter = JenkinsJobExporter("https://proxy.example.com/jenkins")
+    entry = {"name": "app", "url": "http://internal:8080/jenkins/job/folder/job/app/"}
+    exporter._register_job(entry, "folder")
+    assert exporter.job_url("folder/app") == "https://proxy.example.com/jenkins/job/folder/job/app"
+    assert exporter.job_url("other/x y") == "https://proxy.example.com/jenkins/job/other/job/x%20y"
+
+
+def test_prune_jobs_without_tracked_parameters(stub_jenkins, tmp_path):
+    """Only jobs declaring one of the grouped parameters have their builds fetched."""
+    def job(name, *params):
+        return {"name": name, "url": f"{stub_jenkins.url}/job/{name}/",
+                "property": [{"_class": "BuildDiscarderProperty"},
+                             {"parameterDefinitions": [{"name": p} for p in params]}]}
+    legacy = {"name": "legacy", "url": f"{stub_jenkins.url}/job/legacy/"}
+    stub_jenkins.routes["/api/json"] = {"jobs": [
+        job("deploy", "env", "branch"), job("lint", "branch"), job("docs"),
+        job("nightly", "TARGET"), legacy]}
+    for name in ("deploy", "lint", "legacy"):
+        stub_jenkins.routes[f"/job/{name}/api/json"] = {"builds": [{
+            "number": 1, "result": "SUCCESS", "duration": 5,
+            "actions": [{"parameters": [{"name": "env", "value": "qa"},
+                                        {"name": "branch", "value": "main"}]}]}]}
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  folder_depth=1, prune_jobs=True)
+    stats = exporter.export_jobs_with_stats(str(tmp_path), "env", group_by=["branch"])
+
+    assert "parameterDefinitions[name]" in stub_jenkins.requests[0][1]["tree"]
+    # legacy reported no properties, so it is kept
+    assert sorted(stub_jenkins.paths()[1:]) == [
+        "/job/deploy/api/json", "/job/legacy/api/json", "/job/lint/api/json"]
+    assert exporter.pruned_jobs == 2
+    assert stats["qa"]["jobs"] == {"deploy", "legacy", "lint"}
+    assert exporter.grouped_stats["branch"]["main"]["total_builds"] == 3
@@ -1,5 +1,7 @@
 """Tests for Jenkins Stats package."""
 
+import json
+
 import pytest
 from unittest.mock import Mock, patch
 from jenkins_stats.exporter import JenkinsJobExporter
@@ -95,6 +97,113 @@ def test_setup_auth_file_not_found(mock_netrc):
     mock_print.assert_called_with("Netrc file not found: ~/.netrc, proceeding without authentication")
 
 
+def test_export_jobs_with_workers_merges_stats(tmp_path):
+    """Concurrent workers produce the same aggregate as a serial run."""
+    jobs = [{"name": f"job-{i}", "url": f"http://jenkins.example.com/job/job-{i}/"}
+            for i in range(6)]
+
+    def fake_builds(job_name, max_builds=100):
+        return {"builds": [
+            {"number": 1, "result": "SUCCESS", "duration": 1000,
+             "actions": [{"parameters": [{"name": "env", "value": "prod"}]}]},
+            {"number": 2, "result": "FAILURE", "duration": 3000,
+             "actions": [{"parameters": [{"name": "env", "value": job_name}]}]},
+        ]}
+
+    exporter = JenkinsJobExporter("http://jenkins.example.com", delay=0, workers=4)
+    with patch.object(exporter, "get_all_jobs", return_value=jobs), \
+            patch.object(exporter, "get_job_builds", side_effect=fake_builds):
+        stats = exporter.export_jobs_with_stats(str(tmp_path), "env")
+
+    assert stats["prod"]["total_builds"] == 6
+    assert stats["prod"]["successful_builds"] == 6
+    assert stats["prod"]["jobs"] == {job["name"] for job in jobs}
+    assert stats["job-3"]["failed_builds"] == 1
+    assert (tmp_path / "statistics_by_env.csv").exists()
+    saved = json.loads((tmp_path / "statistics_by_env.json").read_text())
+    assert sorted(saved["prod"]["jobs"]) == [job["name"] for job in jobs]
+    assert saved["prod"]["p90_duration_ms"] == pytest.approx(1000, rel=0.01)
+    assert "duration_sketch" not in saved["prod"]
+    header = (tmp_path / "statistics_by_env.csv").read_text().splitlines()[0]
+    assert "P50_Duration_Minutes,P90_Duration_Minutes,P99_Duration_Minutes" in header
+
+
+def test_export_several_groupings_from_one_crawl(stub_jenkins, tmp_path):
+    """Each grouping gets its own statistics files while builds are fetched once per job."""
+    stub_jenkins.routes["/api/json"] = {"jobs": [
+        {"name": "a", "url": f"{stub_jenkins.url}/job/a/"}]}
+    stub_jenkins.routes["/job/a/api/json"] = {"builds": [
+        {"number": n, "result": "SUCCESS", "duration": 10, "actions": [{"parameters": [
+            {"name": "env", "value": "qa"}, {"name": "branch", "value": f"b{n % 2}"}]}]}
+        for n in range(4)]}
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent")
+    stats = exporter.export_jobs_with_stats(str(tmp_path), "env",
+                                            group_by=["branch", ("env", "branch")])
+
+    assert stub_jenkins.paths().count("/job/a/api/json") == 1
+    assert stats["qa"]["total_builds"] == 4
+    assert exporter.grouped_stats["branch"]["b1"]["total_builds"] == 2
+    assert set(exporter.grouped_stats["env+branch"]) == {"qa|b0", "qa|b1"}
+    for name in ("env", "branch", "env+branch"):
+        assert (tmp_path / f"statistics_by_{name}.json").exists()
+
+
+def test_export_build_data_fetches_builds_once(stub_jenkins, tmp_path):
+    """--export-build-data reuses the payload already fetched for the statistics."""
+    stub_jenkins.routes["/api/json"] = {"jobs": [
+        {"name": name, "url": f"{stub_jenkins.url}/job/{name}/"} for name in ("a", "b")
+    ]}
+    builds = {"builds": [{"number": 1, "result": "SUCCESS", "duration": 10,
+                          "actions": [{"parameters": [{"name": "env", "value": "qa"}]}]}]}
+    stub_jenkins.routes["/job/a/api/json"] = builds
+    stub_jenkins.routes["/job/b/api/json"] = builds
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent")
+    exporter.export_jobs_with_stats(str(tmp_path), "env", export_build_data=True)
+
+    assert stub_jenkins.paths().count("/job/a/api/json") == 1
+    assert stub_jenkins.paths().count("/job/b/api/json") == 1
+    assert exporter.request_counts == {"made": 3, "saved": 2}
+    assert json.loads((tmp_path / "a_builds.json").read_text()) == builds
+
+
+def test_single_job_export_build_data_fetches_once(stub_jenkins, tmp_path):
+    """Single-job mode writes the paginated builds instead of fetching them again."""
+    builds = [{"number": n, "result": "SUCCESS", "duration": 10,
+               "actions": [{"parameters": [{"name": "env", "value": "qa"}]}]}
+              for n in range(3, 0, -1)]
+    stub_jenkins.add_job("/job/solo", builds)
+
+    exporter = JenkinsJobExporter(f"{stub_jenkins.url}/job/solo", delay=0,
+                                  netrc_file="/nonexistent")
+    stats = exporter.export_jobs_with_stats(str(tmp_path), "env", export_build_data=True,
+                                            single_job=True)
+
+    assert stats["qa"]["total_builds"] == 3
+    assert exporter.request_counts["saved"] == 1
+    assert json.loads((tmp_path / "solo_builds.json").read_text()) == {"builds": builds}
+
+
+def test_single_job_pages_fetched_concurrently_in_order(stub_jenkins):
+    """Pages are requested in parallel, reassembled newest first, and stop at the last build."""
+    # 250 builds with gaps, so first/last build numbers only bound the count (285)
+    numbers = [n for n in range(400, 0, -1) if n % 8][:250]
+    builds = [{"number": n, "result": "SUCCESS", "actions": []} for n in numbers]
+    stub_jenkins.add_job("/job/solo", builds)
+
+    exporter = JenkinsJobExporter(f"{stub_jenkins.url}/job/solo", delay=0,
+                                  netrc_file="/nonexistent", page_fanout=3)
+    result = exporter._get_all_builds_paginated(10000)
+
+    assert [build["number"] for build in result["builds"]] == numbers
+    trees = [query["tree"] for _, query in stub_jenkins.requests]
+    assert trees[0] == "name,firstBuild[number],lastBuild[number]"
+    assert numbers[0] - numbers[-1] + 1 == 285
+    ranges = sorted(tree.rsplit("{", 1)[1] for tree in trees[1:])
+    assert ranges == ["0,100}", "100,200}", "200,285}"]
+
+
 def test_url_normalization():
     """Test that URLs are properly normalized."""
     exporter = JenkinsJobExporter("http://jenkins.example.com/")
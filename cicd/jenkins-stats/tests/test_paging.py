@@ -0,0 +1,203 @@
+"""Tests for adaptive build-page sizing."""
+
+import re
+import time
+
+import pytest
+
+from jenkins_stats.exporter import JenkinsJobExporter
+from jenkins_stats.paging import JobPager, PageSizer
+
+
+def test_page_sizer_grows_for_small_fast_pages():
+    """Thin, quick pages double the size each time, up to the maximum."""
+    sizer = PageSizer(initial=100, min_size=25, max_size=500)
+    for _ in range(5):
+        size = sizer.next_size()
+        sizer.record(size, size, size * 200, 0.001 * size)
+    assert sizer.sizes == [100, 200, 400, 500, 500]
+    assert sizer.next_size() == 500
+
+
+def test_page_sizer_shrinks_for_heavy_pages():
+    """Pages far over the byte budget are cut down, but not below the minimum."""
+    sizer = PageSizer(initial=100, min_size=25, max_size=1000, target_bytes=1024 * 1024)
+    sizer.record(100, 100, 100 * 64 * 1024, 1.0)
+    assert sizer.next_size() == 25
+
+    sizer = PageSizer(initial=100, min_size=10, max_size=1000, target_seconds=2.0)
+    sizer.record(100, 100, 1000, 10.0)
+    assert sizer.next_size() == 20
+
+
+def test_page_sizer_timeouts_halve_the_size():
+    sizer = PageSizer(initial=100, min_size=25)
+    assert sizer.shrink() and sizer.next_size() == 50
+    assert sizer.shrink() and sizer.next_size() == 25
+    assert not sizer.shrink()
+    assert sizer.summary()["shrinks"] == 2
+
+
+def test_job_sizers_start_from_shared_estimate():
+    """A heavy job shrinks only its own pages; the shared estimate seeds later jobs."""
+    shared = PageSizer(initial=100, min_size=25, max_size=1000, target_bytes=1024 * 1024)
+    light, heavy = shared.for_job(), shared.for_job()
+    heavy.record(100, 100, 100 * 64 * 1024, 1.0)
+    assert heavy.shrink() is False and heavy.next_size() == 25
+    light.record(100, 100, 100 * 200, 0.1)
+    assert light.next_size() == 200
+
+    summary = shared.summary()
+    assert summary["pages"] == 2 and summary["shrinks"] == 0
+    assert shared.for_job().next_size() == shared.next_size()
+
+    light.shrink()
+    assert light.next_size() == 100 and shared.summary()["shrinks"] == 1
+
+
+def test_page_sizer_rejects_bad_limits():
+    with pytest.raises(ValueError):
+        PageSizer(min_size=0)
+    with pytest.raises(ValueError):
+        PageSizer(min_size=100, max_size=50)
+
+
+def _requested_ranges(stub_jenkins, path):
+    ranges = []
+    for request_path, query in stub_jenkins.requests:
+        match = re.search(r'\{(\d+),(\d+)\}$', query.get('tree', ''))
+        if request_path == path and match:
+            ranges.append((int(match.group(1)), int(match.group(2))))
+    return ranges
+
+
+def test_job_pages_grow_and_split_on_timeout(stub_jenkins, capsys):
+    """Pages grow while responses are small, and a gateway timeout splits the page."""
+    builds = [{"number": n, "result": "SUCCESS", "duration": 1, "actions": []}
+              for n in range(700, 0, -1)]
+    stub_jenkins.add_job("/job/a", builds)
+    serve = stub_jenkins.routes["/job/a/api/json"]
+
+    def route(query):
+        # The proxy gives up on anything over 300 builds
+        start, end = map(int, re.search(r'\{(\d+),(\d+)\}$', query['tree']).groups())
+        if end - start > 300:
+            return (504, "Gateway Timeout")
+        return serve(query)
+    stub_jenkins.routes["/job/a/api/json"] = route
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  max_page_size=400, verbose=True)
+    fetched = exporter.get_job_builds("a", max_builds=1000)["builds"]
+
+    assert [b["number"] for b in fetched] == list(range(700, 0, -1))
+    assert _requested_ranges(stub_jenkins, "/job/a/api/json") == [
+        (0, 100), (100, 300), (300, 700), (300, 500), (500, 700), (700, 1000)]
+    assert exporter.page_sizer.summary()["shrinks"] == 1
+
+    exporter.print_page_summary()
+    assert "Build pages: 5 requested, 100-300 builds per page" in capsys.readouterr().out
+
+
+def test_deep_history_reaches_past_loaded_builds(stub_jenkins, tmp_path, capsys):
+    """'builds' stops at Jenkins' loaded window; --deep-history pages through allBuilds."""
+    builds = [{"number": n, "result": "SUCCESS", "duration": 1,
+               "actions": [{"parameters": [{"name": "env", "value": "qa"}]}]}
+              for n in range(600, 0, -1) if n % 10]
+    stub_jenkins.add_job("/job/solo", builds, loaded=250)
+
+    shallow = JenkinsJobExporter(f"{stub_jenkins.url}/job/solo", delay=0,
+                                 netrc_file="/nonexistent")
+    stats = shallow.export_jobs_with_stats(str(tmp_path), "env", max_builds=1000, single_job=True)
+    assert stats["qa"]["total_builds"] == 250
+    assert not shallow.history_coverage.reached_first
+    assert "use --deep-history" in capsys.readouterr().out
+
+    deep = JenkinsJobExporter(f"{stub_jenkins.url}/job/solo", delay=0,
+                              netrc_file="/nonexistent", deep_history=True)
+    stats = deep.export_jobs_with_stats(str(tmp_path), "env", max_builds=1000, single_job=True)
+    assert stats["qa"]["total_builds"] == 540
+    summary = deep.history_coverage.summary()
+    assert summary["reached_first"] and summary["stop"] == "end"
+    assert summary["density"] == pytest.approx(540 / 599)
+    assert "Complete back to the job's first build" in capsys.readouterr().out
+    assert all("allBuilds[" in query["tree"] for path, query in stub_jenkins.requests[-3:])
+
+
+@pytest.mark.parametrize("mode", ["pages", "bulk", "cache", "async"])
+def test_truncated_jobs_reported(stub_jenkins, tmp_path, mode):
+    """Every fetch path counts jobs that returned the full --max-builds."""
+    if mode == "async":
+        pytest.importorskip("httpx")
+    builds = [{"number": n, "result": "SUCCESS", "duration": 1,
+               "actions": [{"parameters": [{"name": "env", "value": "qa"}]}]}
+              for n in range(50, 0, -1)]
+    stub_jenkins.add_job("/job/a", builds)
+
+    def root(query):
+        bulk = re.search(r'^jobs\[name,builds\[.*\{0,(\d+)\}\]', query.get("tree", ""))
+        if bulk:
+            return {"jobs": [{"name": "a", "builds": builds[:int(bulk.group(1))]}]}
+        return {"jobs": [{"name": "a", "url": f"{stub_jenkins.url}/job/a/"}]}
+    stub_jenkins.routes["/api/json"] = root
+
+    options = {"cache": {"cache_path": str(tmp_path / "cache.db")},
+               "async": {"backend": "async"}}.get(mode, {})
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  folder_depth=0, **options)
+    try:
+        for max_builds, truncated in ((20, 1), (100, 0)):
+            exporter.export_jobs_with_stats(str(tmp_path), "env", max_builds=max_builds,
+                                            bulk=mode == "bulk")
+            assert exporter.truncated_jobs == truncated
+            assert exporter.bulk_fallbacks == 0
+    finally:
+        exporter.close()
+
+
+def test_job_pager_splits_timed_out_pages():
+    pager = JobPager(300, PageSizer(initial=200, min_size=25, max_size=400))
+    assert pager.next_range() == (0, 200)
+    assert pager.timed_out(0, 200)
+    assert pager.next_range() == (0, 100)
+    assert pager.timed_out(0, 100)
+    assert pager.next_range() == (0, 50)
+    pager.add_page(0, 50, [{"number": n} for n in range(50)], 500, 0.01)
+    assert pager.next_range() == (50, 100)
+    pager.add_page(50, 100, [{"number": n} for n in range(50)], 500, 0.01)
+    assert pager.next_range() == (100, 200)
+    pager.add_page(100, 200, [{"number": n} for n in range(100)], 1000, 0.01)
+    # Past the split, pages are sized again (and capped at max_builds)
+    assert pager.next_range() == (200, 300)
+    pager.add_page(200, 300, [{"number": n} for n in range(100)], 1000, 0.01)
+    assert pager.next_range() is None and pager.truncated
+
+    fixed = JobPager(40, PageSizer(initial=100, min_size=25), start=0, fixed=True)
+    assert fixed.next_range() == (0, 40)
+    assert fixed.timed_out(0, 40) and fixed.next_range() == (0, 20)
+    fixed.add_page(0, 20, [{"number": 1}], 100, 0.01)
+    assert fixed.next_range() is None and fixed.stop == "end"
+
+
+def test_slow_page_times_out_and_splits(stub_jenkins):
+    """A page slower than --page-timeout is abandoned and fetched in halves."""
+    builds = [{"number": n, "result": "SUCCESS", "duration": 1, "actions": []}
+              for n in range(80, 0, -1)]
+    stub_jenkins.add_job("/job/slow", builds)
+    serve = stub_jenkins.routes["/job/slow/api/json"]
+
+    def route(query):
+        match = re.search(r'\{(\d+),(\d+)\}$', query.get('tree', ''))
+        if match and int(match.group(2)) - int(match.group(1)) > 50:
+            time.sleep(1.0)
+        return serve(query)
+    stub_jenkins.routes["/job/slow/api/json"] = route
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  page_timeout=0.2)
+    fetched = exporter.get_job_builds("slow", max_builds=100)["builds"]
+
+    assert [b["number"] for b in fetched] == list(range(80, 0, -1))
+    assert _requested_ranges(stub_jenkins, "/job/slow/api/json") == [
+        (0, 100), (0, 50), (50, 100)]
+    assert exporter.page_sizer.summary()["shrinks"] == 1
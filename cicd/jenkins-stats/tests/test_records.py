@@ -0,0 +1,322 @@
+"""Tests for the compact columnar build store."""
+
+import random
+
+import pytest
+
+from jenkins_stats import records
+from jenkins_stats.records import (OTHER_LABEL, BuildStore, JobSet, StringCatalog,
+                                   extract_parameter_value, grouping_name, indexed_parameter_value,
+                                   parameter_index, parse_grouping, union_jobs)
+from jenkins_stats.sketches import DDSketch, SpaceSaving, frequent_items
+
+
+def make_build(number, result, duration, env=None, branch=None):
+    params = []
+    if env is not None:
+        params.append({"name": "env", "value": env})
+    if branch is not None:
+        params.append({"name": "branch", "value": branch})
+    return {"number": number, "result": result, "duration": duration, "timestamp": number,
+            "actions": [{"parameters": params}] if params else []}
+
+
+def random_store(rows, seed=1):
+    rng = random.Random(seed)
+    store = BuildStore(["env", "branch"])
+    for n in range(rows):
+        store.add_build(f"job-{rng.randrange(20)}", make_build(
+            n, rng.choice(["SUCCESS", "FAILURE", "UNSTABLE", "ABORTED", None]),
+            rng.randrange(0, 100000),
+            env=rng.choice(["prod", "dev", "qa", None]),
+            branch=f"b{rng.randrange(50)}"))
+    return store
+
+
+def test_aggregate_matches_dict_statistics():
+    store = BuildStore(["env"])
+    store.add_builds("a", [make_build(1, "SUCCESS", 100, "prod"),
+                           make_build(2, "FAILURE", 300, "prod"),
+                           make_build(3, None, 0, "dev"),
+                           make_build(4, "SUCCESS", 50)])
+    store.add_build("b", make_build(9, "ABORTED", -1, "prod"))
+
+    stats = store.aggregate("env", build_numbers=True)
+    assert stats["prod"] == {
+        "total_builds": 3, "successful_builds": 1, "failed_builds": 1, "unstable_builds": 0,
+        "aborted_builds": 1, "total_duration": 400, "jobs": {"a", "b"},
+        "build_numbers": [1, 2, 9],
+    }
+    assert stats["dev"]["total_builds"] == 1
+    assert stats["dev"]["successful_builds"] == 0
+    assert len(store) == 5
+
+
+def test_numpy_and_python_aggregation_agree():
+    pytest.importorskip("numpy")
+    store = random_store(5000)
+    for grouping in (("env",), ("branch",), ("env", "branch")):
+        groups, labels = store._groups(grouping)
+        expected = {labels[k]: v for k, v in store._aggregate_python(groups).items()}
+        assert {labels[k]: v
+                for k, v in store._aggregate_numpy(groups, len(labels)).items()} == expected
+
+
+def test_aggregate_parameter_grouping():
+    store = BuildStore(["env", "branch"])
+    store.add_builds("a", [make_build(1, "SUCCESS", 10, "prod", "main"),
+                           make_build(2, "FAILURE", 20, "prod", "dev"),
+                           make_build(3, "SUCCESS", 30, "prod", "main"),
+                           make_build(4, "SUCCESS", 40, "prod")])
+
+    stats = store.aggregate(("env", "branch"), build_numbers=True)
+    assert set(stats) == {"prod|main", "prod|dev"}
+    assert stats["prod|main"]["build_numbers"] == [1, 3]
+    assert stats["prod|dev"]["failed_builds"] == 1
+    assert store.aggregate(("env",)) == store.aggregate("env")
+
+
+def test_extend_remaps_interned_ids():
+    left = BuildStore(["env"])
+    left.add_build("a", make_build(1, "SUCCESS", 10, "prod"))
+    right = BuildStore(["env"])
+    right.add_build("b", make_build(2, "FAILURE", 20, "dev"))
+    right.add_build("a", make_build(3, "SUCCESS", 30, "prod"))
+
+    left.extend(right)
+    stats = left.aggregate("env")
+    assert stats["prod"]["jobs"] == {"a"}
+    assert stats["prod"]["total_builds"] == 2
+    assert stats["dev"]["jobs"] == {"b"}
+
+
+def test_rows_are_compact():
+    store = random_store(10000)
+    column_bytes = sum(column.itemsize * len(column) for column in
+                       [store.job, store.number, store.result, store.duration, store.timestamp,
+                        *store.params.values()])
+    # 4-byte ids, 8-byte number/duration/timestamp, 1-byte result
+    assert column_bytes / len(store) == 4 + 8 + 1 + 8 + 8 + 4 * 2
+
+
+def test_untracked_parameter_rejected():
+    with pytest.raises(KeyError):
+        BuildStore(["env"]).aggregate("branch")
+
+
+def test_parameter_index_matches_linear_extraction():
+    build = make_build(1, "SUCCESS", 10, "prod", "main")
+    build["actions"] = [None, {"causes": []}, *build["actions"],
+                        {"parameters": [{"name": "env", "value": "ignored"},
+                                        {"name": "count", "value": 3},
+                                        {"name": "flag", "value": None}]}]
+    index = parameter_index(build)
+    assert index == {"env": "prod", "branch": "main", "count": 3, "flag": None}
+    for name in ("env", "branch", "count", "flag", "missing"):
+        assert indexed_parameter_value(index, name) == extract_parameter_value(build, name)
+    assert parameter_index(build, frozenset({"env", "count"})) == {"env": "prod", "count": 3}
+
+
+def test_parse_grouping():
+    assert parse_grouping("env") == ("env",)
+    assert parse_grouping(" env, branch ,env") == ("env", "branch")
+    assert grouping_name(["env", "branch"]) == "env+branch"
+    with pytest.raises(ValueError):
+        parse_grouping(",")
+
+
+def commit_store(rows, seed=3):
+    """Zipf-like commits: a few hot values and a long tail of one-off ones"""
+    rng = random.Random(seed)
+    store = BuildStore(["GIT_COMMIT"])
+    for n in range(rows):
+        hot = rng.random() < 0.6
+        commit = f"hot{rng.randrange(5)}" if hot else f"c{n}"
+        store.add_build(f"job-{n % 3}", {"number": n, "result": "SUCCESS", "duration": 10,
+                                         "actions": [{"parameters": [
+                                             {"name": "GIT_COMMIT", "value": commit}]}]})
+    return store
+
+
+def test_frequent_items_keeps_heavy_hitters():
+    stream = ["a"] * 50 + ["b"] * 30 + [f"x{i}" for i in range(40)]
+    random.Random(0).shuffle(stream)
+    counters, bound = frequent_items(stream, 4)
+    assert {"a", "b"} <= set(counters)
+    assert counters["a"] <= 50 <= counters["a"] + bound
+    assert bound <= len(stream) // 5
+
+
+def test_space_saving_bounds_hold():
+    rng = random.Random(0)
+    stream = [f"hot{rng.randrange(5)}" if rng.random() < 0.3 else f"x{i}" for i in range(20000)]
+    sketch = SpaceSaving(20)
+    for item in stream:
+        sketch.add(item)
+    true = {item: stream.count(item) for item in set(stream) if item.startswith("hot")}
+
+    assert len(sketch) == 20
+    for item, count in true.items():
+        assert sketch.counts[item] - sketch.errors[item] <= count <= sketch.counts[item]
+    # Every unmonitored item occurs at most min_count() times
+    assert 1 <= sketch.min_count() <= len(stream) // 20
+    restored = SpaceSaving.from_dict(sketch.to_dict())
+    assert restored.counts == sketch.counts and restored.min_count() == sketch.min_count()
+
+
+@pytest.mark.parametrize("numpy_rows", [10 ** 9, 1])
+def test_top_k_folds_the_tail(monkeypatch, numpy_rows):
+    if numpy_rows == 1:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(records, "NUMPY_MIN_ROWS", numpy_rows)
+    store = commit_store(3000)
+    full = store.aggregate("GIT_COMMIT")
+    top = store.aggregate("GIT_COMMIT", top_k=5)
+
+    assert set(top) == {f"hot{i}" for i in range(5)} | {OTHER_LABEL}
+    for value in top:
+        if value != OTHER_LABEL:
+            assert top[value] == full[value]
+    other = top[OTHER_LABEL]
+    assert other["total_builds"] == sum(full[v]["total_builds"] for v in full if v not in top)
+    assert 1 <= other["max_builds_per_value"] <= 3000 // 11
+    assert other["jobs"] == {"job-0", "job-1", "job-2"}
+
+
+@pytest.mark.parametrize("numpy_rows", [10 ** 9, 1])
+def test_top_k_store_keeps_catalog_bounded(monkeypatch, numpy_rows):
+    """100k distinct commits leave an O(top_k) catalog; the hot values still come out on top."""
+    if numpy_rows == 1:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(records, "NUMPY_MIN_ROWS", numpy_rows)
+    rng = random.Random(5)
+    store = BuildStore(["GIT_COMMIT", "env"], top_k=5)
+    hot_builds = {}
+    for n in range(100000):
+        commit = f"hot{rng.randrange(5)}" if rng.random() < 0.4 else f"c{n}"
+        hot_builds[commit] = hot_builds.get(commit, 0) + 1
+        store.add_build(f"job-{n % 3}", {"number": n, "result": "SUCCESS", "duration": 10,
+                                         "actions": [{"parameters": [
+                                             {"name": "GIT_COMMIT", "value": commit},
+                                             {"name": "env", "value": "prod"}]}]})
+
+    catalog = store.top_values["GIT_COMMIT"]
+    assert len(catalog) <= records.TOP_K_CAPACITY_FACTOR * 5
+    assert len(store.values) == 0
+    saved = store.to_dict()
+    assert len(saved["top_values"]["GIT_COMMIT"]["ids"]) == len(catalog)
+
+    top = store.aggregate("GIT_COMMIT", top_k=5)
+    assert set(top) == {f"hot{i}" for i in range(5)} | {OTHER_LABEL}
+    assert sum(entry["total_builds"] for entry in top.values()) == 100000
+    bound = top[OTHER_LABEL]["max_builds_per_value"]
+    for value, entry in top.items():
+        if value != OTHER_LABEL:
+            # Builds seen before a value was (re-)admitted are counted under (other)
+            assert hot_builds[value] - catalog.sketch.errors[value] <= entry["total_builds"]
+            assert entry["total_builds"] <= hot_builds[value]
+            assert entry["total_builds"] > bound
+    assert BuildStore.from_dict(saved).aggregate("GIT_COMMIT", top_k=5) == top
+    combined = store.aggregate(("GIT_COMMIT", "env"), top_k=5)
+    assert set(combined) == {f"hot{i}|prod" for i in range(5)} | {OTHER_LABEL}
+    assert store.aggregate("env") == store.aggregate("env", top_k=5)
+
+
+@pytest.mark.parametrize("numpy_rows", [10 ** 9, 1])
+def test_top_k_store_matches_exact_store_without_evictions(monkeypatch, numpy_rows):
+    if numpy_rows == 1:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(records, "NUMPY_MIN_ROWS", numpy_rows)
+    exact = random_store(3000)
+    sketched = BuildStore(["env", "branch"], top_k=20)
+    sketched.extend(exact)
+
+    for grouping in ("env", "branch", ("env", "branch")):
+        assert sketched.aggregate(grouping, top_k=20) == exact.aggregate(grouping, top_k=20)
+
+
+def test_top_k_without_tail_has_no_other_entry():
+    store = random_store(200)
+    assert OTHER_LABEL not in store.aggregate("env", top_k=10)
+
+
+def test_job_set_behaves_like_a_set_of_names():
+    catalog = StringCatalog()
+    for name in ("a", "b", "c", "d"):
+        catalog.intern(name)
+    ab = JobSet.from_ids(catalog, [0, 1])
+    bc = JobSet.from_ids(catalog, [1, 2])
+
+    assert ab == {"a", "b"} and {"a", "b"} == ab
+    assert "a" in ab and "c" not in ab and "zzz" not in ab
+    assert (ab | bc).bits == 0b111 and (ab & bc) == {"b"}
+    assert ab | {"x"} == {"a", "b", "x"}
+    assert sorted(union_jobs([ab, bc, {"y"}])) == ["a", "b", "c", "y"]
+    assert len(union_jobs([ab, bc])) == 3
+
+    ab.update(bc, ["d"])
+    assert list(ab) == ["a", "b", "c", "d"]
+    assert JobSet(catalog) == set()
+
+
+def test_aggregated_jobs_are_bitsets():
+    stats = random_store(300).aggregate("env")
+    assert all(isinstance(entry["jobs"], JobSet) for entry in stats.values())
+    assert len(union_jobs(entry["jobs"] for entry in stats.values())) == 20
+
+
+def test_ddsketch_quantiles_within_relative_accuracy():
+    rng = random.Random(3)
+    durations = [rng.lognormvariate(11, 1.5) for _ in range(20000)] + [0] * 500
+    sketch = DDSketch(relative_accuracy=0.01)
+    for duration in durations:
+        sketch.add(duration)
+    ordered = sorted(durations)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+    assert sketch.quantile(0.01) == 0
+    assert DDSketch().quantile(0.5) is None
+
+
+def test_ddsketch_merge_matches_single_sketch():
+    rng = random.Random(4)
+    parts = [[rng.randrange(1, 10 ** 7) for _ in range(500)] for _ in range(3)]
+    whole, merged = DDSketch(), DDSketch()
+    for part in parts:
+        sketch = DDSketch()
+        for value in part:
+            sketch.add(value)
+            whole.add(value)
+        merged.merge(sketch)
+    assert merged == whole and merged.count == 1500
+    with pytest.raises(ValueError):
+        merged.merge(DDSketch(relative_accuracy=0.05))
+
+
+def test_ddsketch_memory_is_bounded():
+    sketch = DDSketch(max_buckets=64)
+    for exponent in range(200):
+        sketch.add(1.1 ** exponent)
+    assert len(sketch.buckets) == 64 and sketch.count == 200
+    assert sketch.quantile(0.99) == pytest.approx(1.1 ** 197, rel=0.011)
+
+
+@pytest.mark.parametrize("numpy_rows", [10 ** 9, 1])
+def test_duration_sketches_per_value(monkeypatch, numpy_rows):
+    if numpy_rows == 1:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(records, "NUMPY_MIN_ROWS", numpy_rows)
+    store = random_store(2000)
+    stats = store.aggregate("env", duration_sketches=True)
+    by_value = {}
+    for row in range(len(store)):
+        value_id = store.params["env"][row]
+        if value_id >= 0:
+            by_value.setdefault(store.values.values[value_id], []).append(store.duration[row])
+    for value, entry in stats.items():
+        sketch = entry["duration_sketch"]
+        durations = sorted(by_value[value])
+        assert sketch.count == entry["total_builds"] == len(durations)
+        exact = durations[int(0.9 * (len(durations) - 1))]
+        assert sketch.quantile(0.9) == pytest.approx(exact, rel=0.011)
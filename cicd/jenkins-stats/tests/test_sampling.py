@@ -0,0 +1,112 @@
+"""Tests for --sample stratified sampling and confidence intervals."""
+
+import csv
+
+import pytest
+
+from jenkins_stats.exporter import JenkinsJobExporter
+from jenkins_stats.records import BuildStore
+from jenkins_stats.sampling import (SampleDesign, StratifiedSampler, precise_enough,
+                                    rate_interval, wilson_interval)
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(90, 100)
+    assert low == pytest.approx(0.8256, abs=1e-4)
+    assert high == pytest.approx(0.9448, abs=1e-4)
+    # Stays inside [0, 1] at the extremes
+    assert wilson_interval(0, 10)[0] == 0.0
+    assert wilson_interval(10, 10)[1] == pytest.approx(1.0)
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_rate_interval_uses_effective_sample_size():
+    # Variance of a simple random sample of 100 gives the plain Wilson interval
+    assert rate_interval(0.9, 0.9 * 0.1 / 100, 50) == pytest.approx(wilson_interval(90, 100))
+    # Without a variance to go by, the sampled builds are used
+    assert rate_interval(1.0, 0.0, 10) == wilson_interval(10, 10)
+
+
+def _sample_pages(design, store, job, total, pages, result_of):
+    sampler = StratifiedSampler(total, page_size=20, strata=10, seed=1)
+    design.add_job(job, sampler)
+    for _ in range(pages):
+        for start, end in sampler.next_round():
+            page = [{"number": total - n, "result": result_of(n), "duration": 1000,
+                     "actions": [{"parameters": [{"name": "env", "value": "qa"}]}]}
+                    for n in range(start, end)]
+            store.add_builds(job, page)
+            design.add_page(job, sampler.stratum_of[(start, end)], page)
+
+
+def test_sample_design_weights_jobs_by_sampling_fraction():
+    """A job fetched whole doesn't outweigh a busy job sampled at 20%."""
+    store = BuildStore(["env"])
+    design = SampleDesign()
+    _sample_pages(design, store, "small", 40, 1, lambda n: "SUCCESS")
+    _sample_pages(design, store, "busy", 2000, 2, lambda n: "SUCCESS" if n % 2 else "FAILURE")
+
+    entry = store.aggregate("env", sample_design=design)["qa"]
+    assert entry["total_builds"] == 440
+    assert entry["estimated_builds"] == 2040
+    assert entry["success_rate"] == pytest.approx(1040 / 2040)
+    low, high = entry["success_rate_ci"]
+    assert low < 1040 / 2040 < high
+    assert entry["avg_duration_ms_ci"] == pytest.approx([1000, 1000])
+
+    saved = SampleDesign.from_dict(design.to_dict())
+    assert store.aggregate("env", sample_design=saved)["qa"] == entry
+
+
+def test_sample_design_is_exact_for_fully_fetched_jobs():
+    store = BuildStore(["env"])
+    design = SampleDesign()
+    _sample_pages(design, store, "small", 40, 1, lambda n: "FAILURE" if n < 4 else "SUCCESS")
+    entry = store.aggregate("env", sample_design=design)["qa"]
+    assert entry["success_rate"] == pytest.approx(0.9)
+    assert entry["success_rate_ci"] == pytest.approx([0.9, 0.9])
+
+
+def test_stratified_sampler_covers_every_stratum_once_per_round():
+    sampler = StratifiedSampler(1000, page_size=20, strata=10, seed=1)
+    first = sampler.next_round()
+    assert sorted(start // 100 for start, _ in first) == list(range(10))
+    seen = list(first)
+    while not sampler.exhausted:
+        seen.extend(sampler.next_round())
+    assert sorted(seen) == [(start, start + 20) for start in range(0, 1000, 20)]
+
+
+def test_precise_enough_ignores_rare_values():
+    stats = {"common": {"total_builds": 2000, "successful_builds": 1800},
+             "rare": {"total_builds": 20, "successful_builds": 10}}
+    assert precise_enough(stats, 2020, 0.02)
+    assert not precise_enough(stats, 2020, 0.01)
+    assert not precise_enough({}, 10, 0.02)
+    assert precise_enough({}, 200, 0.02)
+
+
+def test_sampled_export_stops_early(stub_jenkins, tmp_path):
+    """A busy job is summarised from a fraction of its history, with intervals."""
+    builds = [{"number": n, "result": "FAILURE" if n % 10 == 0 else "SUCCESS",
+               "duration": 60000 + (n % 7) * 1000,
+               "actions": [{"parameters": [{"name": "env", "value": "qa"}]}]}
+              for n in range(5000, 0, -1)]
+    stub_jenkins.add_job("/job/busy", builds)
+
+    exporter = JenkinsJobExporter(f"{stub_jenkins.url}/job/busy", delay=0,
+                                  netrc_file="/nonexistent", sample=True, precision=0.05)
+    stats = exporter.export_jobs_with_stats(str(tmp_path), "env", max_builds=5000,
+                                            single_job=True)
+
+    entry = stats["qa"]
+    assert entry["total_builds"] < 1000
+    assert entry["success_rate_ci"][0] <= 0.9 <= entry["success_rate_ci"][1]
+    assert len(stub_jenkins.requests) < 50
+    assert exporter.sample_counts["available"] == 5000
+    assert entry["estimated_builds"] == 5000
+
+    with (tmp_path / "statistics_by_env.csv").open() as f:
+        row = next(csv.DictReader(f))
+    assert row["Success_Rate_CI"].count("%") == 2
+    assert "Avg_Duration_Minutes_CI" in row
@@ -0,0 +1,173 @@
+"""Tests for incremental build-list parsing and streaming export."""
+
+import json
+
+import pytest
+
+from jenkins_stats.exporter import JenkinsJobExporter
+from jenkins_stats.streaming import (NdjsonBuildsWriter, StreamingBuildsWriter, iter_array_items,
+                                     iter_ndjson)
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+BUILDS = [
+    {"number": 3, "result": "SUCCESS", "duration": 10,
+     "actions": [{}, {"parameters": [{"name": "env", "value": "prød, \"quoted\" ]"}]}]},
+    {"number": 2, "result": None, "building": True, "actions": []},
+    {"number": 1, "result": "FAILURE", "duration": 5,
+     "actions": [{"parameters": [{"name": "env", "value": "dev"}]}]},
+]
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 100000])
+def test_iter_array_items_across_chunk_boundaries(size):
+    body = json.dumps({"_class": "hudson.model.FreeStyleProject", "builds": BUILDS},
+                      ensure_ascii=False).encode("utf-8")
+    assert list(iter_array_items(chunked(body, size))) == BUILDS
+
+
+def test_iter_array_items_missing_key_and_empty_array():
+    assert list(iter_array_items([b'{"_class": "x"}'])) == []
+    assert list(iter_array_items([b'{"builds": [ ]}'])) == []
+
+
+def test_iter_array_items_truncated_stream():
+    body = json.dumps({"builds": BUILDS}).encode("utf-8")
+    with pytest.raises(ValueError):
+        list(iter_array_items(chunked(body[:-30], 16)))
+
+
+def test_streaming_writer_produces_valid_json(tmp_path):
+    path = tmp_path / "builds.json"
+    with StreamingBuildsWriter(path) as writer:
+        for build in BUILDS:
+            writer.write(build)
+    assert json.loads(path.read_text(encoding="utf-8")) == {"builds": BUILDS}
+
+    with StreamingBuildsWriter(tmp_path / "empty.json"):
+        pass
+    assert json.loads((tmp_path / "empty.json").read_text()) == {"builds": []}
+
+
+def test_streaming_export_matches_buffered_export(stub_jenkins, tmp_path):
+    stub_jenkins.routes["/api/json"] = {"jobs": [
+        {"name": "app", "url": f"{stub_jenkins.url}/job/app/"},
+        {"name": "noparam", "url": f"{stub_jenkins.url}/job/noparam/"},
+    ]}
+    stub_jenkins.routes["/job/app/api/json"] = {"builds": BUILDS}
+    stub_jenkins.routes["/job/noparam/api/json"] = {"builds": [{"number": 1, "actions": []}]}
+
+    results = {}
+    for stream in (False, True):
+        exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                      stream=stream)
+        out = tmp_path / str(stream)
+        results[stream] = exporter.export_jobs_with_stats(str(out), "env", export_build_data=True)
+        assert json.loads((out / "app_builds.json").read_text()) == {"builds": BUILDS}
+        assert not (out / "noparam_builds.json").exists()
+
+    assert results[True] == results[False]
+
+
+def test_streaming_single_job(stub_jenkins, tmp_path):
+    stub_jenkins.add_job("/job/solo", BUILDS)
+    exporter = JenkinsJobExporter(f"{stub_jenkins.url}/job/solo", delay=0,
+                                  netrc_file="/nonexistent", stream=True)
+    stats = exporter.export_jobs_with_stats(str(tmp_path), "env", single_job=True,
+                                            export_build_data=True)
+
+    assert stats["dev"]["build_numbers"] == [1]
+    assert json.loads((tmp_path / "solo_builds.json").read_text()) == {"builds": BUILDS}
+
+
+def read_ndjson(path):
+    compression = {".gz": "gzip", ".zst": "zstd"}.get(path.suffix)
+    return list(iter_ndjson(path, compression))
+
+
+@pytest.mark.parametrize("compression, suffix", [(None, ""), ("gzip", ".gz"), ("zstd", ".zst")])
+def test_ndjson_writer_round_trip(tmp_path, compression, suffix):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    path = tmp_path / f"builds.ndjson{suffix}"
+    with NdjsonBuildsWriter(path, compression) as writer:
+        for build in BUILDS:
+            writer.write(build)
+        with writer.job_writer("app") as job:
+            job.write(BUILDS[0])
+        dropped = writer.job_writer("gone")
+        dropped.write(BUILDS[1])
+        dropped.discard()
+    assert writer.count == 4
+    with NdjsonBuildsWriter(path, compression, append=True) as writer:
+        writer.write(BUILDS[2])
+    assert read_ndjson(path) == BUILDS + [{"job": "app", **BUILDS[0]}, BUILDS[2]]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_ndjson_export_per_job_and_consolidated(stub_jenkins, tmp_path, stream):
+    stub_jenkins.routes["/api/json"] = {"jobs": [
+        {"name": "app", "url": f"{stub_jenkins.url}/job/app/"},
+        {"name": "noparam", "url": f"{stub_jenkins.url}/job/noparam/"},
+    ]}
+    stub_jenkins.routes["/job/app/api/json"] = {"builds": BUILDS}
+    stub_jenkins.routes["/job/noparam/api/json"] = {"builds": [{"number": 1, "actions": []}]}
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  stream=stream, build_format="ndjson", compression="gzip")
+    exporter.export_jobs_with_stats(str(tmp_path / "shards"), "env", export_build_data=True)
+    assert read_ndjson(tmp_path / "shards" / "app_builds.ndjson.gz") == BUILDS
+    assert not (tmp_path / "shards" / "noparam_builds.ndjson.gz").exists()
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  stream=stream, build_format="ndjson", consolidate_builds=True,
+                                  workers=2)
+    exporter.export_jobs_with_stats(str(tmp_path / "all"), "env", export_build_data=True)
+    # Jobs without the parameter are left out with and without --stream
+    assert read_ndjson(tmp_path / "all" / "builds.ndjson") == [
+        {"job": "app", **build} for build in BUILDS]
+    assert exporter.shared_builds_writer is None
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_consolidated_builds_survive_resume(stub_jenkins, tmp_path, monkeypatch, stream):
+    names = ["j0", "j1", "j2", "j3"]
+    stub_jenkins.routes["/api/json"] = {"jobs": [
+        {"name": name, "url": f"{stub_jenkins.url}/job/{name}/"} for name in names]}
+    for name in names:
+        stub_jenkins.routes[f"/job/{name}/api/json"] = {"builds": [BUILDS[2]]}
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  stream=stream, build_format="ndjson", compression="gzip",
+                                  consolidate_builds=True, folder_depth=0)
+    original = exporter._export_single_job
+
+    def export_single_job(job_name, *args, **kwargs):
+        if job_name == "j3":
+            raise KeyboardInterrupt
+        return original(job_name, *args, **kwargs)
+
+    monkeypatch.setattr(exporter, "_export_single_job", export_single_job)
+    with pytest.raises(KeyboardInterrupt):
+        exporter.export_jobs_with_stats(str(tmp_path), "env", export_build_data=True,
+                                        checkpoint_interval=0)
+    exporter.close()
+
+    resumed = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                 stream=stream, build_format="ndjson", compression="gzip",
+                                 consolidate_builds=True, folder_depth=0)
+    stats = resumed.export_jobs_with_stats(str(tmp_path), "env", export_build_data=True,
+                                           resume=True)
+    assert stats["dev"]["total_builds"] == 4
+    lines = read_ndjson(tmp_path / "builds.ndjson.gz")
+    assert sorted(line["job"] for line in lines) == names
+
+
+def test_compression_needs_ndjson():
+    with pytest.raises(ValueError):
+        JenkinsJobExporter("http://jenkins.example.com", compression="gzip")
+    with pytest.raises(ValueError):
+        JenkinsJobExporter("http://jenkins.example.com", build_format="xml")
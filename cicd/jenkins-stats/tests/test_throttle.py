@@ -0,0 +1,105 @@
+"""Tests for request throttling."""
+
+import threading
+import time
+
+import pytest
+
+from jenkins_stats.exporter import JenkinsJobExporter
+from jenkins_stats.throttle import AdaptiveThrottle, RateLimiter, parse_retry_after
+
+
+def test_rate_limiter_disabled():
+    """A zero delay never blocks."""
+    limiter = RateLimiter(0)
+    start = time.monotonic()
+    for _ in range(100):
+        limiter.wait()
+    assert time.monotonic() - start < 0.05
+
+
+def test_rate_limiter_is_global_across_threads():
+    """Slots are spaced by the delay no matter how many threads wait."""
+    limiter = RateLimiter(0.02)
+    starts = []
+    lock = threading.Lock()
+
+    def worker():
+        limiter.wait()
+        with lock:
+            starts.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    starts.sort()
+    # 8 calls need at least 7 intervals, even though they ran on 8 threads
+    assert starts[-1] - starts[0] >= 7 * 0.02 * 0.9
+
+
+def test_adaptive_throttle_slow_start_and_backoff():
+    """Healthy windows double rate and concurrency; a 429 halves them."""
+    throttle = AdaptiveThrottle(initial_rate=4, max_rate=100, max_concurrency=8)
+    for _ in range(1 + 2 + 4):
+        throttle.acquire()
+        throttle.release(200, 0.01)
+    assert (throttle.limit, throttle.rate) == (8, 32)
+
+    throttle.acquire()
+    throttle.release(429, 0.01)
+    assert (throttle.limit, throttle.rate) == (4, 16)
+    assert throttle.summary()["throttled"] == 1
+    assert throttle.summary()["peak_limit"] == 8
+
+    # After a backoff, growth is additive
+    for _ in range(4):
+        throttle.acquire()
+        throttle.release(200, 0.01)
+    assert (throttle.limit, throttle.rate) == (5, 17)
+
+
+def test_adaptive_throttle_backs_off_on_latency():
+    """Latency far above the best seen so far counts as congestion."""
+    throttle = AdaptiveThrottle(initial_rate=10, max_concurrency=4)
+    for _ in range(3):
+        throttle.acquire()
+        throttle.release(200, 0.1)
+    throttle.acquire()
+    throttle.release(200, 5.0)
+    assert throttle.summary()["slow"] == 1
+    assert throttle.summary()["decreases"] == 1
+
+
+def test_adaptive_throttle_honours_retry_after():
+    """Retry-After pauses every caller until it expires."""
+    throttle = AdaptiveThrottle(initial_rate=1000, max_concurrency=4)
+    throttle.acquire()
+    throttle.release(503, 0.01, retry_after="0.2")
+    start = time.monotonic()
+    throttle.acquire()
+    assert time.monotonic() - start >= 0.15
+    assert throttle.summary()["retry_after_wait"] == pytest.approx(0.2, abs=0.05)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_adaptive_export_retries_throttled_requests(stub_jenkins):
+    """A 429 with Retry-After is retried and reported instead of failing the job."""
+    responses = [(429, "busy", {"Retry-After": "0.1"}), {"builds": []}]
+    stub_jenkins.routes["/job/a/api/json"] = lambda query: responses.pop(0)
+
+    exporter = JenkinsJobExporter(stub_jenkins.url, delay=0, netrc_file="/nonexistent",
+                                  adaptive=True)
+    assert exporter.get_job_builds("a") == {"builds": []}
+    assert stub_jenkins.paths().count("/job/a/api/json") == 2
+    summary = exporter.throttle.summary()
+    assert summary["retries"] == 1
+    assert summary["throttled"] == 1
@@ -0,0 +1,108 @@
+"""Tests for --bucket time-series aggregation."""
+
+import csv
+from datetime import datetime, timezone
+
+import pytest
+
+from jenkins_stats import records
+from jenkins_stats.exporter import JenkinsJobExporter
+from jenkins_stats.records import BuildStore
+from jenkins_stats.trends import bucket_ids
+
+
+def ms(text):
+    return int(datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+TIMESTAMPS = [ms("2024-05-06T10:00"), ms("2024-05-12T23:59"), ms("2024-05-13T00:00"),
+              0, ms("2024-04-30T08:00")]
+
+
+def test_bucket_ids():
+    ids, labels = bucket_ids(TIMESTAMPS, "day")
+    assert labels == ["2024-04-30", "2024-05-06", "2024-05-12", "2024-05-13"]
+    assert list(ids) == [1, 2, 3, -1, 0]
+
+    # Weeks start on Monday (2024-05-06 and 2024-05-13 are Mondays)
+    ids, labels = bucket_ids(TIMESTAMPS, "week")
+    assert labels == ["2024-04-29", "2024-05-06", "2024-05-13"]
+    assert list(ids) == [1, 1, 2, -1, 0]
+
+    ids, labels = bucket_ids(TIMESTAMPS, "month")
+    assert labels == ["2024-04", "2024-05"]
+    assert list(ids) == [1, 1, 1, -1, 0]
+
+    with pytest.raises(ValueError):
+        bucket_ids(TIMESTAMPS, "year")
+
+
+@pytest.mark.parametrize("bucket", ["day", "week", "month"])
+def test_bucket_ids_numpy_matches_python(bucket):
+    np = pytest.importorskip("numpy")
+    timestamps = [0] + list(range(ms("2023-11-20"), ms("2024-03-05"), 3_600_000 * 7))
+    python_ids, python_labels = bucket_ids(timestamps, bucket)
+    numpy_ids, numpy_labels = bucket_ids(np.array(timestamps, dtype=np.int64), bucket)
+    assert numpy_labels == python_labels
+    assert numpy_ids.tolist() == list(python_ids)
+
+
+def trend_store():
+    store = BuildStore(["env"])
+    for n in range(1, 1201):
+        day = 1 + n % 20
+        store.add_build(f"job-{n % 3}", {
+            "number": n, "timestamp": ms(f"2024-05-{day:02d}T12:00"),
+            "result": "FAILURE" if day > 10 and n % 4 == 0 else "SUCCESS",
+            "duration": 1000 * day,
+            "actions": [{"parameters": [{"name": "env", "value": "prod" if n % 5 else "qa"}]}]})
+    return store
+
+
+@pytest.mark.parametrize("numpy_rows", [10 ** 9, 1])
+def test_aggregate_trend(monkeypatch, numpy_rows):
+    if numpy_rows == 1:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(records, "NUMPY_MIN_ROWS", numpy_rows)
+    store = trend_store()
+    trend = store.aggregate_trend("env", "week")
+    totals = store.aggregate("env")
+
+    assert list(trend["prod"]) == ["2024-04-29", "2024-05-06", "2024-05-13", "2024-05-20"]
+    for value, series in trend.items():
+        assert sum(entry["total_builds"] for entry in series.values()) == \
+            totals[value]["total_builds"]
+    first, third = trend["prod"]["2024-04-29"], trend["prod"]["2024-05-13"]
+    assert first["failed_builds"] == 0 < third["failed_builds"]
+    assert first["duration_sketch"].quantile(0.5) < third["duration_sketch"].quantile(0.5)
+    assert first["jobs"] == {"job-0", "job-1", "job-2"}
+
+
+def test_numpy_and_python_trends_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    store = trend_store()
+    monkeypatch.setattr(records, "NUMPY_MIN_ROWS", 10 ** 9)
+    python = store.aggregate_trend("env", "day", top_k=1)
+    monkeypatch.setattr(records, "NUMPY_MIN_ROWS", 1)
+    assert store.aggregate_trend("env", "day", top_k=1) == python
+
+
+def test_bucket_export_writes_trend_csv(stub_jenkins, tmp_path):
+    builds = [{"number": n, "result": "SUCCESS", "duration": 60000,
+               "timestamp": ms(f"2024-0{1 + n % 3}-15T09:00"),
+               "actions": [{"parameters": [{"name": "env", "value": "qa"}]}]}
+              for n in range(30, 0, -1)]
+    stub_jenkins.add_job("/job/solo", builds)
+    exporter = JenkinsJobExporter(f"{stub_jenkins.url}/job/solo", delay=0,
+                                  netrc_file="/nonexistent", bucket="month")
+    exporter.export_jobs_with_stats(str(tmp_path), "env", single_job=True)
+
+    assert list(exporter.grouped_trends["env"]["qa"]) == ["2024-01", "2024-02", "2024-03"]
+    with (tmp_path / "trends_by_env_month.csv").open() as f:
+        rows = list(csv.DictReader(f))
+    assert [row["Bucket_Start"] for row in rows] == ["2024-01", "2024-02", "2024-03"]
+    assert rows[0]["Total_Builds"] == "10"
+    assert float(rows[0]["P90_Duration_Minutes"]) == pytest.approx(1.0, abs=0.02)
+
+    with pytest.raises(ValueError):
+        JenkinsJobExporter(stub_jenkins.url, bucket="year")